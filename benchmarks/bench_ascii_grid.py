@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2021 Gabriele Bozzola
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, see <https://www.gnu.org/licenses/>.
+
+"""Compare the speed of :py:class:`~.OneGridFunctionASCII` with a line-by-line
+parser of CarpetIOASCII files.
+
+The script generates (in a temporary folder) 1D and 2D files that look like the
+ones produced by CarpetIOASCII, with several iterations, two refinement levels,
+and two components per refinement level. Then, it reads the files with
+:py:class:`~.OneGridFunctionASCII` and with the line-by-line parser that was
+used before ``kuibit`` 1.3.0 (reproduced here), it checks that the results are
+the same, and prints the timings. Since :py:class:`~.OneGridFunctionASCII`
+reads the blocks only when they are needed, we also time reading only the last
+iteration.
+
+Usage:
+
+.. code-block:: sh
+
+    python benchmarks/bench_ascii_grid.py --num-iterations 500
+
+"""
+
+import argparse
+import os
+import tempfile
+import timeit
+
+import numpy as np
+
+from kuibit import cactus_grid_functions as cgf
+from kuibit import grid_data
+
+_HEADER = """# {dimension}D ASCII output created by CarpetIOASCII
+#
+# rho x (rho)
+#
+"""
+
+_BLOCK_HEADER = """# iteration {iteration}   time {time}
+# time level 0
+# refinement level {ref_level}   multigrid level 0   map 0   component {component}
+# column format: 1:it\t2:tl\t3:rl 4:c 5:ml\t6:ix 7:iy 8:iz\t9:time\t10:x 11:y 12:z\t13:data
+"""
+
+
+def _write_file(path, num_iterations, points, dimension):
+    """Write a file with random data in the CarpetIOASCII format."""
+    with open(path, "w") as file_:
+        file_.write(_HEADER.format(dimension=dimension))
+        for iteration in range(num_iterations):
+            time = iteration * 0.25
+            for ref_level in range(2):
+                for component in range(2):
+                    file_.write(
+                        _BLOCK_HEADER.format(
+                            iteration=iteration,
+                            time=time,
+                            ref_level=ref_level,
+                            component=component,
+                        )
+                    )
+                    dx = 0.5**ref_level
+                    x0 = component * points * dx
+                    y_points = points if dimension == 2 else 1
+                    for iy in range(y_points):
+                        ix = np.arange(points)
+                        data = np.zeros((points, 13))
+                        data[:, 0] = iteration
+                        data[:, 2] = ref_level
+                        data[:, 3] = component
+                        data[:, 5] = ix
+                        data[:, 6] = iy
+                        data[:, 8] = time
+                        data[:, 9] = x0 + ix * dx
+                        data[:, 10] = iy * dx
+                        data[:, 12] = np.random.rand(points)
+                        np.savetxt(file_, data, fmt="%.15g", delimiter=" ")
+                        file_.write("\n")
+                    file_.write("\n")
+
+
+def _parse_line_by_line(path, column):
+    """Read the file ``path`` line by line, as done before ``kuibit`` 1.3.0.
+
+    Return a dictionary that maps (iteration, ref_level, component) to the
+    :py:class:`~.UniformGridData`.
+    """
+    blocks = {}
+    with open(path) as fil:
+        current_key = None
+        current = []
+        for line in fil:
+            if not line[0].isdigit():
+                continue
+            line_data = list(map(float, line.split()))
+            key = (line_data[0], line_data[2], line_data[3])
+            if key != current_key:
+                if current:
+                    blocks.setdefault(current_key, current)
+                current_key = key
+                current = []
+            current.append(
+                (line_data[9], line_data[10], line_data[11], line_data[column])
+            )
+        if current:
+            blocks.setdefault(current_key, current)
+
+    # As in the old parser, we build a UniformGridData for each block
+    for (iteration, ref_level, component), current in blocks.items():
+        x, y, z, data = np.array(current).T
+        x0_3d = np.array([np.amin(x), np.amin(y), np.amin(z)])
+        x1_3d = np.array([np.amax(x), np.amax(y), np.amax(z)])
+        dimensions_in_data = x0_3d != x1_3d
+        shape = np.array([len(np.unique(coord)) for coord in (x, y, z)])
+        shape = shape[dimensions_in_data]
+        grid = grid_data.UniformGrid(
+            shape,
+            x0=x0_3d[dimensions_in_data],
+            x1=x1_3d[dimensions_in_data],
+            component=component,
+            ref_level=ref_level,
+            iteration=iteration,
+        )
+        blocks[(iteration, ref_level, component)] = grid_data.UniformGridData(
+            grid, data.reshape(tuple(shape[::-1])).T
+        )
+    return blocks
+
+
+def _read_all(path):
+    """Read all the components in ``path`` with
+    :py:class:`~.OneGridFunctionASCII`."""
+    var = cgf.OneGridFunctionASCII([path], "rho")
+    for iteration, iteration_data in var.alldata[path].items():
+        for ref_level, components in iteration_data.items():
+            for component in components:
+                var._read_component_as_uniform_grid_data(
+                    path, iteration, ref_level, component
+                )
+
+
+def _read_last_iteration(path):
+    """Read the last iteration in ``path`` with
+    :py:class:`~.OneGridFunctionASCII`."""
+    var = cgf.OneGridFunctionASCII([path], "rho")
+    var[var.available_iterations[-1]]
+
+
+def _time(function, repeat):
+    """Return the best time of ``repeat`` calls of ``function``."""
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--num-iterations",
+        type=int,
+        default=200,
+        help="Iterations in each file",
+    )
+    parser.add_argument(
+        "--points", type=int, default=100, help="Points along each direction"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Repetitions of each timing"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        print(
+            f"{'file':<12} {'MB':>6} {'line-by-line':>12} "
+            f"{'kuibit':>8} {'last it':>8}   (seconds)"
+        )
+        for dimension, name in ((1, "rho.x.asc"), (2, "rho.xy.asc")):
+            path = os.path.join(tmpdir, name)
+            num_iterations = args.num_iterations
+            if dimension == 2:
+                # We keep the size of the files comparable
+                num_iterations = max(1, num_iterations // args.points)
+            _write_file(path, num_iterations, args.points, dimension)
+
+            expected = _parse_line_by_line(path, 12)
+            var = cgf.OneGridFunctionASCII([path], "rho")
+            for (iteration, ref_level, component), data in expected.items():
+                read = var._read_component_as_uniform_grid_data(
+                    path, int(iteration), int(ref_level), int(component)
+                )
+                if not np.array_equal(read.data, data.data):
+                    raise RuntimeError(f"Inconsistent results for {path}")
+
+            time_lines = _time(
+                lambda: _parse_line_by_line(path, 12), args.repeat
+            )
+            time_kuibit = _time(lambda: _read_all(path), args.repeat)
+            time_last = _time(lambda: _read_last_iteration(path), args.repeat)
+
+            size = os.path.getsize(path) / 1024**2
+            print(
+                f"{name:<12} {size:6.1f} {time_lines:12.3f} "
+                f"{time_kuibit:8.3f} {time_last:8.3f}"
+            )
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2021 Gabriele Bozzola
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, see <https://www.gnu.org/licenses/>.
+
+"""Compare the speed of :py:func:`~.read_table` with ``np.loadtxt`` and
+``np.genfromtxt``.
+
+The script generates (in a temporary folder) files that look like the ones
+produced by Cactus: a scalar reduction (3 columns), a CarpetIOScalar file with
+``one_file_per_group`` (15 columns), a multipole file (3 columns), and an IL
+BHNS diagnostic (19 columns). Files are also compressed with gzip and bzip2.
+Then, it reads each file with the different functions and prints the timings.
+
+Note that since NumPy 1.23 ``np.loadtxt`` is implemented in compiled code, and
+:py:func:`~.read_table` uses it to parse the blocks it reads. With older
+versions, :py:func:`~.read_table` uses ``np.fromstring``. The column
+``fromstring`` shows the timing with this second option.
+
+Usage:
+
+.. code-block:: sh
+
+    python benchmarks/bench_ascii_tables.py --num-rows 500000
+
+"""
+
+import argparse
+import bz2
+import gzip
+import os
+import shutil
+import tempfile
+import timeit
+
+import numpy as np
+
+from kuibit import cactus_ascii_utils as cau
+
+# Name of the file and number of columns
+_FILES = {
+    "rho.maximum.asc": 3,
+    "admbase-lapse..asc": 15,
+    "mp_psi4_l2_m2_r100.00.asc": 3,
+    "bhns.mon": 19,
+}
+
+
+def _write_file(path, num_rows, num_columns):
+    """Write a file with random data and a Cactus-like header."""
+    data = np.random.rand(num_rows, num_columns)
+    # Iterations and times
+    data[:, 0] = np.arange(num_rows)
+    data[:, 1] = np.arange(num_rows) * 0.25
+    np.savetxt(
+        path,
+        data,
+        fmt="%.19g",
+        header="Benchmark file\ndata columns: ...",
+        delimiter=" ",
+    )
+
+
+def _compress(path, opener, extension):
+    """Compress the file ``path`` and return the path of the new file."""
+    compressed_path = path + extension
+    with open(path, "rb") as file_in, opener(
+        compressed_path, "wb"
+    ) as file_out:
+        shutil.copyfileobj(file_in, file_out)
+    return compressed_path
+
+
+def _time(function, repeat):
+    """Return the best time of ``repeat`` calls of ``function``."""
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--num-rows", type=int, default=200000, help="Rows in each file"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Repetitions of each timing"
+    )
+    parser.add_argument(
+        "--no-compressed",
+        action="store_true",
+        help="Do not benchmark compressed files",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = []
+        for name, num_columns in _FILES.items():
+            path = os.path.join(tmpdir, name)
+            _write_file(path, args.num_rows, num_columns)
+            paths.append(path)
+            if not args.no_compressed:
+                paths.append(_compress(path, gzip.open, ".gz"))
+                paths.append(_compress(path, bz2.open, ".bz2"))
+
+        print(
+            f"{'file':<32} {'MB':>6} {'loadtxt':>8} {'genfromtxt':>10} "
+            f"{'fromstring':>10} {'read_table':>10}   (seconds)"
+        )
+        for path in paths:
+            expected = np.loadtxt(path, unpack=True, ndmin=2)
+            if not np.array_equal(cau.read_table(path), expected):
+                raise RuntimeError(f"Inconsistent results for {path}")
+
+            time_loadtxt = _time(
+                lambda: np.loadtxt(path, unpack=True, ndmin=2), args.repeat
+            )
+            time_genfromtxt = _time(
+                lambda: np.genfromtxt(path, unpack=True), args.repeat
+            )
+            time_read_table = _time(lambda: cau.read_table(path), args.repeat)
+
+            default_parser = cau._parse_chunk
+            cau._parse_chunk = cau._parse_chunk_fromstring
+            time_fromstring = _time(lambda: cau.read_table(path), args.repeat)
+            cau._parse_chunk = default_parser
+
+            size = os.path.getsize(path) / 1024**2
+            print(
+                f"{os.path.basename(path):<32} {size:6.1f} "
+                f"{time_loadtxt:8.3f} {time_genfromtxt:10.3f} "
+                f"{time_fromstring:10.3f} {time_read_table:10.3f}"
+            )
@@ -38,10 +38,57 @@ The functions available are:
                                filesize with a given unit. This also works for
                                non-ASCII files.
 
+- :py:func:`~.read_table`: Takes the path of a file with numeric columns and
+                           returns all the columns. This is a faster
+                           replacement for ``np.loadtxt``.
+
+- :py:func:`~.read_table_range`: Like :py:func:`~.read_table`, but reads only
+                                 the lines between two positions in the
+                                 file.
+
+- :py:func:`~.set_table_cache_dir`: Sets a directory where the files read by
+                                    :py:func:`~.read_table` are saved in
+                                    binary format, to be memory-mapped in
+                                    later reads.
+
+- :py:func:`~.read_columns`: Takes the path of a file with numeric columns and
+                             returns the requested columns. Files are parsed
+                             only once and kept in a cache (see
+                             :py:func:`~.set_columns_cache_size`).
+
+- :py:func:`~.preload_tables`: Takes a list of files with numeric columns and
+                               parses them in parallel processes, storing
+                               them in the cache used by
+                               :py:func:`~.read_columns`.
+
 """
 
+import bz2
+import gzip
+import hashlib
+import io
+import json
 import os
 import re
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+# Default maximum size of the cache of read_columns (in bytes)
+_COLUMNS_CACHE_MAX_BYTES = 256 * 1024 ** 2
+
+# Size of the blocks read by read_table (in bytes)
+_TABLE_CHUNK_BYTES = 16 * 1024 ** 2
+
+# Comments start with # and go until the end of the line
+_rx_comment = re.compile(rb"#[^\n]*")
+# Lines with only whitespace (or empty, e.g. after removing comments)
+_rx_blank_line = re.compile(rb"^[ \t\r\f\v]*\n", re.MULTILINE)
+# First line with some content
+_rx_first_line = re.compile(rb"^[ \t\r\f\v]*\S[^\n]*", re.MULTILINE)
 
 
 def _scan_strings_for_columns(strings, pattern, path=None):
@@ -65,9 +112,10 @@ def _scan_strings_for_columns(strings, pattern, path=None):
 
     """
 
-    # Here we match (number):(word[number])
-    # We are matching expressions like 3:kxx
-    pattern_columns = r"^(\d+):(\w+(\[\d+\])?)$"
+    # Here we match (number):(word[number](word))
+    # We are matching expressions like 3:kxx, or 3:kxx(maximum) (as in the
+    # files with all_reductions_in_one_file)
+    pattern_columns = r"^(\d+):(\w+(\[\d+\])?(\(\w+\))?)$"
     rx_columns = re.compile(pattern_columns)
 
     # We scan these lines and see if any matches with the regexp for the
@@ -115,7 +163,7 @@ def _scan_strings_for_columns(strings, pattern, path=None):
     # to the description. Columns are indexed starting from 1.
     columns_description = {
         variable_name: int(column_number) - 1
-        for column_number, variable_name, _ in (c.groups() for c in columns)
+        for column_number, variable_name in (c.group(1, 2) for c in columns)
     }
 
     return columns_description
@@ -245,3 +293,802 @@ def total_filesize(allfiles, unit="MB"):
     if unit not in units.keys():
         raise ValueError(f"Invalid unit: expected one of {list(units.keys())}")
     return sum(os.path.getsize(path) for path in set(allfiles)) / units[unit]
+
+
+def _file_signature(path):
+    """Return size and modification time of the file ``path``.
+
+    :param path: Path of the file.
+    :type path: str
+
+    :returns: Size and modification time (in nanoseconds).
+    :rtype: tuple of int
+
+    """
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _open_binary(path):
+    """Open the file ``path`` for reading bytes, decompressing it if needed.
+
+    :param path: Path of the file. Files ending in ``.gz`` and ``.bz2`` are
+                 decompressed.
+    :type path: str
+
+    :returns: File object.
+    :rtype: file object
+
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    return open(path, "rb")
+
+
+def _parse_chunk_fromstring(chunk, path):
+    """Parse a block of complete lines with numbers with ``np.fromstring``.
+
+    :param chunk: Lines to parse. It has to end with a newline.
+    :type chunk: bytes
+    :param path: Path of the file, used only for producing useful error
+                 messages.
+    :type path: str
+
+    :returns: Numbers in the chunk, with shape (number of rows, number of
+              columns).
+    :rtype: 2D NumPy array
+
+    """
+    if b"#" in chunk:
+        chunk = _rx_comment.sub(b"", chunk)
+
+    first_line = _rx_first_line.search(chunk)
+
+    # We have to check this explicitly, because np.fromstring returns [-1.]
+    # when the input contains only whitespace
+    if first_line is None:
+        return np.empty((0, 0))
+
+    # np.fromstring with a separator parses text in compiled code, and it
+    # treats all the whitespace (including newlines) as separator. When it
+    # finds something that is not a number, it stops and emits a
+    # DeprecationWarning (a ValueError in future versions of NumPy).
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            values = np.fromstring(chunk, sep=" ")
+        except (DeprecationWarning, ValueError):
+            raise ValueError(f"Could not parse {path}") from None
+
+    num_columns = len(first_line.group().split())
+
+    # Now we check that all the lines have the same number of columns. We
+    # count the lines and compare with the number of values. This is not
+    # bulletproof (e.g., the first line could have one more element and the
+    # second one less), but it is what we can do without inspecting each line.
+    num_lines = chunk.count(b"\n")
+    if values.size != num_lines * num_columns:
+        # There could be blank lines (or lines that had only comments)
+        num_lines -= len(_rx_blank_line.findall(chunk))
+        if values.size != num_lines * num_columns:
+            raise ValueError(f"Inconsistent number of columns in {path}")
+
+    return values.reshape(-1, num_columns)
+
+
+def _parse_chunk_loadtxt(chunk, path):
+    """Parse a block of complete lines with numbers with ``np.loadtxt``.
+
+    :param chunk: Lines to parse. It has to end with a newline.
+    :type chunk: bytes
+    :param path: Path of the file, used only for producing useful error
+                 messages.
+    :type path: str
+
+    :returns: Numbers in the chunk, with shape (number of rows, number of
+              columns).
+    :rtype: 2D NumPy array
+
+    """
+    with warnings.catch_warnings():
+        # Chunks with only comments are not a problem
+        warnings.simplefilter("ignore", UserWarning)
+        try:
+            return np.loadtxt(io.BytesIO(chunk), ndmin=2)
+        except ValueError as error:
+            raise ValueError(f"Could not parse {path}: {error}") from None
+
+
+# Since version 1.23, np.loadtxt is implemented in compiled code and it is as
+# fast as np.fromstring (and more robust). Before, it was pure Python and
+# np.fromstring was several times faster.
+if np.lib.NumpyVersion(np.__version__) >= "1.23.0":
+    _parse_chunk = _parse_chunk_loadtxt
+else:
+    _parse_chunk = _parse_chunk_fromstring
+
+
+def _is_compressed(path):
+    """Return whether the file ``path`` is compressed (judging from its name).
+
+    :param path: Path of the file.
+    :type path: str
+
+    :returns: Whether the file is compressed.
+    :rtype: bool
+
+    """
+    return path.endswith((".gz", ".bz2"))
+
+
+def _parse_table(path, offset=0):
+    """Parse a file with columns of numbers (see :py:func:`~.read_table`).
+
+    Together with the table, return the information needed to read later only
+    the lines appended to the file (see :py:func:`~._extend_table`). This is a
+    tuple with the position (in bytes) of the end of the last complete line,
+    the number of rows read from complete lines, and the content of the last
+    complete line. The last line is not complete when it does not end with a
+    newline (e.g., because it is being written). Compressed files cannot be
+    extended, so for them this information is None.
+
+    :param path: Path of the file.
+    :type path: str
+    :param offset: Position (in bytes) where to start reading. This has to be
+                   the beginning of a line, and it has to be 0 for compressed
+                   files.
+    :type offset: int
+
+    :returns: Content of the file, one row for each column, and information
+              to read the appended lines.
+    :rtype: tuple with 2D NumPy array and tuple (or None)
+
+    """
+    pieces = []
+    num_columns = None
+    # remainder is the part of the last block after its last newline
+    remainder = b""
+    # end_offset is the position of the end of the last complete line, and
+    # complete_rows the number of rows read up to that point
+    end_offset = offset
+    complete_rows = 0
+    last_line = None
+
+    with _open_binary(path) as file_:
+        if offset:
+            file_.seek(offset)
+        while True:
+            block = file_.read(_TABLE_CHUNK_BYTES)
+            if block:
+                block = remainder + block
+                last_newline = block.rfind(b"\n")
+                if last_newline == -1:
+                    # Line longer than a block
+                    remainder = block
+                    continue
+                chunk = block[: last_newline + 1]
+                remainder = block[last_newline + 1 :]
+                end_offset += len(chunk)
+                last_line = chunk[chunk.rfind(b"\n", 0, -1) + 1 :]
+            else:
+                # End of file, the last line may be without newline
+                chunk = remainder + b"\n" if remainder else b""
+                remainder = b""
+
+            if chunk:
+                values = _parse_chunk(chunk, path)
+                # Chunks with only comments
+                if len(values) > 0:
+                    if num_columns is None:
+                        num_columns = values.shape[1]
+                    if values.shape[1] != num_columns:
+                        raise ValueError(
+                            f"Inconsistent number of columns in {path}"
+                        )
+                    pieces.append(values)
+                    if block:
+                        complete_rows += len(values)
+
+            if not block:
+                break
+
+    if _is_compressed(path):
+        tail = None
+    else:
+        tail = (end_offset, complete_rows, last_line)
+
+    if num_columns is None:
+        return np.empty((0, 0)), tail
+
+    # We want each column to be contiguous
+    data = np.empty((num_columns, sum(len(piece) for piece in pieces)))
+    start = 0
+    for piece in pieces:
+        data[:, start : start + len(piece)] = piece.T
+        start += len(piece)
+    return data, tail
+
+
+def _extend_table(path, table, tail):
+    """Read the lines appended to the file ``path`` after ``table`` was read.
+
+    This is used to follow files that are being written by a running
+    simulation. Only the new part of the file is parsed. To make sure that
+    the file was only appended to, we check that the last line that was read
+    is still there.
+
+    :param path: Path of the file.
+    :type path: str
+    :param table: Table read previously.
+    :type table: 2D NumPy array
+    :param tail: Information returned by :py:func:`~._parse_table` together
+                 with ``table``.
+    :type tail: tuple
+
+    :returns: Updated table and new information to read the appended lines, or
+              None if the file was not only appended to.
+    :rtype: tuple or None
+
+    """
+    offset, complete_rows, last_line = tail
+
+    if last_line is not None:
+        start = offset - len(last_line)
+        try:
+            with open(path, "rb") as file_:
+                file_.seek(start)
+                if file_.read(len(last_line)) != last_line:
+                    return None
+        except OSError:
+            return None
+
+    appended, new_tail = _parse_table(path, offset)
+
+    # Rows that come from an incomplete line are read again
+    old_rows = table[:, :complete_rows]
+
+    if complete_rows == 0:
+        new_table = appended
+    elif len(appended) == 0:
+        new_table = np.array(old_rows)
+    elif len(appended) != len(table):
+        raise ValueError(f"Inconsistent number of columns in {path}")
+    else:
+        new_table = np.concatenate((old_rows, appended), axis=1)
+
+    if new_tail[2] is None:
+        # No complete line was appended
+        new_tail = (new_tail[0], new_tail[1], last_line)
+
+    return new_table, (new_tail[0], complete_rows + new_tail[1], new_tail[2])
+
+
+def _read_table(path, previous=None):
+    """Read the file ``path``, reusing a previous read if possible.
+
+    :param path: Path of the file.
+    :type path: str
+    :param previous: Result of a previous call to this function, or None.
+    :type previous: tuple or None
+
+    :returns: Signature of the file (as in :py:func:`~._file_signature`), table,
+              and information to read the appended lines (as in
+              :py:func:`~._parse_table`).
+    :rtype: tuple
+
+    """
+    # We take the signature before reading the file, so that if the file
+    # changes while we read it, we will find it stale next time
+    signature = _file_signature(path)
+
+    if previous is not None:
+        previous_signature, table, tail = previous
+        if previous_signature == signature:
+            return previous
+        # The file changed. If it grew, we try to read only the new lines
+        if tail is not None and signature[0] >= previous_signature[0]:
+            extended = _extend_table(path, table, tail)
+            if extended is not None:
+                return (signature,) + extended
+
+    table, tail = _parse_table(path)
+    return signature, table, tail
+
+
+def _read_table_cached(path, previous=None):
+    """Read the file ``path`` using the sidecar files if available (see
+    :py:func:`~.set_table_cache_dir`).
+
+    :param path: Path of the file.
+    :type path: str
+    :param previous: Result of a previous call to this function, or None.
+    :type previous: tuple or None
+
+    :returns: Signature of the file (as in :py:func:`~._file_signature`), table,
+              and information to read the appended lines (as in
+              :py:func:`~._parse_table`).
+    :rtype: tuple
+
+    """
+    if _table_sidecars.directory is None:
+        return _read_table(path, previous)
+
+    if previous is None:
+        previous = _table_sidecars.load(path)
+
+    result = _read_table(path, previous)
+    if result is not previous:
+        _table_sidecars.store(path, *result)
+    return result
+
+
+class _TableSidecars:
+    """Directory with the tables parsed by :py:func:`~.read_table`, saved in
+    binary format.
+
+    Each table is saved as a ``.npy`` file, together with a small JSON file
+    with the path, size, and modification time of the file it was read from,
+    the shape of the table, and the information needed to read only the lines
+    appended to the file later. The name of the files contains a hash of the
+    absolute path of the original file, so that files with the same name in
+    different folders (e.g., different restarts) do not collide.
+
+    :ivar directory: Directory where the tables are saved, or None if they
+                     should not be saved.
+    :type directory: str or None
+
+    """
+
+    # Increase this number every time the format of the files changes
+    VERSION = 2
+
+    def __init__(self, directory=None):
+        self.directory = directory
+
+    def _paths(self, path):
+        """Return the paths of the table and of the metadata for the file
+        ``path``.
+
+        :param path: Path of the original file.
+        :type path: str
+
+        :returns: Path of the ``.npy`` file, and of the ``.json`` file.
+        :rtype: tuple of str
+
+        """
+        abspath = os.path.abspath(path)
+        key = hashlib.sha1(abspath.encode()).hexdigest()[:16]
+        base = os.path.join(
+            self.directory, f"{os.path.basename(abspath)}.{key}"
+        )
+        return f"{base}.npy", f"{base}.json"
+
+    def load(self, path):
+        """Return the table for the file ``path``, if available.
+
+        :param path: Path of the original file.
+        :type path: str
+
+        :returns: Signature of the original file when the table was saved,
+                  memory-mapped table, and information to read the lines
+                  appended later (as in :py:func:`~._parse_table`). None if
+                  not available.
+        :rtype: tuple or None
+
+        """
+        table_path, meta_path = self._paths(path)
+        try:
+            with open(meta_path, "r") as file_:
+                meta = json.load(file_)
+            if meta.get("version") != self.VERSION:
+                return None
+            table = np.load(table_path, mmap_mode="r")
+            if list(table.shape) != meta["shape"]:
+                return None
+            tail = meta["tail"]
+            if tail is not None:
+                offset, complete_rows, last_line = tail
+                if last_line is not None:
+                    last_line = last_line.encode("latin-1")
+                tail = (offset, complete_rows, last_line)
+            return (meta["size"], meta["mtime_ns"]), table, tail
+        except (OSError, ValueError, KeyError, TypeError):
+            # Missing or corrupted files are parsed again
+            return None
+
+    def store(self, path, signature, table, tail):
+        """Save the table for the file ``path``.
+
+        Errors (e.g., read-only directory) are reported as warnings, since
+        the table can always be parsed again.
+
+        :param path: Path of the original file.
+        :type path: str
+        :param signature: Size and modification time of the original file.
+        :type signature: tuple of int
+        :param table: Parsed table.
+        :type table: 2D NumPy array
+        :param tail: Information to read the lines appended later (as in
+                     :py:func:`~._parse_table`).
+        :type tail: tuple or None
+
+        """
+        table_path, meta_path = self._paths(path)
+        if tail is not None:
+            offset, complete_rows, last_line = tail
+            # JSON cannot store bytes. latin-1 maps each byte to one character.
+            if last_line is not None:
+                last_line = last_line.decode("latin-1")
+            tail = [offset, complete_rows, last_line]
+        meta = {
+            "version": self.VERSION,
+            "source": os.path.abspath(path),
+            "size": signature[0],
+            "mtime_ns": signature[1],
+            "shape": list(table.shape),
+            "tail": tail,
+        }
+        # As in SimDirIndex.save, we first write temporary files and then move
+        # them, so that other processes never see incomplete files. The table
+        # is written before the metadata, since the metadata is what makes the
+        # table valid.
+        tmp_suffix = f".tmp{os.getpid()}"
+        try:
+            with open(table_path + tmp_suffix, "wb") as file_:
+                np.save(file_, table)
+            os.replace(table_path + tmp_suffix, table_path)
+            with open(meta_path + tmp_suffix, "w") as file_:
+                json.dump(meta, file_)
+            os.replace(meta_path + tmp_suffix, meta_path)
+        except OSError as error:
+            warnings.warn(f"Could not save cache for {path}: {error}")
+
+
+_table_sidecars = _TableSidecars()
+
+
+def set_table_cache_dir(directory):
+    """Set the directory where :py:func:`~.read_table` saves the parsed
+    tables.
+
+    Parsing large text files is slow, so it is convenient to save the parsed
+    data in binary format. Once a directory is set, every file read with
+    :py:func:`~.read_table` (which is used by the readers of scalars,
+    multipoles, and horizons) is saved there as a ``.npy`` file. Later reads
+    (also in different sessions) memory-map these files instead of parsing the
+    original ones. Files that changed (as determined by their size and
+    modification time) are parsed again.
+
+    :param directory: Directory where to save the tables. It is created if it
+                      does not exist. If None, tables are not saved.
+    :type directory: str or None
+
+    """
+    if directory is not None:
+        directory = str(directory)
+        os.makedirs(directory, exist_ok=True)
+    _table_sidecars.directory = directory
+
+
+def read_table(path):
+    """Read a file with columns of numbers.
+
+    This function is equivalent to ``np.loadtxt(path, unpack=True, ndmin=2)``.
+    The file is read in blocks, lines (or parts of lines) that start with
+    ``#`` are ignored, and compressed files (gz and bz2) are transparently
+    decompressed. All the rows must have the same number of columns.
+
+    With versions of NumPy older than 1.23, the blocks are parsed with
+    ``np.fromstring``, which is several times faster than ``np.loadtxt``. In
+    newer versions, ``np.loadtxt`` is implemented in compiled code, so it is
+    used directly. In both cases, this function is several times faster than
+    ``np.genfromtxt``.
+
+    The output is a C-contiguous array with shape (number of columns, number of
+    rows), so that each column is contiguous in memory.
+
+    If a cache directory was set with :py:func:`~.set_table_cache_dir`, the
+    parsed table is saved there as a ``.npy`` file, and later calls (also from
+    other processes) memory-map it instead of parsing the file again. In this
+    case, the returned array is read-only. If the file grew in the meantime
+    (e.g., it is the output of a running simulation), only the new lines are
+    parsed.
+
+    :param path: Path of the file.
+    :type path: str
+
+    :returns: Content of the file, one row for each column.
+    :rtype: 2D NumPy array
+
+    """
+    return _read_table_cached(str(path))[1]
+
+
+def read_table_range(path, start, end):
+    """Read the lines of a file with columns of numbers between two positions.
+
+    This is like :py:func:`~.read_table`, but only the bytes from ``start`` to
+    ``end`` are read. This is useful to read only a part of a large file, when
+    the positions of the interesting lines are known. Compressed files are not
+    supported, because they cannot be accessed at arbitrary positions.
+
+    :param path: Path of the file. It cannot be compressed.
+    :type path: str
+    :param start: Position (in bytes) where to start reading. This has to be
+                  the beginning of a line.
+    :type start: int
+    :param end: Position (in bytes) where to stop reading. This has to be the
+                end of a line (or the end of the file).
+    :type end: int
+
+    :returns: Content of the given range, one row for each column.
+    :rtype: 2D NumPy array
+
+    """
+    path = str(path)
+
+    if _is_compressed(path):
+        raise ValueError(f"Cannot read part of compressed file {path}")
+
+    with open(path, "rb") as file_:
+        file_.seek(start)
+        chunk = file_.read(end - start)
+
+    # The last line may be without newline
+    if chunk and not chunk.endswith(b"\n"):
+        chunk += b"\n"
+
+    values = _parse_chunk(chunk, path) if chunk else np.empty((0, 0))
+
+    if len(values) == 0:
+        return np.empty((0, 0))
+
+    # We want each column to be contiguous
+    return np.ascontiguousarray(values.T)
+
+
+class _ColumnsCache:
+    """Least-recently-used cache of the content of files with numeric columns.
+
+    Each file is stored as a 2D array with one row for each column of the file
+    (so that columns are contiguous in memory). The cache is bounded by the
+    total size of the arrays stored. Entries are validated against size and
+    modification time of the file, so that files that changed are read again
+    (only the new lines, if the file was appended to).
+
+    """
+
+    def __init__(self, max_bytes):
+        """Constructor.
+
+        :param max_bytes: Maximum total size of the arrays in the cache.
+        :type max_bytes: int
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        # _tables maps paths to tuples (signature, array, tail), where tail is
+        # the information needed to read the lines appended to the file (see
+        # _parse_table)
+        self._tables = OrderedDict()
+
+    def _pop(self, path):
+        entry = self._tables.pop(path)
+        self.nbytes -= entry[1].nbytes
+        return entry
+
+    def get(self, path):
+        """Return the content of the file ``path``, reading it if needed.
+
+        If the file grew since it was read, only the new lines are parsed.
+
+        :param path: Path of the file.
+        :type path: str
+
+        :returns: Array with shape (number of columns, number of rows).
+        :rtype: 2D NumPy array
+
+        """
+        previous = self._pop(path) if path in self._tables else None
+
+        entry = _read_table_cached(path, previous)
+        self.put(path, entry)
+        return entry[1]
+
+    def put(self, path, entry):
+        """Store the content of the file ``path``.
+
+        :param path: Path of the file.
+        :type path: str
+        :param entry: Signature, table, and information to read the appended
+                      lines, as returned by :py:func:`~._read_table`.
+        :type entry: tuple
+
+        """
+        if path in self._tables:
+            self._pop(path)
+
+        table = entry[1]
+        # Columns are served as views, so we do not want them to be modified
+        table.flags.writeable = False
+
+        # Tables that are larger than the cache are not stored
+        if table.nbytes <= self.max_bytes:
+            self._tables[path] = entry
+            self.nbytes += table.nbytes
+            self.shrink()
+
+    def is_current(self, path):
+        """Return whether the file ``path`` is in the cache and it did not
+        change since it was read.
+
+        :param path: Path of the file.
+        :type path: str
+
+        :rtype: bool
+        """
+        if path not in self._tables:
+            return False
+        try:
+            return self._tables[path][0] == _file_signature(path)
+        except OSError:
+            return False
+
+    def shrink(self):
+        """Remove the least recently used tables until the cache is within
+        the maximum size."""
+        while self.nbytes > self.max_bytes:
+            self._pop(next(iter(self._tables)))
+
+    def clear(self):
+        """Remove all the tables."""
+        self._tables.clear()
+        self.nbytes = 0
+
+
+_columns_cache = _ColumnsCache(_COLUMNS_CACHE_MAX_BYTES)
+
+
+def set_columns_cache_size(max_bytes):
+    """Set the maximum amount of memory used by :py:func:`~.read_columns` to
+    cache the content of the files.
+
+    When the cache is full, the files that were used least recently are
+    removed.
+
+    :param max_bytes: Maximum total size of the arrays in the cache (in bytes).
+                      Use 0 to disable the cache.
+    :type max_bytes: int
+
+    """
+    if max_bytes < 0:
+        raise ValueError("Size of the cache cannot be negative")
+    _columns_cache.max_bytes = max_bytes
+    _columns_cache.shrink()
+
+
+def clear_columns_cache():
+    """Remove all the files from the cache of :py:func:`~.read_columns`."""
+    _columns_cache.clear()
+
+
+def read_columns(path, columns):
+    """Read the given columns from a file with numeric data.
+
+    The entire file is parsed the first time one of its columns is requested,
+    and it is kept in memory, so that the other columns can be returned
+    without reading the file again. This is convenient for files that contain
+    many variables (e.g., CarpetASCII output with ``one_file_per_group``).
+    The cache has limited size (see :py:func:`~.set_columns_cache_size`).
+
+    The returned arrays are read-only views of the cached data.
+
+    Lines that start with ``#`` are ignored, and compressed files (gz and bz2)
+    are supported.
+
+    :param path: Path of the file.
+    :type path: str
+    :param columns: Columns to read (starting from 0).
+    :type columns: list of int
+
+    :returns: One array for each of the requested columns.
+    :rtype: tuple of 1D NumPy arrays
+
+    """
+    try:
+        table = _columns_cache.get(path)
+    except ValueError:
+        # The file cannot be read as a table (e.g., rows have different number
+        # of columns), but it may still be possible to read the columns we
+        # need
+        table = None
+
+    if table is None or len(table) <= max(columns):
+        table = np.loadtxt(path, unpack=True, ndmin=2, usecols=columns)
+        return tuple(table)
+
+    return tuple(table[column] for column in columns)
+
+
+def _read_table_worker(path, table_cache_dir):
+    """Read the file ``path`` in a worker process of
+    :py:func:`~.preload_tables`.
+
+    :param path: Path of the file.
+    :type path: str
+    :param table_cache_dir: Directory with the sidecar files (see
+                            :py:func:`~.set_table_cache_dir`).
+    :type table_cache_dir: str or None
+
+    :returns: Signature of the file, table, and information to read the
+              appended lines (as in :py:func:`~._read_table`), or None if the
+              file could not be read.
+    :rtype: tuple or None
+
+    """
+    # Worker processes do not necessarily inherit the state of the module
+    # (e.g., when they are spawned instead of forked), so we set the
+    # directory explicitly
+    _table_sidecars.directory = table_cache_dir
+    try:
+        signature, table, tail = _read_table_cached(path)
+    except (OSError, ValueError):
+        # We leave the errors to the readers, which will read the file
+        # again with read_columns (and possibly fall back to np.loadtxt)
+        return None
+    # Memory-mapped tables are sent back as normal arrays
+    return signature, np.asarray(table), tail
+
+
+def preload_tables(paths, max_workers=None):
+    """Parse the given files in parallel and store them in the cache of
+    :py:func:`~.read_columns`.
+
+    Decompressing and parsing text files is CPU-bound, so reading many files
+    (e.g., the output of the same variable in each restart of a simulation)
+    in a single process is slow. This function distributes the files to a
+    pool of processes. After this function returns, :py:func:`~.read_columns`
+    finds the files in the cache and returns immediately.
+
+    Files that are already in the cache (and did not change) are not read
+    again. Files that are larger than the cache (see
+    :py:func:`~.set_columns_cache_size`) are parsed but not stored, so there is
+    no advantage in preloading them.
+
+    :param paths: Paths of the files.
+    :type paths: list of str
+    :param max_workers: Maximum number of processes. If None, use as many as
+                        the number of processors (as in
+                        :py:class:`concurrent.futures.ProcessPoolExecutor`).
+                        If 1, files are read in this process.
+    :type max_workers: int or None
+
+    """
+    if max_workers is not None and max_workers < 1:
+        raise ValueError("max_workers has to be a positive number")
+
+    paths = [str(path) for path in paths]
+    paths = [path for path in paths if not _columns_cache.is_current(path)]
+
+    # Starting processes has a cost, so we only do it when there is more than
+    # one file
+    if max_workers == 1 or len(paths) < 2:
+        for path in paths:
+            try:
+                _columns_cache.get(path)
+            except (OSError, ValueError):
+                pass
+        return
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(paths))
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        entries = pool.map(
+            _read_table_worker, paths, repeat(_table_sidecars.directory)
+        )
+        for path, entry in zip(paths, entries):
+            if entry is not None:
+                _columns_cache.put(path, entry)
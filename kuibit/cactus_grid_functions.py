@@ -41,13 +41,29 @@ up with a series of brackets to access the actual data. For example, if ``sim``
 is a :py:class:`~.SimDir`, ``sim.gf.xy['rho_b'][0]`` is ``rho_b`` at iteration 0
 on the equatorial plane represented as :py:class:`~.HierarchicalGridData`.
 
+HDF5 files are kept open and shared by all the grid functions. The maximum
+number of open files can be set with :py:func:`~.set_max_open_h5_files`, and
+the files can be closed with :py:func:`~.close_h5_files`.
+
+The components read are kept in memory up to a maximum size, after which the
+iterations used least recently are removed. The size can be set with
+:py:func:`~.set_components_cache_size`, and the counters of the cache are
+returned by :py:func:`~.components_cache_stats`.
+
 """
 
+import copy
+import mmap
+import multiprocessing
 import os
 import re
+import threading
 import warnings
+import weakref
 from abc import ABC, abstractmethod
 from bz2 import open as bopen
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from functools import lru_cache
 from gzip import open as gopen
@@ -57,7 +73,549 @@ import numpy as np
 
 from kuibit import grid_data, simdir
 from kuibit.attr_dict import pythonize_name_dict
-from kuibit.cactus_ascii_utils import scan_header, total_filesize
+from kuibit.cactus_ascii_utils import (
+    read_table,
+    read_table_range,
+    scan_header,
+    total_filesize,
+)
+from kuibit.simdir_index import cached_metadata
+
+
+# Default maximum number of HDF5 files kept open by _h5_files
+_MAX_OPEN_H5_FILES = 64
+
+
+class _H5FilesPool:
+    """Least-recently-used pool of HDF5 files open for reading.
+
+    Opening an HDF5 file and reading its metadata is expensive, so we keep the
+    files open and reuse the handles across all the
+    :py:class:`~.OneGridFunctionH5` (and across components). The number of open
+    files is bounded. Files are validated against their size and modification
+    time, so that files that changed are opened again.
+
+    Files are accessed with the context manager :py:meth:`~.open`. The files
+    that are being used are never closed, so the pool can temporarily hold more
+    files than the maximum if more files are in use at the same time.
+
+    """
+
+    def __init__(self, max_open):
+        """Constructor.
+
+        :param max_open: Maximum number of open files.
+        :type max_open: int
+        """
+        self.max_open = max_open
+        # _files maps paths to lists [signature, h5py.File, number of users]
+        self._files = OrderedDict()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _signature(path):
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _close(self, path):
+        _, file_, _ = self._files.pop(path)
+        file_.close()
+
+    @contextmanager
+    def open(self, path):
+        """Context manager that returns the open HDF5 file ``path``.
+
+        :param path: Path of the file.
+        :type path: str
+
+        """
+        signature = self._signature(path)
+        with self._lock:
+            entry = self._files.get(path)
+            if entry is not None and entry[0] != signature and entry[2] == 0:
+                # The file changed
+                self._close(path)
+                entry = None
+            if entry is None:
+                entry = [signature, h5py.File(path, "r"), 0]
+                self._files[path] = entry
+            self._files.move_to_end(path)
+            entry[2] += 1
+            self.shrink()
+
+        try:
+            yield entry[1]
+        finally:
+            with self._lock:
+                entry[2] -= 1
+                self.shrink()
+
+    def shrink(self):
+        """Close the least recently used files that are not in use until there
+        are at most the maximum number of open files."""
+        with self._lock:
+            unused = [
+                path for path, entry in self._files.items() if not entry[2]
+            ]
+            for path in unused[: max(0, len(self._files) - self.max_open)]:
+                self._close(path)
+
+    def close(self, paths=None):
+        """Close the files that are not in use.
+
+        :param paths: Paths of the files to close. If None, close all of them.
+        :type paths: iterable of str or None
+
+        """
+        with self._lock:
+            if paths is not None:
+                paths = set(paths)
+            for path in [
+                path
+                for path, entry in self._files.items()
+                if not entry[2] and (paths is None or path in paths)
+            ]:
+                self._close(path)
+
+    def __len__(self):
+        return len(self._files)
+
+
+_h5_files = _H5FilesPool(_MAX_OPEN_H5_FILES)
+
+
+def set_max_open_h5_files(max_open):
+    """Set the maximum number of HDF5 files that are kept open for reading grid
+    functions.
+
+    HDF5 files are kept open and shared by all the grid functions, so that
+    reading many components from the same files does not pay the cost of
+    opening them again. When the limit is reached, the files that were used
+    least recently are closed.
+
+    :param max_open: Maximum number of open files. Use 0 to close the files
+                     as soon as they are not used anymore.
+    :type max_open: int
+
+    """
+    if max_open < 0:
+        raise ValueError("Number of open files cannot be negative")
+    _h5_files.max_open = max_open
+    _h5_files.shrink()
+
+
+def close_h5_files(paths=None):
+    """Close the HDF5 files kept open for reading grid functions.
+
+    This is called when a :py:class:`~.SimDir` used as context manager exits,
+    with the files of the simulation.
+
+    :param paths: Paths of the files to close. If None, close all of them.
+    :type paths: iterable of str or None
+
+    """
+    _h5_files.close(paths)
+
+
+# Default maximum size of the components kept in memory by the grid functions
+# (in bytes)
+_COMPONENTS_CACHE_MAX_BYTES = 2 * 1024**3
+
+
+class _ComponentsCache:
+    """Least-recently-used cache of the iterations read by the grid functions.
+
+    The grid functions keep the components that they read in their ``alldata``
+    dictionary. This object keeps track of the memory used by each iteration of
+    each grid function and, when the total exceeds the maximum size, it removes
+    the iterations that were used least recently (setting their components to
+    None in ``alldata``, so that they are read again when needed).
+
+    The cache counts the hits (iterations that were already in memory), the
+    misses (iterations that had to be read), and the evictions.
+
+    """
+
+    def __init__(self, max_bytes):
+        """Constructor.
+
+        :param max_bytes: Maximum total size of the components in memory.
+        :type max_bytes: int
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # _iterations maps (id of the grid function, iteration) to the size in
+        # bytes. _references maps the ids of the grid functions to lists
+        # [weak reference to the grid function, set of tracked iterations].
+        # We use weak references so that grid functions that are not used
+        # anymore can be garbage collected. When this happens, the callback
+        # of the weak reference removes their iterations (before the id can
+        # be reused by another object).
+        self._iterations = OrderedDict()
+        self._references = {}
+        self._lock = threading.RLock()
+
+    def store(self, grid_function, iteration, nbytes, hit):
+        """Record that the given iteration of ``grid_function`` was used.
+
+        :param grid_function: Grid function.
+        :type grid_function: :py:class:`~.BaseOneGridFunction`
+        :param iteration: Iteration.
+        :type iteration: int
+        :param nbytes: Size of the components of the iteration.
+        :type nbytes: int
+        :param hit: Whether all the components were already in memory.
+        :type hit: bool
+
+        """
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.track(grid_function, iteration, nbytes)
+
+    def track(self, grid_function, iteration, nbytes):
+        """Record the size of the given iteration of ``grid_function``, without
+        counting it as a hit or a miss.
+
+        This is used for iterations that are loaded without being requested
+        (e.g., when a compressed file has to be read entirely).
+
+        :param grid_function: Grid function.
+        :type grid_function: :py:class:`~.BaseOneGridFunction`
+        :param iteration: Iteration.
+        :type iteration: int
+        :param nbytes: Size of the components of the iteration.
+        :type nbytes: int
+
+        """
+        owner = id(grid_function)
+        key = (owner, iteration)
+        with self._lock:
+            if owner not in self._references:
+                self._references[owner] = [
+                    weakref.ref(
+                        grid_function,
+                        lambda _, owner=owner: self._discard(owner),
+                    ),
+                    set(),
+                ]
+            self._references[owner][1].add(iteration)
+
+            nbytes_before = self._iterations.pop(key, None)
+            if nbytes_before is not None:
+                self.nbytes -= nbytes_before
+
+            self._iterations[key] = nbytes
+            self.nbytes += nbytes
+            self.shrink()
+
+    def _discard(self, owner):
+        """Stop tracking the iterations of the grid function with id ``owner``.
+
+        :param owner: Id of the grid function.
+        :type owner: int
+
+        """
+        with self._lock:
+            _, iterations = self._references.pop(owner, (None, ()))
+            for iteration in iterations:
+                self.nbytes -= self._iterations.pop((owner, iteration))
+
+    def forget(self, grid_function):
+        """Stop tracking the iterations of ``grid_function``.
+
+        :param grid_function: Grid function.
+        :type grid_function: :py:class:`~.BaseOneGridFunction`
+
+        """
+        self._discard(id(grid_function))
+
+    def shrink(self):
+        """Remove the least recently used iterations until the cache is within
+        the maximum size."""
+        with self._lock:
+            while self.nbytes > self.max_bytes and self._iterations:
+                (owner, iteration), nbytes = self._iterations.popitem(
+                    last=False
+                )
+                self.nbytes -= nbytes
+                reference, iterations = self._references[owner]
+                iterations.discard(iteration)
+                grid_function = reference()
+                # The grid function may be being garbage collected (its
+                # iterations are going to be removed by _discard)
+                if grid_function is not None:
+                    grid_function._evict_iteration(iteration)
+                    self.evictions += 1
+
+    def stats(self):
+        """Return the counters of the cache.
+
+        :returns: Dictionary with keys ``hits``, ``misses``, ``evictions``,
+                  ``nbytes`` (size of the components currently in memory), and
+                  ``max_bytes``.
+        :rtype: dict
+
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "nbytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def __getstate__(self):
+        # Weak references and locks cannot be pickled. We do not save the
+        # iterations that we are tracking (they will be tracked again when
+        # they are used).
+        state = self.__dict__.copy()
+        state["nbytes"] = 0
+        state["_iterations"] = OrderedDict()
+        state["_references"] = {}
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # For objects from old pickles
+        self._references = {}
+        self._lock = threading.RLock()
+
+
+_components_cache = _ComponentsCache(_COMPONENTS_CACHE_MAX_BYTES)
+
+
+def set_components_cache_size(max_bytes):
+    """Set the maximum amount of memory used by the grid functions to keep the
+    components that were read.
+
+    When the limit is reached, the iterations that were used least recently
+    are removed from memory (and read again from the files if needed). This is
+    the cache shared by all the :py:class:`~.SimDir` that do not set their own
+    with ``grid_cache_size``.
+
+    :param max_bytes: Maximum total size of the components in memory (in
+                      bytes).
+    :type max_bytes: int
+
+    """
+    if max_bytes < 0:
+        raise ValueError("Size of the cache cannot be negative")
+    _components_cache.max_bytes = max_bytes
+    _components_cache.shrink()
+
+
+def components_cache_stats():
+    """Return the counters of the cache of the grid functions shared by all the
+    :py:class:`~.SimDir` (see :py:func:`~.set_components_cache_size`).
+
+    :returns: Dictionary with keys ``hits``, ``misses``, ``evictions``,
+              ``nbytes`` (size of the components currently in memory), and
+              ``max_bytes``.
+    :rtype: dict
+
+    """
+    return _components_cache.stats()
+
+
+# Pools of processes used to read the components of the grid functions in
+# parallel (see BaseOneGridFunction._read_components_in_parallel), by number
+# of processes. The pools are shared by all the grid functions, and they are
+# created the first time they are needed. The processes are started with the
+# "spawn" method, so they do not inherit the HDF5 files open in this process
+# (HDF5 handles cannot be used across processes).
+_process_pools = {}
+_process_pools_lock = threading.Lock()
+
+
+def _process_pool(max_workers):
+    """Return the pool of processes used to read grid functions in parallel.
+
+    :param max_workers: Number of processes. If None, use as many as the
+                        number of processors.
+    :type max_workers: int or None
+
+    :returns: Pool of processes.
+    :rtype: :py:class:`multiprocessing.pool.Pool`
+
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    with _process_pools_lock:
+        if max_workers not in _process_pools:
+            _process_pools[max_workers] = multiprocessing.get_context(
+                "spawn"
+            ).Pool(max_workers)
+        return _process_pools[max_workers]
+
+
+def close_process_pools():
+    """Shut down the processes used to read grid functions in parallel (see
+    ``max_workers`` in :py:class:`~.BaseOneGridFunction`).
+
+    The processes are shared by all the grid functions and all the
+    :py:class:`~.SimDir`, and they are started again when they are needed.
+    """
+    with _process_pools_lock:
+        pools = list(_process_pools.values())
+        _process_pools.clear()
+    for pool in pools:
+        pool.close()
+        pool.join()
+
+
+def _scan_h5_catalog(path):
+    """Return the catalog of the HDF5 file ``path``.
+
+    The catalog describes the content of the file: the variables, with their
+    thorn, map, and the iterations, refinement levels, and components
+    available (only for the current timelevel), the time of each iteration,
+    and whether the file contains the ghost zones. The catalog is
+    serializable in JSON, so that it can be stored in the index.
+
+    :param path: Path of the HDF5 file.
+    :type path: str
+
+    :returns: Catalog of the file. This is a dictionary with keys
+              ``variables``, ``times``, and ``ghost_zones``. ``variables`` is
+              a dictionary that maps the variables to dictionaries with keys
+              ``thorn``, ``map``, and ``entries`` (list of lists with
+              iteration, refinement level, and component). ``times`` is a
+              list of lists with iteration and time. ``ghost_zones`` is None
+              if the file does not contain the parameters.
+    :rtype: dict
+
+    """
+    rx_group_name = OneGridFunctionH5.rx_group_name
+    variables = {}
+    # The time is the same for all the variables (and refinement levels, and
+    # components) at a given iteration, so we read it only once per iteration
+    times = {}
+
+    with _h5_files.open(path) as f:
+        # Here group is in the sense of HDF5 group
+        for group in f.keys():
+            matched = rx_group_name.match(group)
+            # If this is not an interesting group, just skip it
+            if not matched:
+                continue
+
+            (
+                thorn_name,
+                var_name,
+                iteration,
+                time_level,
+                map_,
+                _,
+                ref_level,
+                _,
+                component,
+            ) = matched.groups()
+
+            var_info = variables.setdefault(
+                var_name, {"thorn": None, "map": None, "entries": []}
+            )
+
+            # We only care about the current timelevel
+            if int(time_level) != 0:
+                continue
+
+            if var_info["thorn"] is None:
+                var_info["thorn"] = thorn_name
+
+            if var_info["map"] is None:
+                var_info["map"] = map_
+
+            # This is important to support grid arrays, which do not have a
+            # refinement level (or a component)
+            ref_level = -1 if ref_level is None else int(ref_level)
+            component = -1 if component is None else int(component)
+
+            var_info["entries"].append([int(iteration), ref_level, component])
+
+            if int(iteration) not in times:
+                time = f[group].attrs.get("time", None)
+                if time is not None:
+                    times[int(iteration)] = float(time)
+
+    try:
+        ghost_zones = OneGridFunctionH5._are_ghostzones_in_file(path)
+    except KeyError:
+        # Files without parameters. We store None, and we will raise an error
+        # only if we have to read a variable from this file.
+        ghost_zones = None
+
+    return {
+        "variables": variables,
+        "times": [list(item) for item in sorted(times.items())],
+        "ghost_zones": ghost_zones,
+    }
+
+
+def _h5_catalog(path, index=None, catalogs=None):
+    """Return the catalog of the HDF5 file ``path`` (see
+    :py:func:`~._scan_h5_catalog`).
+
+    The file is scanned only if the catalog is not in ``catalogs`` or in
+    ``index``.
+
+    :param path: Path of the HDF5 file.
+    :type path: str
+    :param index: Index where to look for the catalog.
+    :type index: :py:class:`~.SimDirIndex` or None
+    :param catalogs: Dictionary that maps paths to catalogs. The catalog of
+                     ``path`` is added to it.
+    :type catalogs: dict or None
+
+    :returns: Catalog of the file.
+    :rtype: dict
+
+    """
+    if catalogs is not None and path in catalogs:
+        return catalogs[path]
+
+    catalog = cached_metadata(
+        index, path, "h5_catalog", lambda: _scan_h5_catalog(path)
+    )
+
+    if catalogs is not None:
+        catalogs[path] = catalog
+    return catalog
+
+
+def _read_components_worker(grid_function, path, iteration, keys):
+    """Read the given components of a grid function.
+
+    This is the function executed by the processes started by
+    :py:meth:`~.BaseOneGridFunction._read_components_in_parallel`.
+
+    :param grid_function: Grid function (see
+                          :py:meth:`~.BaseOneGridFunction._copy_for_file`).
+    :type grid_function: :py:class:`~.BaseOneGridFunction`
+    :param path: Path of the file.
+    :type path: str
+    :param iteration: Iteration.
+    :type iteration: int
+    :param keys: Refinement levels and components to read.
+    :type keys: list of tuples
+
+    :returns: Components as :py:class:`~.UniformGridData`.
+    :rtype: list of :py:class:`~.UniformGridData`
+
+    """
+    return [
+        grid_function._read_component_as_uniform_grid_data(
+            path, iteration, ref_level, component
+        )
+        for ref_level, component in keys
+    ]
 
 
 class BaseOneGridFunction(ABC):
@@ -88,21 +646,45 @@ class BaseOneGridFunction(ABC):
     :type restarts_data: tuple of str
     :ivar var_name: Variable name.
     :type var_name: str
+    :ivar max_workers: Number of processes used to read the components of an
+                       iteration that are in different files. If 1, the
+                       components are read one after the other in this
+                       process. If None, use as many processes as
+                       processors. The processes are shared by all the grid
+                       functions with the same ``max_workers`` (see
+                       :py:func:`~.close_process_pools`).
+    :type max_workers: int or None
 
     """
 
-    def __init__(self, allfiles, var_name):
+    def __init__(self, allfiles, var_name, index=None, cache=None):
         """Constructor.
 
         :param allfiles: Paths of files associated to the variable.
         :type allfiles: list of str
         :param var_name: Variable name.
         :type var_name: str
+        :param index: Index where to look for the metadata of the files.
+        :type index: :py:class:`~.SimDirIndex` or None
+        :param cache: Cache that bounds the memory used by the components
+                      read. If None, use the one shared by all the grid
+                      functions (see :py:func:`~.set_components_cache_size`).
+        :type cache: :py:class:`~._ComponentsCache` or None
 
         """
 
         self.allfiles = list(allfiles)
 
+        # None means the global cache. We do not store the global cache
+        # directly, otherwise it would be duplicated when pickling.
+        self._cache = cache
+
+        self.max_workers = 1
+
+        # _parse_file can use the index, so we have to set it before parsing
+        # the files
+        self._index = index
+
         # self.alldata is a nested dictionary
         # 1. At the first level, we have the file
         # 2. self.alldata[filename] is a dictionary with keys the various
@@ -125,6 +707,30 @@ class BaseOneGridFunction(ABC):
         # Here we are going to save the restart information
         self.restarts_data = None
 
+        # Cached lists of available iterations and times. We cannot use
+        # lru_cache here because we have to reset these values when new files
+        # are added.
+        self._available_iterations = None
+        self._available_times = None
+
+    def _add_files(self, allfiles):
+        """Add the given files to the ones associated to the variable.
+
+        The data already read from the other files is kept.
+
+        :param allfiles: Paths of the new files.
+        :type allfiles: list of str
+
+        """
+        new_files = [path for path in allfiles if path not in self.allfiles]
+        self.allfiles.extend(new_files)
+        for path in new_files:
+            self._parse_file(path)
+
+        self.restarts_data = None
+        self._available_iterations = None
+        self._available_times = None
+
     # The derived classes have to specify:
     # 1. How to read a file, populating the self.alldata dictionary up to the
     #    last level (excluded or included) (_parse_file). This should also
@@ -298,7 +904,6 @@ class BaseOneGridFunction(ABC):
         return self.restarts[-1][1]
 
     @property
-    @lru_cache(128)
     def available_iterations(self):
         """Return the available iterations.
 
@@ -306,15 +911,16 @@ class BaseOneGridFunction(ABC):
         :rtype: list
 
         """
-        iterations_in_files = set()
-        for path in self.allfiles:
-            iterations_in_files.update(self._iterations_in_file(path))
+        if self._available_iterations is None:
+            iterations_in_files = set()
+            for path in self.allfiles:
+                iterations_in_files.update(self._iterations_in_file(path))
 
-        # Next we merge everything to make a set and we sort it
-        return sorted(list(iterations_in_files))
+            # Next we merge everything to make a set and we sort it
+            self._available_iterations = sorted(list(iterations_in_files))
+        return self._available_iterations
 
     @property
-    @lru_cache(128)
     def available_times(self):
         """Return the available times.
 
@@ -322,10 +928,12 @@ class BaseOneGridFunction(ABC):
         :rtype: list
 
         """
-        return [
-            self.time_at_iteration(iteration)
-            for iteration in self.available_iterations
-        ]
+        if self._available_times is None:
+            self._available_times = [
+                self.time_at_iteration(iteration)
+                for iteration in self.available_iterations
+            ]
+        return self._available_times
 
     times = available_times
     iterations = available_iterations
@@ -334,6 +942,110 @@ class BaseOneGridFunction(ABC):
         for iteration in self.available_iterations:
             yield self[iteration]
 
+    def iter_iterations(self, start=None, stop=None, step=1, prefetch=1):
+        """Iterate over the iterations reading the next ones in the background.
+
+        While the caller works on one iteration, the following ones are read
+        by a background thread, so that reading from disk and processing the
+        data overlap. For example::
+
+            for iteration, data in var.iter_iterations(prefetch=2):
+                plot_color(data, ...)
+
+        The iterations read in advance are in memory at the same time as the
+        current one, so fewer iterations are read in advance when they would
+        not fit in the cache of the components (see
+        :py:func:`~.set_components_cache_size`). When the loop is interrupted
+        (e.g., with ``break``), the iterations that were not read yet are not
+        read.
+
+        :param start: Iterations smaller than ``start`` are skipped. If None,
+                      start from the first iteration.
+        :type start: int or None
+        :param stop: Iterations larger than or equal to ``stop`` are skipped.
+                     If None, go until the last iteration.
+        :type stop: int or None
+        :param step: Only one every ``step`` available iterations is read.
+        :type step: int
+        :param prefetch: Maximum number of iterations read in advance. If 0,
+                         iterations are read only when they are needed.
+        :type prefetch: int
+
+        :returns: Iterator over tuples with the iteration and the variable
+                  at that iteration as :py:class:`~.HierarchicalGridData`.
+        :rtype: iterator
+
+        """
+        if step < 1:
+            raise ValueError("step has to be a positive number")
+        if prefetch < 0:
+            raise ValueError("prefetch cannot be negative")
+
+        iterations = [
+            iteration
+            for iteration in self.available_iterations
+            if (start is None or iteration >= start)
+            and (stop is None or iteration < stop)
+        ][::step]
+
+        if prefetch == 0:
+            for iteration in iterations:
+                yield iteration, self[iteration]
+            return
+
+        # We read with only one thread: the iterations have to be read in
+        # order, and most of the reading happens with the lock of h5py anyway
+        pool = ThreadPoolExecutor(max_workers=1)
+        # Iterations being read (or already read) in advance, in order
+        pending = deque()
+        # Size of the largest iteration read so far. We use it to decide how
+        # many iterations fit in the cache.
+        max_nbytes = 0
+
+        try:
+            for index, iteration in enumerate(iterations):
+                if not pending:
+                    pending.append(
+                        pool.submit(
+                            self._read_iteration_as_HierarchicalGridData,
+                            iteration,
+                        )
+                    )
+                data = pending.popleft().result()
+
+                if data is not None:
+                    max_nbytes = max(
+                        max_nbytes,
+                        sum(comp.data.nbytes for comp in data.all_components),
+                    )
+
+                # The cache has to hold the current iteration and the ones
+                # read in advance
+                depth = prefetch
+                if max_nbytes:
+                    depth = min(
+                        prefetch,
+                        self._cache_in_use.max_bytes // max_nbytes - 1,
+                    )
+
+                next_index = index + 1 + len(pending)
+                while len(pending) < depth and next_index < len(iterations):
+                    pending.append(
+                        pool.submit(
+                            self._read_iteration_as_HierarchicalGridData,
+                            iterations[next_index],
+                        )
+                    )
+                    next_index += 1
+
+                yield iteration, data
+        finally:
+            # This is executed also when the caller stops early. We cancel
+            # what has not started and we wait for what is being read.
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=True)
+
     def iteration_at_time(self, time):
         """Return the iteration that corresponds to the given time.
 
@@ -443,95 +1155,530 @@ class BaseOneGridFunction(ABC):
         """
         return total_filesize(self.allfiles, unit=unit)
 
-    def _read_iteration_as_HierarchicalGridData(self, iteration):
-        """Return the data at the given iteration as a :py:class:`~.HierarchicalGridData`.
+    @property
+    def _cache_in_use(self):
+        """Return the cache that bounds the memory used by the components.
+
+        :rtype: :py:class:`~._ComponentsCache`
+        """
+        # getattr is for objects loaded from old pickles
+        cache = getattr(self, "_cache", None)
+        return _components_cache if cache is None else cache
+
+    def _evict_iteration(self, iteration):
+        """Remove from memory the components of the given iteration.
 
         :param iteration: Iteration.
         :type iteration: int
 
-        :returns: Variable at the given iteration as a
-                  :py:class:`~.HierarchicalGridData`.
-        :rtype: :py:class:`~.HierarchicalGridData`
+        """
+        for file_reader in self.alldata.values():
+            for ref_level_reader in file_reader.get(iteration, {}).values():
+                for component in ref_level_reader:
+                    ref_level_reader[component] = None
 
+    def _metadata_state(self):
+        """Return the state of the object without the data read from the files.
+
+        This is used by :py:meth:`~.SimDir.save`. The structure of ``alldata``
+        is kept, but all the components are set to None (as in
+        :py:meth:`~.clear_cache`).
+
+        :returns: State of the object.
+        :rtype: dict
         """
+        state = self.__dict__.copy()
+        state["alldata"] = {
+            filename: {
+                iteration: {
+                    ref_level: dict.fromkeys(ref_level_reader)
+                    for ref_level, ref_level_reader in iteration_reader.items()
+                }
+                for iteration, iteration_reader in file_reader.items()
+            }
+            for filename, file_reader in self.alldata.items()
+        }
+        return state
 
-        uniform_grid_data_components = []
+    def clear_cache(self):
+        """Remove all the cached entries.
 
-        for path in self.allfiles:
-            for ref_level in self._ref_levels_in_file(path, iteration):
-                for comp in self._components_in_file(
-                    path, iteration, ref_level
-                ):
-                    uniform_grid_data_components.append(
-                        self._read_component_as_uniform_grid_data(
-                            path, iteration, ref_level, comp
-                        )
-                    )
+        Every time a component is read, the grid function caches its value
+        (reading can be expensive). The memory used is bounded (see
+        :py:func:`~.set_components_cache_size`), but it may be useful to free
+        it earlier. This method removes all the cached entries.
+        """
+        self._cache_in_use.forget(self)
+        for filename, file_reader in self.alldata.items():
+            for iteration, iteration_reader in file_reader.items():
+                for ref_level, ref_level_reader in iteration_reader.items():
+                    for component in ref_level_reader.keys():
+                        self.alldata[filename][iteration][ref_level][
+                            component
+                        ] = None
 
-        return (
-            grid_data.HierarchicalGridData(uniform_grid_data_components)
-            if uniform_grid_data_components
-            else None
-        )
+    def _copy_for_file(self, path, iteration, keys):
+        """Return a copy of this object that can read only the given components
+        in the file ``path``.
 
-    def get_iteration(self, iteration, default=None):
-        """Return the data at the given iteration as a :py:class:`~.HierarchicalGridData`.
-        If the iteration is not available, return ``default``.
+        The copy is sent to other processes (see
+        :py:meth:`~._read_components_in_parallel`), so it contains only what
+        is needed to read the components, and none of the data already read.
 
+        :param path: Path of the file.
+        :type path: str
         :param iteration: Iteration.
         :type iteration: int
-        :param default: What to return if iteration is not available.
-        :type default: anything
+        :param keys: Refinement levels and components to read.
+        :type keys: list of tuples
 
-        :returns: Variable at the given iteration as a
-                  :py:class:`~.HierarchicalGridData`.
-        :rtype: :py:class:`~.HierarchicalGridData`
+        :returns: Copy of this object.
+        :rtype: :py:class:`~.BaseOneGridFunction`
 
         """
-
-        if iteration not in self.available_iterations:
-            return default
-        return self[iteration]
-
-    def get_time(self, time, default=None):
-        """Return the data at the given time as a :py:class:`~.HierarchicalGridData`.
-        If the time is not available, return ``default``.
+        worker = copy.copy(self)
+        worker.alldata = {path: {iteration: {}}}
+        for ref_level, component in keys:
+            worker.alldata[path][iteration].setdefault(ref_level, {})[
+                component
+            ] = None
+        worker._index = None
+        worker._cache = None
+        return worker
+
+    def _read_components_in_parallel(self, iteration, missing, max_workers):
+        """Read the given components of the given iteration with a pool of
+        processes, one file per task.
+
+        The components are stored in ``self.alldata``.
 
         :param iteration: Iteration.
         :type iteration: int
-        :param default: What to return if time is not available.
-        :type default: anything
-
-        :returns: Variable at the given time as a
-                  :py:class:`~.HierarchicalGridData`.
-        :rtype: :py:class:`~.HierarchicalGridData`
+        :param missing: Dictionary that maps the paths of the files to the
+                        refinement levels and components to read.
+        :type missing: dict
+        :param max_workers: Maximum number of processes. If None, use as many
+                            as the number of processors.
+        :type max_workers: int or None
 
         """
-        if time not in self.available_times:
-            return default
-        return self[self.iteration_at_time(time)]
+        pool = _process_pool(max_workers)
 
-    def __getitem__(self, iteration):
-        if iteration not in self.available_iterations:
-            raise KeyError(f"Iteration {iteration} not present")
+        # The components read by the other processes are sent back as
+        # UniformGridData, so they are the same as the ones we would read here
+        results = {
+            path: pool.apply_async(
+                _read_components_worker,
+                (
+                    self._copy_for_file(path, iteration, keys),
+                    path,
+                    iteration,
+                    keys,
+                ),
+            )
+            for path, keys in missing.items()
+        }
+        for path, result in results.items():
+            for (ref_level, component), uniform_grid_data in zip(
+                missing[path], result.get()
+            ):
+                self.alldata[path][iteration][ref_level][
+                    component
+                ] = uniform_grid_data
 
-        return self._read_iteration_as_HierarchicalGridData(iteration)
+    def _iteration_nbytes(self, iteration):
+        """Return the size of the components of the given iteration that are in
+        memory.
 
-    def read_on_grid(self, iteration, grid, resample=False):
-        """Read an iteration and resample the output on the specified grid.
+        We count all the components of the iteration, not only the ones read
+        last, because other refinement levels may have been read before.
 
-        Warning: this can be computationally expensive!
+        :param iteration: Iteration.
+        :type iteration: int
 
-        :param iteration: requested iteration
+        :returns: Size of the components in memory (in bytes).
+        :rtype: int
+
+        """
+        return sum(
+            comp.data.nbytes
+            for file_reader in self.alldata.values()
+            for ref_level in file_reader.get(iteration, {}).values()
+            for comp in ref_level.values()
+            if comp is not None
+        )
+
+    def _ref_levels_to_read(self, path, iteration, ref_levels):
+        """Return the refinement levels in the file at the given iteration that
+        are among ``ref_levels``.
+
+        :param path: Path of the file.
+        :type path: str
+        :param iteration: Iteration.
+        :type iteration: int
+        :param ref_levels: Refinement levels to read. If None, all of them.
+        :type ref_levels: int, list of int, or None
+
+        :returns: Refinement levels to read.
+        :rtype: list of int
+
+        """
+        # A single refinement level can be passed as an int
+        if ref_levels is not None:
+            ref_levels = np.atleast_1d(ref_levels)
+
+        return [
+            ref_level
+            for ref_level in self._ref_levels_in_file(path, iteration)
+            if ref_levels is None or ref_level in ref_levels
+        ]
+
+    def _read_iteration_as_HierarchicalGridData(
+        self, iteration, ref_levels=None
+    ):
+        """Return the data at the given iteration as a :py:class:`~.HierarchicalGridData`.
+
+        :param iteration: Iteration.
+        :type iteration: int
+        :param ref_levels: Refinement levels to read. If None, read all of
+                           them.
+        :type ref_levels: int, list of int, or None
+
+        :returns: Variable at the given iteration as a
+                  :py:class:`~.HierarchicalGridData`.
+        :rtype: :py:class:`~.HierarchicalGridData`
+
+        """
+
+        # Components that have not been read yet, organized by file
+        missing = {}
+        for path in self.allfiles:
+            for ref_level in self._ref_levels_to_read(
+                path, iteration, ref_levels
+            ):
+                for comp in self._components_in_file(
+                    path, iteration, ref_level
+                ):
+                    if self.alldata[path][iteration][ref_level][comp] is None:
+                        missing.setdefault(path, []).append((ref_level, comp))
+
+        # Whether all the components were already in memory
+        hit = not missing
+
+        # getattr is for objects loaded from old pickles
+        max_workers = getattr(self, "max_workers", 1)
+        # Starting processes has a cost, so we only do it when the components
+        # are in more than one file
+        if max_workers != 1 and len(missing) > 1:
+            self._read_components_in_parallel(iteration, missing, max_workers)
+
+        uniform_grid_data_components = []
+
+        for path in self.allfiles:
+            for ref_level in self._ref_levels_to_read(
+                path, iteration, ref_levels
+            ):
+                for comp in self._components_in_file(
+                    path, iteration, ref_level
+                ):
+                    uniform_grid_data_components.append(
+                        self._read_component_as_uniform_grid_data(
+                            path, iteration, ref_level, comp
+                        )
+                    )
+
+        # The cache may remove this (or other) iterations from memory, but the
+        # components we return are not affected
+        self._cache_in_use.store(
+            self, iteration, self._iteration_nbytes(iteration), hit
+        )
+
+        return (
+            grid_data.HierarchicalGridData(uniform_grid_data_components)
+            if uniform_grid_data_components
+            else None
+        )
+
+    def get_iteration(self, iteration, default=None, ref_levels=None):
+        """Return the data at the given iteration as a :py:class:`~.HierarchicalGridData`.
+        If the iteration is not available, return ``default``.
+
+        When ``ref_levels`` is given, only the datasets of those refinement
+        levels are read, and the :py:class:`~.HierarchicalGridData` contains
+        only them.
+
+        :param iteration: Iteration.
+        :type iteration: int
+        :param default: What to return if iteration is not available.
+        :type default: anything
+        :param ref_levels: Refinement levels to read. If None, read all of
+                           them.
+        :type ref_levels: int, list of int, or None
+
+        :returns: Variable at the given iteration as a
+                  :py:class:`~.HierarchicalGridData`.
+        :rtype: :py:class:`~.HierarchicalGridData`
+
+        :raises ValueError: If the iteration is available, but none of the
+                            requested ``ref_levels`` is (``default`` is
+                            returned only when the iteration is not
+                            available).
+
+        """
+
+        if iteration not in self.available_iterations:
+            return default
+
+        if ref_levels is None:
+            return self[iteration]
+
+        data = self._read_iteration_as_HierarchicalGridData(
+            iteration, ref_levels=ref_levels
+        )
+        if data is None:
+            raise ValueError(
+                f"Refinement levels {ref_levels} not available "
+                f"at iteration {iteration}"
+            )
+        return data
+
+    def get_time(self, time, default=None):
+        """Return the data at the given time as a :py:class:`~.HierarchicalGridData`.
+        If the time is not available, return ``default``.
+
+        :param iteration: Iteration.
+        :type iteration: int
+        :param default: What to return if time is not available.
+        :type default: anything
+
+        :returns: Variable at the given time as a
+                  :py:class:`~.HierarchicalGridData`.
+        :rtype: :py:class:`~.HierarchicalGridData`
+
+        """
+        if time not in self.available_times:
+            return default
+        return self[self.iteration_at_time(time)]
+
+    def __getitem__(self, iteration):
+        if iteration not in self.available_iterations:
+            raise KeyError(f"Iteration {iteration} not present")
+
+        return self._read_iteration_as_HierarchicalGridData(iteration)
+
+    def _component_grid(self, path, iteration, ref_level, component):
+        """Return the grid of the given component, with the ghost zones.
+
+        Derived classes can override this to avoid reading the data.
+
+        :param path: Path of the file.
+        :type path: str
+        :param iteration: Iteration.
+        :type iteration: int
+        :param ref_level: Refinement level.
+        :type ref_level: int
+        :param component: Component.
+        :type component: int
+
+        :returns: Grid of the component.
+        :rtype: :py:class:`~.UniformGrid`
+
+        """
+        return self._read_component_as_uniform_grid_data(
+            path, iteration, ref_level, component
+        ).grid
+
+    def _read_component_slab(
+        self, path, iteration, ref_level, component, slicer
+    ):
+        """Return part of the data of the given component.
+
+        Derived classes can override this to read only the requested part.
+
+        :param path: Path of the file.
+        :type path: str
+        :param iteration: Iteration.
+        :type iteration: int
+        :param ref_level: Refinement level.
+        :type ref_level: int
+        :param component: Component.
+        :type component: int
+        :param slicer: Part of the data to read, as slices along each
+                       dimension (in the same order as the dimensions of the
+                       grid).
+        :type slicer: tuple of slice
+
+        :returns: Data in the given part of the component.
+        :rtype: NumPy array
+
+        """
+        return self._read_component_as_uniform_grid_data(
+            path, iteration, ref_level, component
+        ).data[slicer]
+
+    def _read_component_region(
+        self, path, iteration, ref_level, component, x0, x1
+    ):
+        """Return the part of the given component that covers the region
+        between ``x0`` and ``x1``.
+
+        The ghost zones are not included. The points immediately outside the
+        region are included, so that the data can be interpolated everywhere
+        in the region.
+
+        :param path: Path of the file.
+        :type path: str
+        :param iteration: Iteration.
+        :type iteration: int
+        :param ref_level: Refinement level.
+        :type ref_level: int
+        :param component: Component.
+        :type component: int
+        :param x0: Lowest corner of the region.
+        :type x0: 1d NumPy array
+        :param x1: Highest corner of the region.
+        :type x1: 1d NumPy array
+
+        :returns: Part of the component in the region, or None if the
+                  component does not intersect the region.
+        :rtype: :py:class:`~.UniformGridData` or None
+
+        """
+        # If we have already read the component, we use what we have
+        in_memory = self.alldata[path][iteration][ref_level][component]
+        if in_memory is not None:
+            grid = in_memory.grid
+        else:
+            grid = self._component_grid(path, iteration, ref_level, component)
+
+        if len(x0) != grid.num_dimensions:
+            raise ValueError(
+                f"Region has {len(x0)} dimensions, "
+                f"data has {grid.num_dimensions}"
+            )
+
+        # HierarchicalGridData removes the ghost zones anyway, so we only look
+        # at the interior points
+        interior = grid.ghost_zones_removed()
+
+        # Indices of the points that cover the region
+        start = np.floor((x0 - interior.x0) / interior.dx).astype(int)
+        stop = np.ceil((x1 - interior.x0) / interior.dx).astype(int) + 1
+        start = np.maximum(start, 0)
+        stop = np.minimum(stop, interior.shape)
+
+        if np.any(stop <= start):
+            return None
+
+        # The data still has the ghost zones
+        slicer = tuple(
+            slice(first, last)
+            for first, last in zip(
+                start + grid.num_ghost, stop + grid.num_ghost
+            )
+        )
+
+        if in_memory is not None:
+            data = in_memory.data[slicer]
+        else:
+            data = self._read_component_slab(
+                path, iteration, ref_level, component, slicer
+            )
+
+        return grid_data.UniformGridData(
+            grid_data.UniformGrid(
+                stop - start,
+                x0=interior.x0 + start * interior.dx,
+                dx=interior.dx,
+                ref_level=ref_level,
+                component=component,
+                num_ghost=np.zeros_like(start),
+                time=grid.time,
+                iteration=grid.iteration,
+            ),
+            data,
+        )
+
+    def read_region(self, iteration, x0, x1, ref_levels=None):
+        """Read the data in the region between ``x0`` and ``x1``.
+
+        Only the components that intersect the region are read, and only the
+        part of them that covers the region (when the format allows it, as
+        for HDF5 files). This is much faster than reading the entire
+        iteration when the region is small. The points immediately outside
+        the region are included, so that the data can be interpolated
+        everywhere in the region.
+
+        :param iteration: Iteration.
+        :type iteration: int
+        :param x0: Lowest corner of the region.
+        :type x0: 1d NumPy array or list
+        :param x1: Highest corner of the region.
+        :type x1: 1d NumPy array or list
+        :param ref_levels: Refinement levels to read. If None, read all of
+                           them.
+        :type ref_levels: int, list of int, or None
+
+        :returns: Variable in the region as
+                  :py:class:`~.HierarchicalGridData`.
+        :rtype: :py:class:`~.HierarchicalGridData`
+
+        :raises KeyError: If the iteration is not available.
+        :raises ValueError: If there is no data of the requested
+                            ``ref_levels`` in the region.
+
+        """
+        if iteration not in self.available_iterations:
+            raise KeyError(f"Iteration {iteration} not present")
+
+        x0, x1 = np.atleast_1d(x0), np.atleast_1d(x1)
+
+        if x0.shape != x1.shape:
+            raise ValueError("x0 and x1 have different dimensions")
+
+        if np.any(x1 < x0):
+            raise ValueError("x1 has to be larger than x0")
+
+        components = []
+
+        for path in self.allfiles:
+            for ref_level in self._ref_levels_to_read(
+                path, iteration, ref_levels
+            ):
+                for comp in self._components_in_file(
+                    path, iteration, ref_level
+                ):
+                    region = self._read_component_region(
+                        path, iteration, ref_level, comp, x0, x1
+                    )
+                    if region is not None:
+                        components.append(region)
+
+        if not components:
+            raise ValueError(f"No data in the region between {x0} and {x1}")
+
+        return grid_data.HierarchicalGridData(components)
+
+    def read_on_grid(self, iteration, grid, resample=False, ref_levels=None):
+        """Read an iteration and resample the output on the specified grid.
+
+        Only the data in the region covered by the grid is read (see
+        :py:meth:`~.read_region`).
+
+        Warning: this can be computationally expensive!
+
+        :param iteration: requested iteration
         :type iteration: time
         :param grid:
         :type grid: UniformGrid
         :param resample: Whether to use multilinear interpolation
         :type resample: bool
+        :param ref_levels: Refinement levels to use. If None, use all of them.
+        :type ref_levels: int, list of int, or None
         """
-        return self[iteration].to_UniformGridData_from_grid(
-            grid, resample=resample
-        )
+        return self.read_region(
+            iteration, grid.x0, grid.x1, ref_levels=ref_levels
+        ).to_UniformGridData_from_grid(grid, resample=resample)
 
     # def read_evolution_on_grid(
     #     self,
@@ -580,6 +1727,456 @@ class BaseOneGridFunction(ABC):
     #     )
 
 
+class _ASCIIGridFile:
+    """Read a file produced by CarpetIOASCII, with one or more variables.
+
+    Uncompressed files are not parsed in full. Instead, we find where each
+    block of data (with given iteration, refinement level, and component)
+    starts and ends in the file using the comments that CarpetIOASCII writes
+    before each block, and we parse the blocks only when they are needed (see
+    :py:meth:`~.read_block`). When the file contains more than one variable,
+    the blocks of the iterations read are kept, so that they are shared by all
+    the variables in the file, in whatever order they are read. They count
+    towards the memory of the cache of the components (see
+    :py:func:`~.set_components_cache_size`), which removes them when it needs
+    memory. Files with only one variable keep only the last iteration read.
+
+    Compressed files cannot be accessed at arbitrary positions, so they are
+    parsed entirely the first time one of its variables is requested, and the
+    parsed table is shared by all the variables in the file. The table counts
+    towards the memory of the cache of the components (see
+    :py:func:`~.set_components_cache_size`), which may release it (the file is
+    parsed again when needed). The table is also released when all the
+    variables have been read, or with :py:meth:`~.clear_cache`.
+
+    :ivar path: Path of the file.
+    :type path: str
+    :ivar columns: Dictionary that maps the variables in the file to the
+                   columns where they are stored.
+    :type columns: dict
+
+    """
+
+    # This regex is meant to understand if we have one variable per file or
+    # one group per file, and to understand if we have compression. To see a
+    # detailed explanation, see AllGridFunctions. The only difference here
+    # is that we don't care about the extension, so we have an addition (*)?
+    _rx_filename = re.compile(
+        r"^(([a-zA-Z0-9_]+)-)?([a-zA-Z0-9\[\]_]+).([xyz]+)?.asc(\.(gz|bz2))?$"
+    )
+
+    # What function to use to open the file?
+    # What mode?
+    _decompressor = {
+        None: (open, "r"),
+        "gz": (gopen, "rt"),
+        "bz2": (bopen, "rt"),
+    }
+
+    # Each block of data starts with comments like
+    #
+    # # iteration 0   time 0
+    # # time level 0
+    # # refinement level 0   multigrid level 0   map 0   component 0
+    #
+    # We only use the "# iteration" line to know where the block starts. The
+    # iteration, refinement level, component, and time are read from the
+    # first line with data, so that they are the same as in the full table.
+    _rx_block_start = re.compile(rb"^# iteration ", re.MULTILINE)
+    _rx_data_line = re.compile(rb"^[ \t]*[^#\s][^\n]*", re.MULTILINE)
+
+    def __init__(self, path, index=None):
+        """Constructor.
+
+        Here we scan the header of the file to find the variables.
+
+        :param path: Path of the file.
+        :type path: str
+        :param index: Index where to look for the header of the file.
+        :type index: :py:class:`~.SimDirIndex` or None
+
+        """
+        self.path = str(path)
+
+        filename = os.path.split(self.path)[1]
+        matched = self._rx_filename.match(filename)
+
+        if matched is None:
+            raise RuntimeError(f"Found file with unusual name: {self.path}")
+
+        is_one_file_per_group = matched.group(1) is not None
+
+        compression_method = matched.group(6)
+        opener, opener_mode = self._decompressor[compression_method]
+
+        # These files always have the column format line, and have the data
+        # format line only if they are "one file per group"
+        _, column_description = cached_metadata(
+            index,
+            self.path,
+            "grid_ascii_header",
+            lambda: scan_header(
+                self.path,
+                one_file_per_group=is_one_file_per_group,
+                extended_format=True,
+                opener=opener,
+                opener_mode=opener_mode,
+            ),
+        )
+        # We have two possibilities, one is that the file only contains one
+        # variable, column_description will be the column number. If the
+        # file contains many variables, column_description is a dictionary
+        # that maps variables to their column.
+        if isinstance(column_description, dict):
+            self.columns = column_description
+        else:
+            self.columns = {matched.group(3): column_description}
+
+        self._index = index
+        self.is_compressed = compression_method is not None
+
+        # Positions of the blocks in the file (see block_offsets), and the
+        # range of positions of each iteration
+        self._block_offsets = None
+        self._iteration_positions = None
+        # Blocks of the iterations read with read_block, by iteration
+        self._iterations_read = {}
+
+        # Content of the file, and the variables that still have to read it
+        # (only used when the file cannot be read in blocks)
+        self._table = None
+        self._blocks = None
+        self._pending_variables = set(self.columns)
+
+    def _scan_block_offsets(self):
+        """Find the positions of the blocks of data in the file.
+
+        :returns: List of lists with iteration, refinement level, component,
+                  time, position of the beginning and of the end of the block
+                  (in bytes). The list is empty if the file has no comments to
+                  mark the blocks.
+        :rtype: list of lists
+
+        """
+        size = os.path.getsize(self.path)
+        if size == 0:
+            return []
+
+        # With mmap, the regular expressions scan the file in compiled code
+        # without loading it in memory
+        with open(self.path, "rb") as file_, mmap.mmap(
+            file_.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mapped:
+            starts = [
+                match.start()
+                for match in self._rx_block_start.finditer(mapped)
+            ]
+            if not starts:
+                return []
+            ends = starts[1:] + [size]
+
+            offsets = []
+            for start, end in zip(starts, ends):
+                first_line = self._rx_data_line.search(mapped, start, end)
+                # Blocks without data
+                if first_line is None:
+                    continue
+                # 1:it 2:tl 3:rl 4:c 5:ml 6:ix 7:iy 8:iz 9:time
+                values = first_line.group().split()
+                iteration, ref_level, component = (
+                    int(values[0]),
+                    int(values[2]),
+                    int(values[3]),
+                )
+                key = [iteration, ref_level, component]
+                # Consecutive blocks with the same iteration, refinement
+                # level, and component are merged
+                if offsets and offsets[-1][:3] == key:
+                    offsets[-1][5] = end
+                else:
+                    offsets.append(key + [float(values[8]), start, end])
+        return offsets
+
+    @property
+    def block_offsets(self):
+        """Return the positions of the blocks of data in the file.
+
+        This is None for compressed files, or for files without the comments
+        that mark the beginning of the blocks.
+
+        :returns: List of lists with iteration, refinement level, component,
+                  time, position of the beginning and of the end of the block
+                  (in bytes).
+        :rtype: list of lists or None
+
+        """
+        if self.is_compressed:
+            return None
+        if self._block_offsets is None:
+            self._block_offsets = cached_metadata(
+                self._index,
+                self.path,
+                "grid_ascii_blocks",
+                self._scan_block_offsets,
+            )
+        # An empty list means that the file cannot be read in blocks
+        return self._block_offsets or None
+
+    def _parse(self):
+        """Read the entire file and split it in blocks with the same
+        iteration, refinement level, and component."""
+
+        # CarpetIOASCII files have the columns
+        # 1:it 2:tl 3:rl 4:c 5:ml 6:ix 7:iy 8:iz 9:time 10:x 11:y 12:z 13:data
+        # (and more data columns if there are multiple variables). Comments
+        # and blank lines are ignored by read_table.
+        table = read_table(self.path)
+
+        if table.shape[1] == 0:
+            self._table, self._blocks = table, []
+            return
+
+        self._table = table
+        self._blocks = self._split_blocks(table)
+
+    @staticmethod
+    def _split_blocks(table):
+        """Split a table read from a CarpetIOASCII file in blocks with the
+        same iteration, refinement level, and component.
+
+        :param table: Content of the file, one row for each column.
+        :type table: 2D NumPy array
+
+        :returns: List of tuples with iteration, refinement level, component,
+                  time, first and last (excluded) column of the block in the
+                  table.
+        :rtype: list of tuples
+
+        """
+        iterations, ref_levels, components = table[0], table[2], table[3]
+
+        # A new block starts when iteration, refinement level, or component
+        # change. We find all the change points at once.
+        changes = (
+            (np.diff(iterations) != 0)
+            | (np.diff(ref_levels) != 0)
+            | (np.diff(components) != 0)
+        )
+        starts = np.concatenate(([0], np.flatnonzero(changes) + 1))
+        ends = np.append(starts[1:], table.shape[1])
+
+        return [
+            (
+                int(iterations[start]),
+                int(ref_levels[start]),
+                int(components[start]),
+                # Each block has its own time
+                table[8][start],
+                start,
+                end,
+            )
+            for start, end in zip(starts, ends)
+        ]
+
+    def blocks(self, variable, cache=None):
+        """Return the blocks of data of the given variable.
+
+        Once all the variables in the file have been read, the parsed table
+        is released.
+
+        :param variable: Variable to read.
+        :type variable: str
+        :param cache: Cache that bounds the memory used by the parsed table.
+                      If None, use the one shared by all the grid functions.
+        :type cache: :py:class:`~._ComponentsCache` or None
+
+        :returns: List of tuples with iteration, refinement level, component,
+                  time, coordinates (with shape (3, number of points)), and
+                  values of the variable.
+        :rtype: list of tuple
+
+        """
+        if variable not in self.columns:
+            raise KeyError(f"{variable} not in {self.path}")
+
+        if cache is None:
+            cache = _components_cache
+
+        # We take the table and the blocks together, because the cache may
+        # release them at any time
+        table, table_blocks = self._table, self._blocks
+        if table is None:
+            self._parse()
+            table, table_blocks = self._table, self._blocks
+            cache.track(self, None, table.nbytes)
+
+        column = self.columns[variable]
+        ret = [
+            (
+                iteration,
+                ref_level,
+                component,
+                time,
+                table[9:12, start:end],
+                table[column, start:end],
+            )
+            for iteration, ref_level, component, time, start, end in table_blocks
+        ]
+
+        self._pending_variables.discard(variable)
+        if not self._pending_variables:
+            # Nobody else needs the table (the blocks we return are views, so
+            # the data is kept alive until they are used)
+            self.clear_cache(cache)
+
+        return ret
+
+    def _evict_iteration(self, iteration):
+        """Release the parsed data, when the cache of the components needs
+        memory.
+
+        :param iteration: What to release: the blocks of the given iteration,
+                          or the entire table read from a compressed file (if
+                          None).
+        :type iteration: int or None
+
+        """
+        if iteration is None:
+            self._table = None
+            self._blocks = None
+        else:
+            getattr(self, "_iterations_read", {}).pop(iteration, None)
+
+    def clear_cache(self, cache=None):
+        """Release the parsed data.
+
+        :param cache: Cache where the parsed data is counted. If None, use the
+                      one shared by all the grid functions.
+        :type cache: :py:class:`~._ComponentsCache` or None
+
+        """
+        if cache is None:
+            cache = _components_cache
+        cache.forget(self)
+        self._table = None
+        self._blocks = None
+        self._iterations_read = {}
+
+    def _read_iteration(self, iteration):
+        """Read all the blocks of the given iteration.
+
+        The blocks of one iteration are next to each other in the file, so we
+        read them all at once.
+
+        :param iteration: Iteration.
+        :type iteration: int
+
+        :returns: Dictionary that maps refinement level and component to the
+                  content of the corresponding block.
+        :rtype: dict
+
+        """
+        if self._iteration_positions is None:
+            self._iteration_positions = {}
+            for block_iteration, _, _, _, start, end in self.block_offsets:
+                first, last = self._iteration_positions.get(
+                    block_iteration, (start, end)
+                )
+                self._iteration_positions[block_iteration] = (
+                    min(first, start),
+                    max(last, end),
+                )
+
+        if iteration not in self._iteration_positions:
+            raise KeyError(f"Iteration {iteration} not in {self.path}")
+
+        table = read_table_range(
+            self.path, *self._iteration_positions[iteration]
+        )
+
+        ret = {}
+        for (
+            block_iteration,
+            ref_level,
+            component,
+            _,
+            start,
+            end,
+        ) in self._split_blocks(table):
+            # We keep the first block with the given key, as when we read
+            # the entire file
+            if block_iteration == iteration:
+                ret.setdefault((ref_level, component), table[:, start:end])
+        return ret
+
+    def read_block(
+        self, variable, iteration, ref_level, component, cache=None
+    ):
+        """Read the given block of data of the given variable.
+
+        The file must have :py:attr:`~.block_offsets`. The blocks of the
+        iteration are kept, so that they do not have to be parsed again for
+        the other variables in the file (or for the other components).
+
+        :param variable: Variable to read.
+        :type variable: str
+        :param iteration: Iteration.
+        :type iteration: int
+        :param ref_level: Refinement level.
+        :type ref_level: int
+        :param component: Component.
+        :type component: int
+        :param cache: Cache that bounds the memory used by the blocks kept.
+                      If None, use the one shared by all the grid functions.
+        :type cache: :py:class:`~._ComponentsCache` or None
+
+        :returns: Time, coordinates (with shape (3, number of points)), and
+                  values of the variable.
+        :rtype: tuple
+
+        """
+        if variable not in self.columns:
+            raise KeyError(f"{variable} not in {self.path}")
+
+        # getattr is for objects loaded from old pickles
+        iterations_read = getattr(self, "_iterations_read", {})
+        blocks = iterations_read.get(iteration)
+
+        if blocks is None:
+            blocks = self._read_iteration(iteration)
+            if len(self.columns) == 1:
+                # Nobody else is going to read this iteration, so we keep it
+                # only for the other components
+                self._iterations_read = {iteration: blocks}
+            else:
+                iterations_read[iteration] = blocks
+                self._iterations_read = iterations_read
+                (_components_cache if cache is None else cache).track(
+                    self,
+                    iteration,
+                    sum(block.nbytes for block in blocks.values()),
+                )
+
+        if (ref_level, component) not in blocks:
+            raise KeyError(
+                f"Iteration {iteration}, refinement level {ref_level}, "
+                f"component {component} not in {self.path}"
+            )
+
+        table = blocks[(ref_level, component)]
+        return table[8][0], table[9:12], table[self.columns[variable]]
+
+    def __getstate__(self):
+        # We do not save the parsed data
+        state = self.__dict__.copy()
+        state["_table"] = None
+        state["_blocks"] = None
+        state["_iterations_read"] = {}
+        # For objects from old pickles
+        state.pop("_cached", None)
+        return state
+
+
 class OneGridFunctionASCII(BaseOneGridFunction):
     """Read grid data produced by CarpetASCII.
 
@@ -594,23 +2191,19 @@ class OneGridFunctionASCII(BaseOneGridFunction):
 
     """
 
-    # TODO (REFACTORING): Avoid reading files twice.
-    #
-    # This class has to read the all files. When there are multiple variables in
-    # one file, it would be better to avoid reading again the various files (if
-    # we have already read them). Maybe we can add another level in the class
-    # hierarchy that contains all the information for a given file, and produces
-    # transparently OneGridFunctionASCII objects upon request.
-
     # What function to use to open the file?
     # What mode?
-    _decompressor = {
-        None: (open, "r"),
-        "gz": (gopen, "rt"),
-        "bz2": (bopen, "rt"),
-    }
-
-    def __init__(self, allfiles, var_name, num_ghost=None):
+    _decompressor = _ASCIIGridFile._decompressor
+
+    def __init__(
+        self,
+        allfiles,
+        var_name,
+        num_ghost=None,
+        index=None,
+        file_readers=None,
+        cache=None,
+    ):
         """Constructor.
 
         :param allfiles: Paths of files associated to the variable.
@@ -619,241 +2212,211 @@ class OneGridFunctionASCII(BaseOneGridFunction):
         :type var_name: str
         :param num_ghost: Number of ghost zones in each direction.
         :type num_ghost: 1d NumPy array
+        :param index: Index where to look for the headers of the files.
+        :type index: :py:class:`~.SimDirIndex` or None
+        :param file_readers: Dictionary that maps paths to the objects that
+                             read them. When there are multiple variables in
+                             one file, sharing this dictionary across the
+                             variables ensures that each file is parsed only
+                             once. If None, a new one is created.
+        :type file_readers: dict or None
+        :param cache: Cache that bounds the memory used by the components
+                      read. If None, use the one shared by all the grid
+                      functions (see :py:func:`~.set_components_cache_size`).
+        :type cache: :py:class:`~._ComponentsCache` or None
 
         """
 
         self._iterations_to_times = {}
         self.num_ghost = num_ghost
 
-        super().__init__(allfiles, var_name)
+        # _file_readers is possibly shared with other variables (see
+        # AllGridFunctions)
+        self._file_readers = {} if file_readers is None else file_readers
+
+        super().__init__(allfiles, var_name, index=index, cache=cache)
+
+    def _file_reader(self, path):
+        """Return the :py:class:`~._ASCIIGridFile` that reads ``path``.
+
+        :param path: Path of the file.
+        :type path: str
+
+        :returns: Reader of the file.
+        :rtype: :py:class:`~._ASCIIGridFile`
+
+        """
+        if path not in self._file_readers:
+            self._file_readers[path] = _ASCIIGridFile(path, index=self._index)
+        return self._file_readers[path]
+
+    def _copy_for_file(self, path, iteration, keys):
+        """Return a copy of this object that can read only the given components
+        in the file ``path``.
+
+        :param path: Path of the file.
+        :type path: str
+        :param iteration: Iteration.
+        :type iteration: int
+        :param keys: Refinement levels and components to read.
+        :type keys: list of tuples
+
+        :returns: Copy of this object.
+        :rtype: :py:class:`~.OneGridFunctionASCII`
+
+        """
+        worker = super()._copy_for_file(path, iteration, keys)
+        # We do not send the readers of the other files (and the index)
+        file_reader = copy.copy(self._file_reader(path))
+        file_reader._index = None
+        worker._file_readers = {path: file_reader}
+        return worker
+
+    def clear_cache(self):
+        """Remove all the cached entries.
+
+        This also releases the data parsed by the readers of the files of this
+        variable (which may be shared with other variables).
+        """
+        super().clear_cache()
+        for path in self.allfiles:
+            if path in self._file_readers:
+                self._file_readers[path].clear_cache(self._cache_in_use)
 
     def _parse_file(self, path):
         """Read the content of the given file.
 
-        At the moment, we read the entire file line by line, which is very
-        inefficient.
+        The file is read by the :py:class:`~._ASCIIGridFile` associated to the
+        path. For uncompressed files, we only record what blocks (with given
+        iteration, refinement level, and component) are in the file, and we
+        read them when they are requested. Compressed files are read entirely
+        and each block becomes a :py:class:`~.UniformGridData`.
 
         :param path: Path of the file to read.
         :type path: str
 
         """
+        file_reader = self._file_reader(path)
 
-        # First we parse the header to find the column description, then we read
-        # the ENTIRE file. This is very inefficient, but it is not too hard to
-        # implement.
+        alldata_file = self.alldata.setdefault(path, {})
 
-        # This regex is meant to understand if we have one variable per file or
-        # one group per file, and to understand if we have compression. To see a
-        # detailed explanation, see AllGridFunctions. The only difference here
-        # is that we don't care about the extension, so we have an addition (*)?
-        rx_filename = re.compile(
-            r"^(([a-zA-Z0-9_]+)-)?([a-zA-Z0-9\[\]_]+).([xyz]+)?.asc(\.(gz|bz2))?$"
-        )
+        block_offsets = file_reader.block_offsets
 
-        filename = os.path.split(path)[1]
-        matched = rx_filename.match(filename)
+        if block_offsets is not None:
+            for iteration, ref_level, component, time, _, _ in block_offsets:
+                alldata_file.setdefault(iteration, {}).setdefault(
+                    ref_level, {}
+                ).setdefault(component, None)
+                self._iterations_to_times.setdefault(iteration, time)
+            return
 
-        if matched is None:
-            raise RuntimeError(f"Found file with unusual name: {path}")
+        self._parse_entire_file(path)
 
-        is_one_file_per_group = matched.group(1) is not None
+        # These iterations were not requested, but they are in memory, so
+        # they count towards the budget of the cache (which may remove them
+        # right away)
+        for iteration in alldata_file:
+            self._cache_in_use.track(
+                self, iteration, self._iteration_nbytes(iteration)
+            )
 
-        compression_method = matched.group(6)
-        opener, opener_mode = OneGridFunctionASCII._decompressor[
-            compression_method
-        ]
+    def _parse_entire_file(self, path, iteration=None):
+        """Read the blocks in the given file as :py:class:`~.UniformGridData`.
 
-        # These files always have the column format line, and have the data
-        # format line only if they are "one file per group"
-        _, column_description = scan_header(
-            path,
-            one_file_per_group=is_one_file_per_group,
-            extended_format=True,
-            opener=opener,
-            opener_mode=opener_mode,
-        )
-        # We have two possibilities, one is that the file only contains one
-        # variable, column_description will be the column number. If the
-        # file contains many variables, column_description is a dictionary
-        # that maps variables to their column.
-        if isinstance(column_description, dict):
-            # The variable we work with is column_description so we overwrite it
-            # to be the number of column with the data we are interested in
-            column_description = column_description[self.var_name]
-
-        # Now we read the entire file, line by line. This is the most
-        # inefficient way possible. But at least, it is reasonably
-        # straightforward to implement. If you are reading this comment and you
-        # want to improve this, feel free to do it.
-
-        def current_data_to_UniformGridData(
-            current_x,
-            current_y,
-            current_z,
-            current_data,
-            current_time,
-            current_iteration,
-            current_component,
-            current_ref_level,
+        :param path: Path of the file to read.
+        :type path: str
+        :param iteration: If not None, only the blocks of this iteration are
+                          turned into :py:class:`~.UniformGridData` (the
+                          entire file is parsed anyway).
+        :type iteration: int or None
+
+        """
+        alldata_file = self.alldata.setdefault(path, {})
+
+        for (
+            block_iteration,
+            ref_level,
+            component,
+            time,
+            coordinates,
+            data,
+        ) in self._file_reader(path).blocks(
+            self.var_name, cache=self._cache_in_use
         ):
-            # First, we compute x0 and x1
-            x0_3d = np.asarray(
-                [
-                    np.amin(current_x),
-                    np.amin(current_y),
-                    np.amin(current_z),
-                ]
-            )
-            x1_3d = np.array(
-                [
-                    np.amax(current_x),
-                    np.amax(current_y),
-                    np.amax(current_z),
-                ]
-            )
+            self._iterations_to_times.setdefault(block_iteration, time)
 
-            # Now we find the interesting dimensions
-            dimensions_in_data = x0_3d != x1_3d
+            alldata_ref_level = alldata_file.setdefault(
+                block_iteration, {}
+            ).setdefault(ref_level, {})
 
-            # With unique we find the real data
-            shape_3d = [
-                len(np.unique(current_x)),
-                len(np.unique(current_y)),
-                len(np.unique(current_z)),
-            ]
+            if iteration is not None and block_iteration != iteration:
+                # We only record that the block exists
+                alldata_ref_level.setdefault(component, None)
+                continue
 
-            shape = np.asarray(shape_3d)[dimensions_in_data]
-            x0 = np.asarray(x0_3d)[dimensions_in_data]
-            x1 = np.asarray(x1_3d)[dimensions_in_data]
-
-            var_data = np.array(current_data).reshape(tuple(shape[::-1]))
-
-            grid = grid_data.UniformGrid(
-                shape,
-                x0=x0,
-                x1=x1,
-                num_ghost=self.num_ghost,
-                component=current_component,
-                ref_level=current_ref_level,
-                time=current_time,
-                iteration=current_iteration,
-            )
+            # If the same component appears twice, we keep the first one
+            if alldata_ref_level.get(component) is None:
+                uniform_grid_data = self._block_to_uniform_grid_data(
+                    coordinates,
+                    data,
+                    time,
+                    block_iteration,
+                    ref_level,
+                    component,
+                )
+                alldata_ref_level[component] = uniform_grid_data
 
-            return grid_data.UniformGridData(grid, np.transpose(var_data))
-
-        # We are going to assume that the iteration column is the first
-        with opener(path, opener_mode) as fil:
-            # We use these variables as local variables. We are going to aggregate
-            # the data read here, and reset it when we find a blank line
-            current_iteration = None
-            current_ref_level = None
-            current_component = None
-            current_x = []
-            current_y = []
-            current_z = []
-            current_data = []
-            # We scan the entire file line by line
-            for line in fil:
-                # Skip header
-                if not line[0].isdigit():
-                    # We don't care about lines that don't start with a number
-                    continue
+    def _block_to_uniform_grid_data(
+        self, coordinates, data, time, iteration, ref_level, component
+    ):
+        """Return the :py:class:`~.UniformGridData` corresponding to a block of
+        an ASCII file.
 
-                # Here are can assume that this is a line with data
-                line_data = line.split()
-                line_data = list(map(float, line_data))
-                if current_iteration is None:
-                    current_iteration = line_data[0]
+        :param coordinates: x, y, and z coordinates of the points.
+        :type coordinates: 2D NumPy array with shape (3, number of points)
+        :param data: Values of the variable at the points.
+        :type data: 1D NumPy array
+        :param time: Time.
+        :type time: float
+        :param iteration: Iteration.
+        :type iteration: int
+        :param ref_level: Refinement level.
+        :type ref_level: int
+        :param component: Component.
+        :type component: int
 
-                if current_ref_level is None:
-                    current_ref_level = line_data[2]
+        :returns: Data of the block.
+        :rtype: :py:class:`~.UniformGridData`
 
-                if current_component is None:
-                    current_component = line_data[3]
+        """
+        # First, we compute x0 and x1
+        x0_3d = np.amin(coordinates, axis=1)
+        x1_3d = np.amax(coordinates, axis=1)
 
-                # If iteration, component, or refinement level changes, we
-                # write the data, else we continue reading
-                if (
-                    line_data[0] != current_iteration
-                    or line_data[2] != current_ref_level
-                    or line_data[3] != current_component
-                ):
-                    alldata_file = self.alldata.setdefault(path, {})
-                    alldata_iteration = alldata_file.setdefault(
-                        int(current_iteration), {}
-                    )
-                    alldata_ref_level = alldata_iteration.setdefault(
-                        int(current_ref_level), {}
-                    )
+        # Now we find the interesting dimensions
+        dimensions_in_data = x0_3d != x1_3d
 
-                    current_time = line_data[8]
-
-                    uniform_grid_data = current_data_to_UniformGridData(
-                        current_x,
-                        current_y,
-                        current_z,
-                        current_data,
-                        current_time,
-                        current_iteration,
-                        current_component,
-                        current_ref_level,
-                    )
+        # With unique we find the real data
+        shape_3d = [len(np.unique(coords)) for coords in coordinates]
 
-                    alldata_ref_level.setdefault(
-                        int(current_component), uniform_grid_data
-                    )
+        shape = np.asarray(shape_3d)[dimensions_in_data]
+        x0 = x0_3d[dimensions_in_data]
+        x1 = x1_3d[dimensions_in_data]
 
-                    # Write iterations_to_time
-                    if current_iteration not in self._iterations_to_times:
-                        self._iterations_to_times[
-                            current_iteration
-                        ] = current_time
-
-                    # Reset everything
-                    current_iteration = line_data[0]
-                    current_ref_level = line_data[2]
-                    current_component = line_data[3]
-                    current_x = []
-                    current_y = []
-                    current_z = []
-                    current_data = []
-
-                # We still have to read the data on this line even if we
-                # "are done with a group"
-                current_x.append(line_data[9])
-                current_y.append(line_data[10])
-                current_z.append(line_data[11])
-
-                current_data.append(line_data[column_description])
-
-            # Here we take care of the last piece of data
-            if len(current_data) > 0:
-                if current_iteration not in self._iterations_to_times:
-                    current_time = line_data[8]
-                    self._iterations_to_times[current_iteration] = current_time
-
-                alldata_file = self.alldata.setdefault(path, {})
-                alldata_iteration = alldata_file.setdefault(
-                    int(current_iteration), {}
-                )
-                alldata_ref_level = alldata_iteration.setdefault(
-                    int(current_ref_level), {}
-                )
+        var_data = np.array(data).reshape(tuple(shape[::-1]))
 
-                uniform_grid_data = current_data_to_UniformGridData(
-                    current_x,
-                    current_y,
-                    current_z,
-                    current_data,
-                    current_time,
-                    current_iteration,
-                    current_component,
-                    current_ref_level,
-                )
+        grid = grid_data.UniformGrid(
+            shape,
+            x0=x0,
+            x1=x1,
+            num_ghost=self.num_ghost,
+            component=component,
+            ref_level=ref_level,
+            time=time,
+            iteration=iteration,
+        )
 
-                alldata_ref_level.setdefault(
-                    int(current_component), uniform_grid_data
-                )
+        return grid_data.UniformGridData(grid, np.transpose(var_data))
 
     def _read_component_as_uniform_grid_data(
         self, path, iteration, ref_level, component
@@ -874,7 +2437,27 @@ class OneGridFunctionASCII(BaseOneGridFunction):
 
         """
 
-        # We have already read the files, so we just return it
+        if self.alldata[path][iteration][ref_level][component] is None:
+            file_reader = self._file_reader(path)
+            if file_reader.block_offsets is None:
+                # We have to read the entire file again (e.g., after
+                # clear_cache, or after the cache removed the iteration), but
+                # we only keep the requested iteration
+                self._parse_entire_file(path, iteration=iteration)
+            else:
+                time, coordinates, data = file_reader.read_block(
+                    self.var_name,
+                    iteration,
+                    ref_level,
+                    component,
+                    cache=self._cache_in_use,
+                )
+                self.alldata[path][iteration][ref_level][
+                    component
+                ] = self._block_to_uniform_grid_data(
+                    coordinates, data, time, iteration, ref_level, component
+                )
+
         return self.alldata[path][iteration][ref_level][component]
 
     def time_at_iteration(self, iteration):
@@ -936,13 +2519,29 @@ class OneGridFunctionH5(BaseOneGridFunction):
     ([ ]c=(\d+))?       # Component
     """
 
-    def __init__(self, allfiles, var_name):
+    rx_group_name = re.compile(_pattern_group_name, re.VERBOSE)
+
+    def __init__(
+        self, allfiles, var_name, index=None, catalogs=None, cache=None
+    ):
         """Constructor.
 
         :param allfiles: Paths of files associated to the variable.
         :type allfiles: list of str
         :param var_name: Variable name.
         :type var_name: str
+        :param index: Index where to look for the metadata of the files.
+        :type index: :py:class:`~.SimDirIndex` or None
+        :param catalogs: Dictionary that maps paths to the description of
+                         their content (see :py:func:`~._scan_h5_catalog`).
+                         Sharing this dictionary across variables ensures
+                         that each file is scanned only once. If None, a new
+                         one is created.
+        :type catalogs: dict or None
+        :param cache: Cache that bounds the memory used by the components
+                      read. If None, use the one shared by all the grid
+                      functions (see :py:func:`~.set_components_cache_size`).
+        :type cache: :py:class:`~._ComponentsCache` or None
 
         """
 
@@ -951,9 +2550,17 @@ class OneGridFunctionH5(BaseOneGridFunction):
         self.thorn_name = None
         self.map = None
 
-        self.rx_group_name = re.compile(self._pattern_group_name, re.VERBOSE)
+        # _catalogs is possibly shared with other variables (see
+        # AllGridFunctions)
+        self._catalogs = {} if catalogs is None else catalogs
+
+        # Times of the iterations, from the catalogs of the files (filled by
+        # _parse_file), and the same information as sorted arrays (see
+        # _time_table)
+        self._iterations_to_times = {}
+        self._times_table = None
 
-        super().__init__(allfiles, var_name)
+        super().__init__(allfiles, var_name, index=index, cache=cache)
 
         # super() will fill the other variables that we need for dataset_format
         if self.map is None:
@@ -971,10 +2578,10 @@ class OneGridFunctionH5(BaseOneGridFunction):
         # HDF5 files can contain ghostzones or not. Here, we can that all the
         # files have the same behavior (they all contain, or they all don't)
         #
-        # self._are_ghostzones_in_file(path) returns True or False, so this
-        # is a set with True, False or a mix
+        # self._cached_are_ghostzones_in_file(path) returns True or False, so
+        # this is a set with True, False or a mix
         ghost_in_files = {
-            self._are_ghostzones_in_file(path) for path in self.allfiles
+            self._cached_are_ghostzones_in_file(path) for path in self.allfiles
         }
 
         # Here we check that we only have True or False
@@ -987,6 +2594,65 @@ class OneGridFunctionH5(BaseOneGridFunction):
         # False), so we pick that (with tuple unpacking)
         (self.are_ghostzones_in_files,) = ghost_in_files
 
+    def _add_files(self, allfiles):
+        """Add the given files to the ones associated to the variable.
+
+        The data already read from the other files is kept.
+
+        :param allfiles: Paths of the new files.
+        :type allfiles: list of str
+
+        """
+        new_files = [path for path in allfiles if path not in self.allfiles]
+
+        if any(
+            self._cached_are_ghostzones_in_file(path)
+            != self.are_ghostzones_in_files
+            for path in new_files
+        ):
+            raise ValueError(
+                "Inconsistent IOHDF5::output_ghost_points across files"
+            )
+
+        super()._add_files(new_files)
+        self._times_table = None
+
+    def _catalog(self, path):
+        """Return the description of the content of the file ``path`` (see
+        :py:func:`~._scan_h5_catalog`).
+
+        :param path: Path of the file.
+        :type path: str
+
+        :returns: Catalog of the file.
+        :rtype: dict
+
+        """
+        # setdefault is for objects loaded from old pickles
+        return _h5_catalog(
+            path, self._index, self.__dict__.setdefault("_catalogs", {})
+        )
+
+    def _copy_for_file(self, path, iteration, keys):
+        """Return a copy of this object that can read only the given components
+        in the file ``path``.
+
+        :param path: Path of the file.
+        :type path: str
+        :param iteration: Iteration.
+        :type iteration: int
+        :param keys: Refinement levels and components to read.
+        :type keys: list of tuples
+
+        :returns: Copy of this object.
+        :rtype: :py:class:`~.OneGridFunctionH5`
+
+        """
+        worker = super()._copy_for_file(path, iteration, keys)
+        # The catalogs are not needed to read the datasets
+        worker._catalogs = {}
+        return worker
+
     def _parse_file(self, path):
         """Read the content of the given file (without reading the data).
 
@@ -996,53 +2662,41 @@ class OneGridFunctionH5(BaseOneGridFunction):
         """
         # This will give us an overview of what is available in the provided
         # file. We keep a collection of all these in the variable self.alldata
-        with h5py.File(path, "r") as f:
-            for group in f.keys():
-                matched = self.rx_group_name.match(group)
-                # If this is not an interesting group, just skip it
-                if not matched:
-                    continue
-
-                (
-                    thorn_name,
-                    var_name,
-                    iteration,
-                    time_level,
-                    map_,
-                    _,
-                    ref_level,
-                    _,
-                    component,
-                ) = matched.groups()
-
-                if var_name != self.var_name:
-                    continue
+        #
+        # The catalog can come from the index or from another variable in the
+        # same file, in which case we do not have to open the file.
+        var_info = self._catalog(path)["variables"].get(self.var_name)
 
-                time_level = int(time_level)
+        if var_info is None:
+            return
 
-                # We only care about the current timelevel
-                if time_level != 0:
-                    continue
+        if self.thorn_name is None:
+            self.thorn_name = var_info["thorn"]
 
-                if self.thorn_name is None:
-                    self.thorn_name = thorn_name
+        if self.map is None:
+            self.map = var_info["map"]
 
-                if self.map is None:
-                    self.map = map_
+        # Here is where we prepare are nested alldata dictionary
+        alldata_file = self.alldata.setdefault(path, {})
 
-                component = -1 if matched.group(9) is None else int(component)
-                # This is important to support grid arrays, which do not have a
-                # refinement level
-                ref_level = -1 if matched.group(7) is None else int(ref_level)
+        for iteration, ref_level, component in var_info["entries"]:
+            alldata_iteration = alldata_file.setdefault(iteration, {})
+            alldata_ref_level = alldata_iteration.setdefault(ref_level, {})
 
-                # Here is where we prepare are nested alldata dictionary
-                alldata_file = self.alldata.setdefault(path, {})
-                alldata_iteration = alldata_file.setdefault(int(iteration), {})
-                alldata_ref_level = alldata_iteration.setdefault(ref_level, {})
+            # We set the actual data to None, and we will read it in
+            # _read_component_as_uniform_grid_data upon request
+            alldata_ref_level.setdefault(component, None)
 
-                # We set the actual data to None, and we will read it in
-                # _read_component_as_uniform_grid_data upon request
-                alldata_ref_level.setdefault(int(component), None)
+        # Catalogs stored in old indices do not have the times. In that case,
+        # they are read from the datasets when needed (in _time_table).
+        #
+        # setdefault is for objects loaded from old pickles
+        iterations_to_times = self.__dict__.setdefault(
+            "_iterations_to_times", {}
+        )
+        for iteration, time in self._catalog(path).get("times", []):
+            if iteration in alldata_file:
+                iterations_to_times.setdefault(iteration, time)
 
     def _grid_from_dataset(self, dataset, iteration, ref_level, component):
         """Return a :py:class:`~.UniformGrid` from a given HDF5 dataset.
@@ -1108,7 +2762,9 @@ class OneGridFunctionH5(BaseOneGridFunction):
         """
         ref_level_str = f" rl={ref_level}" if (ref_level >= 0) else ""
         component_str = f" c={component}" if (component >= 0) else ""
-        with h5py.File(path, "r") as f:
+        # The file is taken from the pool of open files, so it is not closed
+        # here
+        with _h5_files.open(path) as f:
             try:
                 yield f[
                     self.dataset_format
@@ -1153,6 +2809,79 @@ class OneGridFunctionH5(BaseOneGridFunction):
 
         return self.alldata[path][iteration][ref_level][component]
 
+    def _component_grid(self, path, iteration, ref_level, component):
+        """Return the grid of the given component, with the ghost zones.
+
+        Only the attributes of the dataset are read.
+
+        :param path: Path of the file.
+        :type path: str
+        :param iteration: Iteration.
+        :type iteration: int
+        :param ref_level: Refinement level.
+        :type ref_level: int
+        :param component: Component.
+        :type component: int
+
+        :returns: Grid of the component.
+        :rtype: :py:class:`~.UniformGrid`
+
+        """
+        with self._get_dataset(
+            path, iteration, ref_level, component
+        ) as dataset:
+            return self._grid_from_dataset(
+                dataset, iteration, ref_level, component
+            )
+
+    def _read_component_slab(
+        self, path, iteration, ref_level, component, slicer
+    ):
+        """Return part of the data of the given component.
+
+        Only the requested part is read from the file.
+
+        :param path: Path of the file.
+        :type path: str
+        :param iteration: Iteration.
+        :type iteration: int
+        :param ref_level: Refinement level.
+        :type ref_level: int
+        :param component: Component.
+        :type component: int
+        :param slicer: Part of the data to read, as slices along each
+                       dimension (in the same order as the dimensions of the
+                       grid).
+        :type slicer: tuple of slice
+
+        :returns: Data in the given part of the component.
+        :rtype: NumPy array
+
+        """
+        with self._get_dataset(
+            path, iteration, ref_level, component
+        ) as dataset:
+            # The dimensions in the dataset are in the opposite order (as in
+            # _read_component_as_uniform_grid_data)
+            return np.transpose(dataset[slicer[::-1]])
+
+    def _cached_are_ghostzones_in_file(self, path):
+        """Return whether the ghostzones were output or not, using the catalog
+        of the file.
+
+        :param path: File to inspect.
+        :type path: str
+
+        :returns: Whether ``path`` contains ghost zones.
+        :rtype: bool
+
+        """
+        ghost_zones = self._catalog(path)["ghost_zones"]
+        if ghost_zones is None:
+            # This will raise an error
+            ghost_zones = self._are_ghostzones_in_file(path)
+        return ghost_zones
+
     @staticmethod
     def _are_ghostzones_in_file(path):
         """Return whether the ghostzones were output or not.
@@ -1172,7 +2901,7 @@ class OneGridFunctionH5(BaseOneGridFunction):
         # to no, the ghostzones are not output.
 
         # The default value of these parameters is yes
-        with h5py.File(path, "r") as f:
+        with _h5_files.open(path) as f:
             parameters = f["Parameters and Global Attributes"]
             all_pars = parameters["All Parameters"][()].tostring().decode().split("\n")
             # We make sure that everything is lowercase, we are case insensitive
@@ -1201,22 +2930,47 @@ class OneGridFunctionH5(BaseOneGridFunction):
                 "output_ghost_points"
             )
 
-    def clear_cache(self):
-        """Remove all the cached entries.
+    def _time_table(self):
+        """Return the available iterations and the corresponding times as
+        arrays sorted by iteration.
+
+        The times come from the catalogs of the files, so no file has to be
+        opened (unless the catalogs come from an old index without times).
+
+        :returns: Iterations and times.
+        :rtype: tuple of two 1D NumPy arrays
 
-        Every time a component is read, :py:class:`~.OneGridFunctionsH5` caches
-        its value (reading can be expensive). In certain cases, this can lead to
-        an explosion in the size of this object. For example, when reading
-        several iterations to make a movie. This method removes all the cached
-        entries, keeping the size of the object under control.
         """
-        for filename, file_reader in self.alldata.items():
-            for iteration, iteration_reader in file_reader.items():
-                for ref_level, ref_level_reader in iteration_reader.items():
-                    for component in ref_level_reader.keys():
-                        self.alldata[filename][iteration][ref_level][
-                            component
-                        ] = None
+        # getattr is for objects loaded from old pickles
+        if getattr(self, "_times_table", None) is None:
+            iterations_to_times = self.__dict__.setdefault(
+                "_iterations_to_times", {}
+            )
+            # available_iterations is sorted
+            iterations = np.array(self.available_iterations)
+            times = np.array(
+                [
+                    iterations_to_times[iteration]
+                    if iteration in iterations_to_times
+                    else self._read_time_at_iteration(iteration)
+                    for iteration in self.available_iterations
+                ],
+                dtype=float,
+            )
+            self._times_table = (iterations, times)
+        return self._times_table
+
+    @property
+    def available_times(self):
+        """Return the available times.
+
+        :returns: List with all the available times.
+        :rtype: list
+
+        """
+        return list(self._time_table()[1])
+
+    times = available_times
 
     def time_at_iteration(self, iteration):
         """Return the time corresponding to the provided iteration.
@@ -1227,6 +2981,43 @@ class OneGridFunctionH5(BaseOneGridFunction):
         :returns: Time corresponding to ``iteration``.
         :rtype: float
 
+        """
+        iterations, times = self._time_table()
+        index = np.searchsorted(iterations, iteration)
+
+        if index == len(iterations) or iterations[index] != iteration:
+            raise ValueError(f"Iteration {iteration} not available")
+
+        return times[index]
+
+    def iteration_at_time(self, time):
+        """Return the iteration that corresponds to the given time.
+
+        :param time: Time.
+        :type time: float
+
+        :returns: Iteration corresponding to the given time.
+        :rtype: int
+
+        """
+        iterations, times = self._time_table()
+        (indices,) = np.nonzero(times == time)
+
+        if len(indices) == 0:
+            raise ValueError(f"Time {time} not available")
+
+        return int(iterations[indices[0]])
+
+    def _read_time_at_iteration(self, iteration):
+        """Read the time corresponding to the provided iteration from the
+        files.
+
+        :param iteration: Iteration.
+        :type iteration: int
+
+        :returns: Time corresponding to ``iteration``.
+        :rtype: float
+
         """
         # If there are multiple files, we take the first.
         # A case in which there are multiple files is with 3D data
@@ -1259,6 +3050,10 @@ class AllGridFunctions:
     :type dimension: tuple
     :ivar num_ghost: Number of ghost zones in each dimension.
     :type num_ghost: 1d NumPy array.
+    :ivar max_workers: Number of processes used to read the components of an
+                       iteration that are in different files (see
+                       :py:class:`~.BaseOneGridFunction`).
+    :type max_workers: int or None
 
     """
 
@@ -1287,33 +3082,19 @@ class AllGridFunctions:
         (0, 1, 2): "xyz",
     }
 
-    def __init__(self, allfiles, dimension, num_ghost=None):
-        """Constructor.
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _filename_regexes(cls, dimension):
+        """Return the compiled regular expressions that match the names of HDF5
+        and ASCII files with data of the given dimension.
 
-        :param allfiles: List of all the files.
-        :type allfiles: list
-        :param dimension: Dimension associated to this object.
+        :param dimension: Dimension.
         :type dimension: tuple
-        :param num_ghost: Number of ghost zones in the data for each dimension.
-                          This is used only for ASCII data.
-        :type num_ghost: list or tuple of the same length as the number of dimension
-
-        """
-
-        # Here we save what kind of file we are looking at
-        # We assume that dimension is already sanitized (that is, is in tuple
-        # form and not in string form)
-        self.dimension = dimension
 
-        # If we are using ASCII files, we have to know how many ghost zones are
-        # in the data. At the moment we ask the user to provide the data, but
-        # in the future we will parse the paramter file and find this value.
-        #
-        # We don't use this value for HDF5 data, as it is more reliable to just
-        # read it from the files.
-        # Here we are using a setter for num_ghost, see below
-        self.num_ghost = num_ghost
+        :returns: Regular expressions for HDF5 and ASCII files.
+        :rtype: tuple of ``re.Pattern``
 
+        """
         # This is a simple regex:
         # 1. ^ and $ mean that we have to match the entire string
         # 2. ([a-zA-Z0-9_]+) means that we match any combination of letters
@@ -1326,8 +3107,8 @@ class AllGridFunctions:
         # 3. ([a-zA-Z0-9\[\]_]+) means that we match any character any number
         #    of times, this is a capturing group, and is the variable name,
         #    or the group name if we output one group per file.
-        # 4. We have the extension, which identifies the dimension and is
-        #    saved in the class instance
+        # 4. We have the extension, which identifies the dimension (see
+        #    filename_extensions)
         # 5. Finally, we have the filename extension which can be either h5
         #    or txt
         #
@@ -1337,13 +3118,50 @@ class AllGridFunctions:
         # filename_pattern = r"^([a-zA-Z0-9_]+)(-)?([a-zA-Z0-9\[\]_]+)%s.%s$"
         filename_pattern = r"^(([a-zA-Z0-9_]+)-)?([a-zA-Z0-9\[\]_]+)%s.%s$"
         h5_pattern = filename_pattern % (
-            self.filename_extensions[self.dimension],
+            cls.filename_extensions[dimension],
             "h5",
         )
         ascii_pattern = filename_pattern % (
-            self.filename_extensions[self.dimension],
+            cls.filename_extensions[dimension],
             r"asc(\.(gz|bz2))?",
         )
+        return re.compile(h5_pattern), re.compile(ascii_pattern)
+
+    def __init__(
+        self, allfiles, dimension, num_ghost=None, index=None, cache=None
+    ):
+        """Constructor.
+
+        :param allfiles: List of all the files.
+        :type allfiles: list
+        :param dimension: Dimension associated to this object.
+        :type dimension: tuple
+        :param num_ghost: Number of ghost zones in the data for each dimension.
+                          This is used only for ASCII data.
+        :type num_ghost: list or tuple of the same length as the number of dimension
+        :param index: Index where to look for the metadata of the files.
+        :type index: :py:class:`~.SimDirIndex` or None
+        :param cache: Cache that bounds the memory used by the components read
+                      by the variables. If None, use the one shared by all the
+                      grid functions (see
+                      :py:func:`~.set_components_cache_size`).
+        :type cache: :py:class:`~._ComponentsCache` or None
+
+        """
+
+        # Here we save what kind of file we are looking at
+        # We assume that dimension is already sanitized (that is, is in tuple
+        # form and not in string form)
+        self.dimension = dimension
+
+        # If we are using ASCII files, we have to know how many ghost zones are
+        # in the data. At the moment we ask the user to provide the data, but
+        # in the future we will parse the paramter file and find this value.
+        #
+        # We don't use this value for HDF5 data, as it is more reliable to just
+        # read it from the files.
+        # Here we are using a setter for num_ghost, see below
+        self.num_ghost = num_ghost
 
         # Variable files is a dictionary, the keys are the variables, the
         # values the set of files associated to that variable
@@ -1355,8 +3173,37 @@ class AllGridFunctions:
         # ASCII)
         self._vars = {}
 
-        rx_h5 = re.compile(h5_pattern)
-        rx_ascii = re.compile(ascii_pattern)
+        self._rx_h5, self._rx_ascii = self._filename_regexes(self.dimension)
+
+        self._index = index
+        self._cache = cache
+        self._max_workers = 1
+
+        # Readers of the ASCII files and catalogs of the HDF5 files, shared by
+        # all the variables, so that files with multiple variables are read
+        # only once
+        self._ascii_readers = {}
+        self._h5_catalogs = {}
+
+        self._add_files(allfiles)
+
+    def _add_files(self, allfiles):
+        """Add the given files to the ones that are indexed.
+
+        Variables that were already read are updated with the new files,
+        keeping the data that was already read.
+
+        :param allfiles: List of the new files.
+        :type allfiles: list of str
+
+        """
+        rx_h5 = self._rx_h5
+        rx_ascii = self._rx_ascii
+
+        # new_h5_files and new_ascii_files are like _vars_h5_files and
+        # _vars_ascii_files, but contain only the files that we are adding
+        new_h5_files = {}
+        new_ascii_files = {}
 
         # Here we scan all the files and find those with a name that match
         # one of our regular expressions.
@@ -1380,30 +3227,17 @@ class AllGridFunctions:
                 # in group3.
                 if matched_h5.group(1) is None:
                     variable_name = matched_h5.group(3)
-                    var_list = self._vars_h5_files.setdefault(
-                        variable_name, set()
-                    )
-                    var_list.add(f)
+                    new_h5_files.setdefault(variable_name, set()).add(f)
                 else:
                     # We have to open the file to understand which variables
-                    # are available
-                    #
-                    # We use the pattern name in OneGridFunctionH5
-                    rx_group_name = re.compile(
-                        OneGridFunctionH5._pattern_group_name, re.VERBOSE
-                    )
-                    with h5py.File(f, "r") as h5f:
-                        # Here group is in the sense of HDF5 group
-                        for group in h5f.keys():
-                            group_matched = rx_group_name.match(group)
-                            # If this is not an interesting group, just skip it
-                            if not group_matched:
-                                continue
-                            variable_name = group_matched.group(2)
-                            var_list = self._vars_h5_files.setdefault(
-                                variable_name, set()
-                            )
-                            var_list.add(f)
+                    # are available. The catalog of the file is then used by
+                    # all the variables in the file.
+                    for variable_name in _h5_catalog(
+                        f,
+                        self._index,
+                        self.__dict__.setdefault("_h5_catalogs", {}),
+                    )["variables"]:
+                        new_h5_files.setdefault(variable_name, set()).add(f)
             elif matched_ascii is not None:
                 # As in the case of H5 files, we first need to understand if
                 # the output is with "one_group_per_file". If yes, we have to
@@ -1411,10 +3245,7 @@ class AllGridFunctions:
                 # are available.
                 if matched_ascii.group(1) is None:
                     variable_name = matched_ascii.group(3)
-                    var_list = self._vars_ascii_files.setdefault(
-                        variable_name, set()
-                    )
-                    var_list.add(f)
+                    new_ascii_files.setdefault(variable_name, set()).add(f)
                 else:
                     # In this case we need to open the file and scan the
                     # header, for this we use the scan_header function in
@@ -1435,39 +3266,54 @@ class AllGridFunctions:
                     # except block, and keep only the variables that do not
                     # throw errors.
                     try:
-                        # TODO (PERFORMANCE): Avoid reading headers twice
-                        #
-                        # Here we scan the headers, we should not do this work again
-                        # when we deal with the single variables.
-
-                        # The last group is where compression information is. It
-                        # could be None.
-                        compression_method = matched_ascii.groups()[-1]
-                        (
-                            opener,
-                            opener_mode,
-                        ) = OneGridFunctionASCII._decompressor[
-                            compression_method
-                        ]
-                        _, column_description = scan_header(
-                            f,
-                            one_file_per_group=True,
-                            extended_format=True,
-                            opener=opener,
-                            opener_mode=opener_mode,
-                        )
-                        for variable_name in column_description.keys():
-                            var_list = self._vars_ascii_files.setdefault(
+                        # The reader scans the header, and it is then used
+                        # by all the variables in the file
+                        ascii_reader = self._ascii_reader(f)
+                        for variable_name in ascii_reader.columns.keys():
+                            new_ascii_files.setdefault(
                                 variable_name, set()
-                            )
-                            var_list.add(f)
+                            ).add(f)
                     except RuntimeError:
                         pass
 
+        for new_files, vars_files in (
+            (new_h5_files, self._vars_h5_files),
+            (new_ascii_files, self._vars_ascii_files),
+        ):
+            for variable_name, files in new_files.items():
+                vars_files.setdefault(variable_name, set()).update(files)
+
+        # Variables that were already read are updated with the new files. We
+        # have to be careful to add only files of the same type of the ones
+        # that were read (HDF5 is preferred).
+        for variable_name, var in self._vars.items():
+            if isinstance(var, OneGridFunctionH5):
+                files = new_h5_files.get(variable_name)
+            else:
+                files = new_ascii_files.get(variable_name)
+            if files:
+                var._add_files(files)
+
         # What pythonize_name_dict does is to make the various variables
         # accessible as attributes, e.g. self.fields.rho
         self.fields = pythonize_name_dict(list(self.keys()), self.__getitem__)
 
+    def _ascii_reader(self, path):
+        """Return the object that reads the ASCII file ``path``.
+
+        :param path: Path of the file.
+        :type path: str
+
+        :returns: Reader of the file.
+        :rtype: :py:class:`~._ASCIIGridFile`
+
+        """
+        # getattr is for objects loaded from old pickles
+        ascii_readers = self.__dict__.setdefault("_ascii_readers", {})
+        if path not in ascii_readers:
+            ascii_readers[path] = _ASCIIGridFile(path, index=self._index)
+        return ascii_readers[path]
+
     def __getitem__(self, key):
 
         var_name = str(key)
@@ -1479,7 +3325,12 @@ class AllGridFunctions:
             # We prefer h5
             if var_name in self._vars_h5_files:
                 self._vars[var_name] = OneGridFunctionH5(
-                    self._vars_h5_files[var_name], var_name
+                    self._vars_h5_files[var_name],
+                    var_name,
+                    index=self._index,
+                    # setdefault is for objects loaded from old pickles
+                    catalogs=self.__dict__.setdefault("_h5_catalogs", {}),
+                    cache=getattr(self, "_cache", None),
                 )
             elif var_name in self._vars_ascii_files:
                 if self.num_ghost is None:
@@ -1492,10 +3343,34 @@ class AllGridFunctions:
                     self._vars_ascii_files[var_name],
                     var_name,
                     num_ghost=self.num_ghost,
+                    index=self._index,
+                    file_readers=self.__dict__.setdefault(
+                        "_ascii_readers", {}
+                    ),
+                    cache=getattr(self, "_cache", None),
                 )
+            self._vars[var_name].max_workers = self.max_workers
 
         return self._vars[var_name]
 
+    @property
+    def max_workers(self):
+        """Number of processes used to read the components of an iteration that
+        are in different files.
+
+        :rtype: int or None
+        """
+        # getattr is for objects loaded from old pickles
+        return getattr(self, "_max_workers", 1)
+
+    @max_workers.setter
+    def max_workers(self, max_workers):
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("max_workers has to be a positive number")
+        self._max_workers = max_workers
+        for var in self._vars.values():
+            var.max_workers = max_workers
+
     @property
     def num_ghost(self):
         """Return the number of ghost zones along each direction.
@@ -1521,6 +3396,30 @@ class AllGridFunctions:
     def __contains__(self, var):
         return var in self.keys()
 
+    def _metadata_state(self):
+        """Return the state of the object without the data read from the files.
+
+        This is used by :py:meth:`~.SimDir.save`. Compressed ASCII files are
+        read entirely when the variable is first accessed, so we drop those
+        variables altogether. For uncompressed ASCII files, the variables only
+        store the positions of the blocks in the files (see
+        :py:attr:`~._ASCIIGridFile.block_offsets`), so we keep them.
+
+        :returns: State of the object.
+        :rtype: dict
+        """
+        state = self.__dict__.copy()
+        state["_vars"] = {
+            var_name: var
+            for var_name, var in self._vars.items()
+            if not isinstance(var, OneGridFunctionASCII)
+            or all(
+                var._file_reader(path).block_offsets is not None
+                for path in var.allfiles
+            )
+        }
+        return state
+
     def get(self, key, default=None):
         """Return variable ``key``.
 
@@ -1592,6 +3491,11 @@ class GridFunctionsDir:
     :ivar yz:          Access to 2D data along yz-plane.
     :ivar xyz:         Access to 3D data.
 
+    Setting the attribute ``max_workers`` to a number different from 1 enables
+    reading the components of an iteration that are in different files (e.g.,
+    3D data with one file per process) in parallel processes (see
+    :py:class:`~.BaseOneGridFunction`).
+
     """
 
     # Usually we think in terms of dimensions xyz, but it is much more
@@ -1621,11 +3525,106 @@ class GridFunctionsDir:
         # _all_griddata is a dictionary that maps dimension to an object
         # AllGridFunctions, which contains all the variables for which that
         # dimension is available
+        # getattr is for SimDirs loaded from old pickles
+        index = getattr(sd, "index", None)
+
+        # If the SimDir has its own budget for the memory used by the grid
+        # functions, all the variables share a cache with that budget,
+        # otherwise they use the global one
+        cache_size = getattr(sd, "grid_cache_size", None)
+        self._cache = (
+            None if cache_size is None else _ComponentsCache(cache_size)
+        )
+
+        # SimDir has already sorted the files according to their dimension
+        # (see _file_kinds), so each AllGridFunctions only looks at its own
+        # files
         self._all_griddata = {
-            dim: AllGridFunctions(sd.allfiles, dim)
+            dim: AllGridFunctions(
+                sd._files_of_kind(("grid_functions", dim)),
+                dim,
+                index=index,
+                cache=self._cache,
+            )
             for dim in self._dim_indices.values()
         }
 
+        self._max_workers = 1
+
+    @property
+    def max_workers(self):
+        """Number of processes used to read the components of an iteration that
+        are in different files.
+
+        :rtype: int or None
+        """
+        # getattr is for objects loaded from old pickles
+        return getattr(self, "_max_workers", 1)
+
+    @max_workers.setter
+    def max_workers(self, max_workers):
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("max_workers has to be a positive number")
+        self._max_workers = max_workers
+        for all_grid_functions in self._all_griddata.values():
+            all_grid_functions.max_workers = max_workers
+
+    def cache_stats(self):
+        """Return the counters of the cache that bounds the memory used by the
+        grid functions.
+
+        This is the cache of the :py:class:`~.SimDir` if it was created with
+        ``grid_cache_size``, or the global one otherwise.
+
+        :returns: Dictionary with keys ``hits``, ``misses``, ``evictions``,
+                  ``nbytes`` (size of the components currently in memory), and
+                  ``max_bytes``.
+        :rtype: dict
+
+        """
+        # getattr is for objects loaded from old pickles
+        cache = getattr(self, "_cache", None)
+        return (_components_cache if cache is None else cache).stats()
+
+    @classmethod
+    def _file_kinds(cls, filename):
+        """Return the kinds of the file with name ``filename`` that are relevant
+        for :py:class:`~.GridFunctionsDir`.
+
+        This is used by :py:class:`~.SimDir` to classify the files. The kinds
+        are tuples ``("grid_functions", dimension)``.
+
+        :param filename: Name of the file (without folders).
+        :type filename: str
+
+        :returns: Kinds of the file.
+        :rtype: list of tuple
+
+        """
+        # Most of the files are not grid functions, we avoid matching all the
+        # regular expressions for them
+        if not filename.endswith((".h5", ".asc", ".asc.gz", ".asc.bz2")):
+            return []
+
+        kinds = []
+        for dim in cls._dim_indices.values():
+            rx_h5, rx_ascii = AllGridFunctions._filename_regexes(dim)
+            if rx_h5.match(filename) or rx_ascii.match(filename):
+                kinds.append(("grid_functions", dim))
+        return kinds
+
+    def _add_files(self, files_by_kind):
+        """Add the given files to all the dimensions.
+
+        :param files_by_kind: New files, as classified by :py:class:`~.SimDir`.
+        :type files_by_kind: dict
+
+        """
+        for dim, all_grid_functions in self._all_griddata.items():
+            all_grid_functions._add_files(
+                files_by_kind.get(("grid_functions", dim), [])
+            )
+
     def _string_or_tuple_to_dimension_index(self, dimension):
         """Internally, we always refer to the different dimensions with their
         numerical index. However, it is more convenient to have public
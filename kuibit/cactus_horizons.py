@@ -52,7 +52,9 @@ import warnings
 import numpy as np
 
 from kuibit.attr_dict import pythonize_name_dict
+from kuibit.cactus_ascii_utils import read_table
 from kuibit.series import sample_common
+from kuibit.simdir_index import cached_metadata
 from kuibit.timeseries import combine_ts, remove_duplicated_iters
 
 
@@ -632,6 +634,20 @@ class HorizonsDir:
     # What variables should not be passed to OneHorizon?
     _exclude_ah_vars = ["cctk_time"]
 
+    # Files with the diagnostics of the apparent horizons, like
+    # BH_diagnostics.ah1.gp
+    _rx_ah_filename = re.compile(r"^BH_diagnostics.ah(\d+).gp$")
+
+    # Files with the shape of the apparent horizons. Here we match the files
+    # with a regular expression:
+    # 1. ^ $ means that we match the entire string
+    # 2. Then we match the literal h.t
+    # 3. with a number (\d+)
+    # 4. the literal .ah
+    # 5. another number (\d+)
+    # 6. and the file extension .gp
+    _rx_shape_filename = re.compile(r"^h.t(\d+).ah(\d+).gp$")
+
     def __init__(self, sd):
         """Constructor.
 
@@ -650,12 +666,20 @@ class HorizonsDir:
         self._populate_qlm_vars(sd)
         self._num_qlm_horizons = len(self._qlm_vars.keys())
 
+        # getattr is for SimDirs loaded from old pickles
+        self._index = getattr(sd, "index", None)
+
         # ah_vars is a dictionary like qlm_vars with the difference that we
         # extract information from the files BH_diagnostics.ah(\d+).gp and
         # that the index here is the Apparent Horizon index.
         self._ah_vars = {}
+        # _ah_files maps the Apparent Horizon index with the list of files
+        # BH_diagnostics.ah(\d+).gp
+        self._ah_files = {}
         # self._num_ah_horizons is set inside the function
-        self._populate_ah_vars(sd)
+        # SimDir has already selected the files that are relevant for us (see
+        # _file_kinds)
+        self._populate_ah_vars(sd._files_of_kind("horizons"))
 
         # The next step is to find the files for the shape of the horizons, if
         # available. We scan all the files and find those with h.t*****.ah*.gp
@@ -664,8 +688,56 @@ class HorizonsDir:
         # index and as values another dictionary with keys the iteration and
         # value the file
         self._shape_files = {}
-        self._populate_shape_files(sd)
+        self._populate_shape_files(sd._files_of_kind("horizons"))
+
+        self._align_ah_vars_and_shape_files()
+
+    @classmethod
+    def _file_kinds(cls, filename):
+        """Return the kinds of the file with name ``filename`` that are relevant
+        for :py:class:`~.HorizonsDir`.
+
+        This is used by :py:class:`~.SimDir` to classify the files.
+
+        :param filename: Name of the file (without folders).
+        :type filename: str
+
+        :returns: Kinds of the file (``horizons``, or nothing).
+        :rtype: list of str
+
+        """
+        if cls._rx_ah_filename.search(filename) or cls._rx_shape_filename.match(
+            filename
+        ):
+            return ["horizons"]
+        return []
+
+    def _add_files(self, sd, allfiles):
+        """Add the given files to the ones that are indexed.
+
+        Only the horizons that have new files are read again.
 
+        :param sd: SimDir object providing access to data directory.
+        :type sd: SimDir
+        :param allfiles: List of the new files.
+        :type allfiles: list of str
+
+        """
+        # The QuasiLocalMeasures variables are read from sd.ts, which keeps the
+        # timeseries that are not affected by the new files
+        self._qlm_vars = {}
+        self._populate_qlm_vars(sd)
+        self._num_qlm_horizons = len(self._qlm_vars.keys())
+
+        self._populate_ah_vars(allfiles)
+        self._populate_shape_files(allfiles)
+        self._align_ah_vars_and_shape_files()
+
+    def _align_ah_vars_and_shape_files(self):
+        """Make sure that _ah_vars and _shape_files have the same keys and set
+        found_any.
+
+        """
         # Here we align the ah_vars and shape_files so that they have the same
         # keys. We add an empty {} to the missing values.
         for ah_index in self._ah_vars:
@@ -711,18 +783,21 @@ class HorizonsDir:
                 horizon_vars = self._qlm_vars.setdefault(horizon_number, {})
                 horizon_vars[var_name_stripped] = sd.ts.scalar[var_name]
 
-    def _populate_ah_vars(self, sd):
+    def _populate_ah_vars(self, allfiles):
         # First, we find all the files related to apparent horizons. These
         # have names like BH_diagnostics.ah1.gp
-        self._ah_files = {}
+        #
+        # We keep track of which horizons have new files, so that we read only
+        # those.
+        updated_ah_indices = set()
 
-        rx_ah_filename = re.compile(r"^BH_diagnostics.ah(\d+).gp$")
-        for path in sd.allfiles:
+        for path in allfiles:
             filename = os.path.split(path)[-1]
-            matched = rx_ah_filename.search(filename)
+            matched = self._rx_ah_filename.search(filename)
             if matched is not None:
                 ah_index = int(matched.group(1))
                 self._ah_files.setdefault(ah_index, []).append(path)
+                updated_ah_indices.add(ah_index)
 
         # Next, we find what variables they contain. This should be pretty
         # standard, but we can make our code more robust by not assuming too
@@ -732,21 +807,28 @@ class HorizonsDir:
 
         self._num_ah_horizons = len(self._ah_files.keys())
 
-        # We continue only if we find some files
-        if self._num_ah_horizons > 0:
+        # We continue only if we find some new files
+        if updated_ah_indices:
 
             # [0][0] is because the values are lists
             first_ah_file = tuple(self._ah_files.values())[0][0]
-            with open(first_ah_file, "r") as fil:
-                # Here we read the first lines_to_read into header
-                # We strip the new line
-                header = []
-                for line in fil:
-                    # We read the header, which starts with #
-                    if line.startswith("#"):
-                        header.append(line.strip())
-                    else:
-                        break
+
+            def read_header():
+                with open(first_ah_file, "r") as fil:
+                    # Here we read the first lines_to_read into header
+                    # We strip the new line
+                    header = []
+                    for line in fil:
+                        # We read the header, which starts with #
+                        if line.startswith("#"):
+                            header.append(line.strip())
+                        else:
+                            break
+                return header
+
+            header = cached_metadata(
+                self._index, first_ah_file, "ah_header", read_header
+            )
 
             # Now, we parse the header and associate variable name with column
             # where the data is. The header looks like:
@@ -802,12 +884,13 @@ class HorizonsDir:
 
             # Now we are ready to populate, we read all the data first. Then, we
             # select all the columns
-            for ah_index, files in self._ah_files.items():
+            for ah_index in updated_ah_indices:
+                files = self._ah_files[ah_index]
                 # We create an empty dictionary in self._ah_vars[ah_index]
                 self._ah_vars.setdefault(ah_index, {})
 
                 # We read all the data
-                alldata = [np.loadtxt(f, unpack=True, ndmin=2) for f in files]
+                alldata = [read_table(f) for f in files]
                 for var_name, column_number in self._ah_vars_columns.items():
                     # Here we select the time column and the data column for all
                     # the data in each file and we convert them into TimeSeries
@@ -821,18 +904,10 @@ class HorizonsDir:
                     )
                     self._ah_vars[ah_index][var_name] = data_ts
 
-    def _populate_shape_files(self, sd):
-        # Here we match the files with a regular expression:
-        # 1. ^ $ means that we match the entire string
-        # 2. Then we match the literal h.t
-        # 3. with a number (\d+)
-        # 4. the literal .ah
-        # 5. another number (\d+)
-        # 6. and the file extension .gp
-        rx_shape_filename = re.compile(r"^h.t(\d+).ah(\d+).gp$")
-        for path in sd.allfiles:
+    def _populate_shape_files(self, allfiles):
+        for path in allfiles:
             filename = os.path.split(path)[1]
-            matched = rx_shape_filename.match(filename)
+            matched = self._rx_shape_filename.match(filename)
             if matched is not None:
                 ah_index = int(matched.group(2))
                 iteration = int(matched.group(1))
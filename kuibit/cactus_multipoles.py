@@ -49,6 +49,8 @@ import numpy as np
 
 from kuibit import timeseries
 from kuibit.attr_dict import pythonize_name_dict
+from kuibit.cactus_ascii_utils import read_columns, read_table
+from kuibit.simdir_index import cached_metadata
 
 
 class MultipoleOneDet:
@@ -421,6 +423,39 @@ class MultipolesDir:
 
     """
 
+    # First, we need to find the multipole files.
+    # There are text files and h5 files
+    #
+    # We use a regular expressions on the name
+    # The structure is like mp_Psi4_l_m2_r110.69.asc
+    #
+    # Let's understand the regexp:
+    # 0. ^ and $ means that we match the entire name
+    # 1. We match mp_ followed my the variable name, which is
+    #    any combination of characters
+    # 2. We match _l with a number
+    # 3. We match _m with possibly a minus sign and a number
+    # 4. We match _r with any combination of numbers with possibly
+    #    dots
+    # 5. We possibly match a compression
+    _rx_ascii = re.compile(
+        r"""^
+    mp_([a-zA-Z0-9\[\]_]+)
+    _l(\d+)
+    _m([-]?\d+)
+    _r([0-9.]+)
+    .asc
+    (?:.bz2|.gz)?
+    $""",
+        re.VERBOSE,
+    )
+
+    # For h5 files is easy: it is just the var name
+    _rx_h5 = re.compile(r"^mp_([a-zA-Z0-9\[\]_]+).h5$")
+
+    # For IL code Psi4 files, it is even easier: it's just these files,
+    _rx_IL = re.compile(r"^Psi4_rad\.mon\.([0-9]+)$")
+
     def __init__(self, sd):
         """Constructor.
 
@@ -463,49 +498,58 @@ class MultipolesDir:
         # objects. We fill this with __getitem__
         self._vars = {}
 
-        # First, we need to find the multipole files.
-        # There are text files and h5 files
-        #
-        # We use a regular expressions on the name
-        # The structure is like mp_Psi4_l_m2_r110.69.asc
-        #
-        # Let's understand the regexp:
-        # 0. ^ and $ means that we match the entire name
-        # 1. We match mp_ followed my the variable name, which is
-        #    any combination of characters
-        # 2. We match _l with a number
-        # 3. We match _m with possibly a minus sign and a number
-        # 4. We match _r with any combination of numbers with possibly
-        #    dots
-        # 5. We possibly match a compression
-        rx_ascii = re.compile(
-            r"""^
-        mp_([a-zA-Z0-9\[\]_]+)
-        _l(\d+)
-        _m([-]?\d+)
-        _r([0-9.]+)
-        .asc
-        (?:.bz2|.gz)?
-        $""",
-            re.VERBOSE,
-        )
+        # getattr is for SimDirs loaded from old pickles
+        self._index = getattr(sd, "index", None)
 
-        # For h5 files is easy: it is just the var name
-        rx_h5 = re.compile(r"^mp_([a-zA-Z0-9\[\]_]+).h5$")
+        # SimDir has already selected the files that are relevant for us (see
+        # _file_kinds)
+        self._add_files(sd._files_of_kind("multipoles"))
 
-        # For IL code Psi4 files, it is even easier: it's just these files,
-        rx_IL = re.compile('^Psi4_rad\.mon\.([0-9]+)$')
+    @classmethod
+    def _file_kinds(cls, filename):
+        """Return the kinds of the file with name ``filename`` that are relevant
+        for :py:class:`~.MultipolesDir`.
 
-        for f in sd.allfiles:
+        This is used by :py:class:`~.SimDir` to classify the files.
+
+        :param filename: Name of the file (without folders).
+        :type filename: str
+
+        :returns: Kinds of the file (``multipoles``, or nothing).
+        :rtype: list of str
+
+        """
+        if (
+            cls._rx_h5.match(filename)
+            or cls._rx_ascii.match(filename)
+            or cls._rx_IL.match(filename)
+        ):
+            return ["multipoles"]
+        return []
+
+    def _add_files(self, allfiles):
+        """Add the given files to the ones that are indexed.
+
+        The cached data of the variables that are found in the new files is
+        discarded, so that it will be read again with the new files.
+
+        :param allfiles: List of the new files.
+        :type allfiles: list of str
+
+        """
+        updated_vars = set()
+
+        for f in allfiles:
             filename = os.path.split(f)[1]
-            matched_h5 = rx_h5.match(filename)
-            matched_ascii = rx_ascii.match(filename)
-            matched_IL = rx_IL.match(filename)
+            matched_h5 = self._rx_h5.match(filename)
+            matched_ascii = self._rx_ascii.match(filename)
+            matched_IL = self._rx_IL.match(filename)
             if matched_h5 is not None:
                 variable_name = matched_h5.group(1).lower()
                 var_list = self._vars_h5_files.setdefault(variable_name, set())
                 # We are flagging that this h5
                 var_list.add(f)
+                updated_vars.add(variable_name)
             elif matched_ascii is not None:
                 variable_name = matched_ascii.group(1).lower()
                 mult_l = int(matched_ascii.group(2))
@@ -515,14 +559,18 @@ class MultipolesDir:
                     variable_name, set()
                 )
                 var_list.add((mult_l, mult_m, radius, f))
+                updated_vars.add(variable_name)
             elif matched_IL is not None:
                 variable_name = "psi4" # all keys must be lower-case
                 var_list = self._vars_IL_files.setdefault(variable_name, set())
-                data = np.genfromtxt(f) # Unfortunately there's no way to check this without opening the file
-                radius = data[0, -4]
-                if (data.shape[1] - 5)%2 != 0:
-                    raise RuntimeError('Wrong format')
-                nmodes = (data.shape[1] - 5)//2
+                # Unfortunately there's no way to check this without opening
+                # the file, so we save the result in the index (if available)
+                radius, nmodes = cached_metadata(
+                    self._index,
+                    f,
+                    "IL_Psi4_modes",
+                    lambda: self._modes_in_IL_Psi4_file(f),
+                )
                 # Loop through all the modes in the file    
                 l = 2
                 i = 1
@@ -533,7 +581,11 @@ class MultipolesDir:
                         m = m - 1
                         i = i + 1
                     l = l+1
-                
+                updated_vars.add(variable_name)
+
+        for variable_name in updated_vars:
+            self._vars.pop(variable_name, None)
+
         # What pythonize_name_dict does is to make the various variables
         # accessible as attributes, e.g. self.fields.rho
         self.fields = pythonize_name_dict(list(self.keys()), self.__getitem__)
@@ -541,6 +593,18 @@ class MultipolesDir:
     def __contains__(self, key):
         return str(key).lower() in self.keys()
 
+    def _metadata_state(self):
+        """Return the state of the object without the data read from the files.
+
+        This is used by :py:meth:`~.SimDir.save`.
+
+        :returns: State of the object.
+        :rtype: dict
+        """
+        state = self.__dict__.copy()
+        state["_vars"] = {}
+        return state
+
     # The following are staticmethods because they do not depend on the bound
     # object. Using this decorator we save memory because Python will
     # initialize them only once.
@@ -555,12 +619,37 @@ class MultipolesDir:
         :returns: Multipole data.
         :rtype: :py:class:`~.TimeSeries`
         """
-        a = np.loadtxt(path, unpack=True, ndmin=2)
+        a = read_table(path)
         if len(a) != 3:
             raise RuntimeError(f"Wrong format in {path}")
         complex_mp = a[1] + 1j * a[2]
         return timeseries.remove_duplicated_iters(a[0], complex_mp)
 
+    @staticmethod
+    def _modes_in_IL_Psi4_file(path):
+        """Return the radius and the number of modes in an IL code Psi4 file.
+
+        :param path: File to read.
+        :type path: str
+
+        :returns: Extraction radius and number of modes.
+        :rtype: tuple of float and int
+        """
+        # This is called when initializing MultipolesDir, so we only look at
+        # the first line with data instead of parsing the entire file
+        with open(path, "r") as file_:
+            for line in file_:
+                line = line.split("#")[0].split()
+                if line:
+                    break
+            else:
+                raise RuntimeError(f"No data in {path}")
+        radius = float(line[-4])
+        if (len(line) - 5) % 2 != 0:
+            raise RuntimeError("Wrong format")
+        nmodes = (len(line) - 5) // 2
+        return radius, nmodes
+
     @staticmethod
     def _multipole_from_IL_Psi4_file(path, l, m):
         """Read multipole data from an IL code Psi4 file.
@@ -579,11 +668,13 @@ class MultipolesDir:
             ncol = ncol + 2*l + 1 # and for each complete shell before the selected one.
         # Double this (multipoles are complex) and add 1 (time is col 0): 
         ncol = 2*ncol + 1
-        data = np.genfromtxt(path)
+        # The file contains all the modes, so it is parsed only once (see
+        # read_columns)
+        t, real, imag = read_columns(path, (0, ncol, ncol + 1))
 
         # Make single complex array & return as timeseries
-        complex_mp = data[:, ncol] + 1.j*data[:, ncol+1]
-        return timeseries.remove_duplicated_iters(data[:, 0], complex_mp)
+        complex_mp = real + 1.j*imag
+        return timeseries.remove_duplicated_iters(t, complex_mp)
 
     @staticmethod
     def _radius_from_IL_Psi4_file(path):
@@ -595,9 +686,11 @@ class MultipolesDir:
         :returns: Multipole data.
         :rtype: :py:class:`~.TimeSeries`
         """
-        data = np.genfromtxt(path)
+        # Same file as _multipole_from_IL_Psi4_file, so the radius is read
+        # from the table that is already in memory
+        (radius,) = read_columns(path, (-4,))
 
-        return data[:, -4] 
+        return radius
 
 
     @staticmethod
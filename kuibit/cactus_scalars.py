@@ -51,7 +51,113 @@ import numpy as np
 from kuibit import simdir
 from kuibit import timeseries as ts
 from kuibit.attr_dict import pythonize_name_dict
-from kuibit.cactus_ascii_utils import scan_header
+from kuibit.cactus_ascii_utils import (
+    preload_tables,
+    read_columns,
+    scan_header,
+)
+from kuibit.simdir_index import cached_metadata
+
+
+def _load_timeseries(path, time_column, column, rows_read, variable):
+    """Read a variable from a file and remember how many rows were read.
+
+    :param path: Path of the file.
+    :type path: str
+    :param time_column: Column with the times.
+    :type time_column: int
+    :param column: Column with the variable.
+    :type column: int
+    :param rows_read: Dictionary where to store the number of rows and the last
+                      time read for ``variable``.
+    :type rows_read: dict
+    :param variable: Name of the variable.
+    :type variable: str
+
+    :returns: Timeseries with the variable.
+    :rtype: :py:class:`~.TimeSeries`
+
+    """
+    # Files with many columns are parsed only once (see read_columns)
+    t, y = read_columns(path, (time_column, column))
+    rows_read[variable] = (len(t), t[-1] if len(t) else None)
+    return ts.remove_duplicated_iters(t, y)
+
+
+def _append_removing_duplicated_iters(timeseries, t, y):
+    """Append the points (t, y) to the given timeseries, with the same rules as
+    :py:func:`~.remove_duplicated_iters`.
+
+    The result is the same as calling :py:func:`~.remove_duplicated_iters` on
+    the concatenation of the data that produced ``timeseries`` and (t, y), but
+    only the new points have to be processed.
+
+    :param timeseries: Timeseries obtained with
+                       :py:func:`~.remove_duplicated_iters`.
+    :type timeseries: :py:class:`~.TimeSeries`
+    :param t: New times.
+    :type t: 1D NumPy array
+    :param y: New values.
+    :type y: 1D NumPy array
+
+    :returns: Combined timeseries.
+    :rtype: :py:class:`~.TimeSeries`
+
+    """
+    new = ts.remove_duplicated_iters(t, y)
+    # remove_duplicated_iters keeps a point only if it comes before all the
+    # following ones, so the old points that are not before all the new ones
+    # (which are after them in the file) have to be removed.
+    keep = timeseries.t < new.tmin
+    return ts.TimeSeries(
+        np.append(timeseries.t[keep], new.t),
+        np.append(timeseries.y[keep], new.y),
+    )
+
+
+def _refresh_timeseries(path, time_column, columns, cached, rows_read):
+    """Update the timeseries loaded from a file with the lines that were
+    appended to the file.
+
+    :param path: Path of the file.
+    :type path: str
+    :param time_column: Column with the times.
+    :type time_column: int
+    :param columns: Dictionary that maps variables to columns.
+    :type columns: dict
+    :param cached: Dictionary that maps variables to the timeseries already
+                   loaded. It is updated in place.
+    :type cached: dict
+    :param rows_read: Dictionary that maps variables to the number of rows and
+                      the last time read (as filled by
+                      :py:func:`~._load_timeseries`). It is updated in place.
+    :type rows_read: dict
+
+    :returns: Whether any variable changed.
+    :rtype: bool
+
+    """
+    changed = False
+    for variable, timeseries in list(cached.items()):
+        num_rows, last_time = rows_read.get(variable, (None, None))
+        # Thanks to read_columns, only the new lines in the file are parsed
+        t, y = read_columns(path, (time_column, columns[variable]))
+
+        if num_rows == len(t) and (num_rows == 0 or t[-1] == last_time):
+            continue
+
+        if num_rows and len(t) > num_rows and t[num_rows - 1] == last_time:
+            cached[variable] = _append_removing_duplicated_iters(
+                timeseries, t[num_rows:], y[num_rows:]
+            )
+        else:
+            # The file was not only appended to, we start over
+            cached[variable] = ts.remove_duplicated_iters(t, y)
+
+        rows_read[variable] = (len(t), t[-1] if len(t) else None)
+        changed = True
+
+    return changed
 
 
 class OneScalar:
@@ -74,6 +180,12 @@ class OneScalar:
     :ivar reduction_type: Type of reduction.
     :type reduction_type: str
 
+    Files that contain all the reductions (produced with
+    ``all_reductions_in_one_file = yes``) have ``.scalars.`` in their name.
+    For these files, ``reduction`` can be passed to the constructor to select
+    one of the reductions. Otherwise, the variables are named as in the header
+    of the file (e.g., ``rho(maximum)``).
+
     """
 
     # What is this pattern?
@@ -114,6 +226,21 @@ class OneScalar:
         None: "scalar",
     }
 
+    # Names of the reductions in the header of the files with
+    # all_reductions_in_one_file, and the corresponding reduction_type
+    _all_reductions_types = {
+        "minimum": "minimum",
+        "maximum": "maximum",
+        "norm1": "norm1",
+        "norm2": "norm2",
+        "norm_inf": "infnorm",
+        "average": "average",
+    }
+
+    # Variables in the files with all_reductions_in_one_file are described
+    # as variable(reduction)
+    _rx_reduction_column = re.compile(r"^(.+)\((\w+)\)$")
+
     # What function to use to open the file?
     # What mode?
     _decompressor = {
@@ -122,15 +249,22 @@ class OneScalar:
         "bz2": (bopen, "rt"),
     }
 
-    def __init__(self, path):
+    def __init__(self, path, index=None, reduction=None):
         """Constructor.
 
         Here we understand what the file contains.
 
         :param path: Path of the file.
         :type path: str
+        :param index: Index where to look for the header of the file.
+        :type index: :py:class:`~.SimDirIndex` or None
+        :param reduction: For files that contain all the reductions, the
+                          reduction to read (e.g., ``maximum`` or
+                          ``infnorm``). It is ignored for the other files.
+        :type reduction: str or None
         """
         self.path = str(path)
+        self._index = index
         # The _vars_columns dictionary contains a mapping between the various variables
         # and the column numbers in which they are stored.
         self._vars_columns = {}
@@ -139,6 +273,10 @@ class OneScalar:
         # cached loaded data.
         self._vars = {}
 
+        # The _rows_read dictionary maps variables to the number of rows and
+        # the last time that were read from the file. It is used by refresh.
+        self._rows_read = {}
+
         self.folder, filename = os.path.split(self.path)
 
         filename_match = self._rx_filename.match(filename)
@@ -165,10 +303,20 @@ class OneScalar:
             reduction_type if reduction_type is not None else "scalar"
         )
 
+        # Files with all_reductions_in_one_file have a "data columns" line
+        # in the header, like files with one_file_per_group
+        self._has_all_reductions = self.reduction_type == "scalars"
+        self._reduction = None
+        if self._has_all_reductions and reduction is not None:
+            self._reduction = str(reduction)
+            self.reduction_type = self._reduction
+
         # If the file contains multiple variables, we will scan the header
         # immediately to understand the content. If not, we scan the header
         # only when needed
-        self._is_one_file_per_group = variable_name2 is not None
+        self._is_one_file_per_group = (
+            variable_name2 is not None or self._has_all_reductions
+        )
         self._was_header_scanned = False
 
         if self._is_one_file_per_group:
@@ -180,25 +328,74 @@ class OneScalar:
                 variable_name += index_in_brackets
             self._vars_columns = {variable_name: None}
 
+    @classmethod
+    def _is_all_reductions_file(cls, path):
+        """Return whether the file ``path`` was produced with
+        ``all_reductions_in_one_file``.
+
+        :param path: Path of the file.
+        :type path: str
+
+        :rtype: bool
+        """
+        matched = cls._rx_filename.match(os.path.basename(path))
+        # group 6 is the reduction type
+        return matched is not None and matched.group(6) == "scalars"
+
+    def _select_reduction(self, columns_info):
+        """Return the columns of the variables with the reduction of this
+        object.
+
+        :param columns_info: Dictionary that maps the variables as in the
+                             header (e.g., ``rho(maximum)``) to the columns.
+        :type columns_info: dict
+
+        :returns: Dictionary that maps the variables (e.g., ``rho``) to the
+                  columns.
+        :rtype: dict
+
+        """
+        selected = {}
+        for description, column in columns_info.items():
+            matched = self._rx_reduction_column.match(description)
+            if matched is None:
+                continue
+            variable, reduction = matched.groups()
+            if self._all_reductions_types.get(reduction) == self._reduction:
+                selected[variable] = column
+        return selected
+
     def _scan_header(self):
         # Call scan_header with the right argument
 
-        extended_format = self.reduction_type == "scalar"
+        # getattr is for objects loaded from old pickles
+        has_all_reductions = getattr(self, "_has_all_reductions", False)
+
+        extended_format = (
+            self.reduction_type == "scalar" and not has_all_reductions
+        )
 
         # What method to we need to use to open the file?
         # opener can be open, gopen, or bopen depending on the extension
         # of the file
         opener, opener_mode = self._decompressor[self._compression_method]
 
-        self._time_column, columns_info = scan_header(
+        self._time_column, columns_info = cached_metadata(
+            self._index,
             self.path,
-            self._is_one_file_per_group,
-            extended_format,
-            opener=opener,
-            opener_mode=opener_mode,
+            "scalar_header",
+            lambda: scan_header(
+                self.path,
+                self._is_one_file_per_group,
+                extended_format,
+                opener=opener,
+                opener_mode=opener_mode,
+            ),
         )
 
-        if self._is_one_file_per_group:
+        if has_all_reductions and self._reduction is not None:
+            self._vars_columns.update(self._select_reduction(columns_info))
+        elif self._is_one_file_per_group:
             self._vars_columns.update(columns_info)
         else:
             # There is only one data_column
@@ -227,24 +424,67 @@ class OneScalar:
             raise KeyError(f"{variable} not available")
 
         column_number = self._vars_columns[variable]
-        t, y = np.loadtxt(
+
+        return _load_timeseries(
             self.path,
-            unpack=True,
-            ndmin=2,
-            usecols=(self._time_column, column_number),
+            self._time_column,
+            column_number,
+            self._rows_read,
+            variable,
         )
 
-        return ts.remove_duplicated_iters(t, y)
-
     def __getitem__(self, key):
         if key not in self._vars:
             # Error checking is done in __load__
             self._vars[key] = self.load(key)
         return self._vars[key]
 
+    def refresh(self):
+        """Read the lines appended to the file since the variables were loaded.
+
+        This is useful to follow a running simulation. Only the new lines are
+        parsed, and they are merged with the data already in memory with the
+        same rules as :py:func:`~.remove_duplicated_iters`. If the file was
+        modified in other ways, the variables are read again.
+
+        :returns: Whether any variable changed.
+        :rtype: bool
+
+        """
+        # Nothing was read yet (and the header may not have been scanned)
+        if not self._vars:
+            return False
+
+        changed = _refresh_timeseries(
+            self.path,
+            self._time_column,
+            self._vars_columns,
+            self._vars,
+            # setdefault is for objects loaded from old pickles
+            self.__dict__.setdefault("_rows_read", {}),
+        )
+        if changed:
+            # The cache of load is shared by all the instances, but we cannot
+            # remove only the entries of this object
+            type(self).load.cache_clear()
+        return changed
+
     def __contains__(self, key):
         return key in self._vars_columns
 
+    def _metadata_state(self):
+        """Return the state of the object without the data read from the file.
+
+        This is used by :py:meth:`~.SimDir.save`.
+
+        :returns: State of the object.
+        :rtype: dict
+        """
+        state = self.__dict__.copy()
+        state["_vars"] = {}
+        state["_rows_read"] = {}
+        return state
+
     def keys(self):
         """Return the list of variables available.
 
@@ -289,6 +529,24 @@ class TwoScalar:
         None: "scalar",
     }
 
+    # Content of the bhns.jon.N files, there is one file for each extraction
+    # radius N
+    _jon_columns = {
+        "fisheye radius": 1,
+        "phys radius": 2,
+        "Mass_sur": 3,
+        "Ang_mom_surf": 4,
+        "Komar Mass": 5,
+        "P_x2": 6,
+        "P_y2": 7,
+        "P_z2": 8,
+        "F_M0": 9,
+        "F_E_fluid": 10,
+        "F_E_em": 11,
+        "F_J_fluid": 12,
+        "F_J_em": 13,
+    }
+
     # What function to use to open the file?
     # What mode?
     _decompressor = {
@@ -302,6 +560,13 @@ class TwoScalar:
         # The _vars dictionary contains a mapping between the various variables
         # and the column numbers in which they are stored.
         self._vars = {}
+        # The _timeseries dictionary maps variables with the TimeSeries. It is
+        # used to cached loaded data.
+        self._timeseries = {}
+        # See OneScalar
+        self._rows_read = {}
+        # Only for the bhns.jon.N files
+        self.extraction_radius_number = None
         self.folder, filename = os.path.split(self.path)
 
         filename_match = self._rx_filename.match(filename)
@@ -457,26 +722,11 @@ class TwoScalar:
         elif (file_name_segment3 == "jon") and (
             extraction_radius_number is not None
         ):
-            # Ultimately there should probably be a special structure for the
-            # variables from this set of diagnostic files that treats them as lists
-            # of values at different extraction radii.
-            # For now the extraction_radius_number will just be appended to the variable name string.
-            tmp = {
-                "fisheye radius": 1,
-                "phys radius": 2,
-                "Mass_sur": 3,
-                "Ang_mom_surf": 4,
-                "Komar Mass": 5,
-                "P_x2": 6,
-                "P_y2": 7,
-                "P_z2": 8,
-                "F_M0": 9,
-                "F_E_fluid": 10,
-                "F_E_em": 11,
-                "F_J_fluid": 12,
-                "F_J_em": 13,
-            }
-            for key, val in tmp.items():
+            # The extraction_radius_number is appended to the variable name
+            # string. To access all the extraction radii at once, use
+            # AllScalars.jon_array.
+            self.extraction_radius_number = int(extraction_radius_number)
+            for key, val in self._jon_columns.items():
                 self._vars[key + "_" + str(extraction_radius_number)] = val
         else:
             raise RuntimeError(f"Naming scheme not recognized for {filename}")
@@ -496,21 +746,58 @@ class TwoScalar:
             raise ValueError(f"{variable} not available")
 
         column_number = self._vars[variable]
-        t, y = np.loadtxt(
+
+        return _load_timeseries(
             self.path,
-            unpack=True,
-            ndmin=2,
-            usecols=(self._time_column, column_number),
+            self._time_column,
+            column_number,
+            self._rows_read,
+            variable,
         )
 
-        return ts.remove_duplicated_iters(t, y)
-
     def __getitem__(self, key):
-        return self.load(key)
+        # setdefault is for objects loaded from old pickles
+        timeseries = self.__dict__.setdefault("_timeseries", {})
+        if key not in timeseries:
+            timeseries[key] = self.load(key)
+        return timeseries[key]
 
     def __contains__(self, key):
         return key in self._vars
 
+    def refresh(self):
+        """Read the lines appended to the file since the variables were loaded.
+
+        See :py:meth:`~.OneScalar.refresh`.
+
+        :returns: Whether any variable changed.
+        :rtype: bool
+
+        """
+        changed = _refresh_timeseries(
+            self.path,
+            self._time_column,
+            self._vars,
+            self.__dict__.setdefault("_timeseries", {}),
+            self.__dict__.setdefault("_rows_read", {}),
+        )
+        if changed:
+            type(self).load.cache_clear()
+        return changed
+
+    def _metadata_state(self):
+        """Return the state of the object without the data read from the file.
+
+        This is used by :py:meth:`~.SimDir.save`.
+
+        :returns: State of the object.
+        :rtype: dict
+        """
+        state = self.__dict__.copy()
+        state["_timeseries"] = {}
+        state["_rows_read"] = {}
+        return state
+
     def keys(self):
         """Return the list of variables available.
 
@@ -534,19 +821,48 @@ class AllScalars:
 
     :ivar reduction_type: Type of reduction.
     :type reduction_type: str
+    :ivar max_workers: Number of processes used to read the files of a
+                       variable (see :py:func:`~.preload_tables`).
+    :type max_workers: int or None
 
     """
 
-    def __init__(self, allfiles, reduction_type):
+    def __init__(
+        self,
+        allfiles,
+        reduction_type,
+        index=None,
+        readers=None,
+        max_workers=1,
+    ):
         """Constructor.
 
         :param allfiles: List of all the files
         :type allfiles: list of str
         :param reduction_type: Type of reduction.
         :type reduction_type: str
+        :param index: Index where to look for the headers of the files.
+        :type index: :py:class:`~.SimDirIndex` or None
+        :param readers: Dictionary that maps paths to the objects that read
+                        them (or to None for files that cannot be read). It is
+                        used to share readers across different reductions. If
+                        None, a new one is created.
+        :type readers: dict or None
+        :param max_workers: Number of processes used to read the files of a
+                            variable. When a variable is spread across
+                            multiple files (e.g., one for each restart), the
+                            files are decompressed and parsed in parallel. If
+                            1, files are read one after the other. If None,
+                            use as many processes as processors.
+        :type max_workers: int or None
 
         """
         self.reduction_type = str(reduction_type)
+        self._index = index
+        self.max_workers = max_workers
+
+        # _readers is possibly shared with other AllScalars (see ScalarsDir)
+        self._readers = {} if readers is None else readers
 
         # TODO: Is it necessary to have the folder level?
         # Probably not, so remove it
@@ -558,40 +874,90 @@ class AllScalars:
         #
         # OneScalar objects act as readers.
         self._vars_readers = {}
-        for file_ in allfiles:
-            # We only save those that variables are well-behaved
-            try:
-                cactusascii_file = OneScalar(file_)
-                if cactusascii_file.reduction_type == reduction_type:
-                    for var in list(cactusascii_file.keys()):
-                        # We add to the _vars_readers dictionary the mapping:
-                        # [var][folder] to OneScalar(f)
-                        folder = cactusascii_file.folder
-                        self._vars_readers.setdefault(var, {})[
-                            folder
-                        ] = cactusascii_file
-            except RuntimeError:
-                try:
-                    cactusascii_file = TwoScalar(file_)
-                    if cactusascii_file.reduction_type == reduction_type:
-                        for var in list(cactusascii_file.keys()):
-                            # We add to the _vars dictionary the mapping:
-                            # [var][folder] to OneScalar(f)
-                            folder = cactusascii_file.folder
-                            self._vars_readers.setdefault(var, {})[
-                                folder
-                            ] = cactusascii_file
-                except RuntimeError:
-                    pass
 
         # We cache the results in _vars, a dictionary with keys the variables
         # and values the timeseries.
         self._vars = {}
 
+        self._add_files(allfiles)
+
+    def _add_files(self, allfiles):
+        """Add the given files to the ones that are indexed.
+
+        The cached timeseries of the variables that are found in the new files
+        are discarded, so that they will be recombined the next time they are
+        read. The data already read from other files is kept.
+
+        :param allfiles: List of the new files.
+        :type allfiles: list of str
+
+        """
+        updated_vars = set()
+        for file_ in allfiles:
+            cactusascii_file = self._reader(file_)
+            # We only save those that variables are well-behaved
+            if cactusascii_file is None:
+                continue
+            if cactusascii_file.reduction_type == self.reduction_type:
+                # getattr is because TwoScalar does not have this attribute
+                has_all_reductions = getattr(
+                    cactusascii_file, "_has_all_reductions", False
+                )
+                for var in list(cactusascii_file.keys()):
+                    # We add to the _vars_readers dictionary the mapping:
+                    # [var][folder] to OneScalar(f)
+                    folder = cactusascii_file.folder
+                    folders = self._vars_readers.setdefault(var, {})
+                    # If a variable is both in a file with only this reduction
+                    # and in a file with all the reductions, we prefer the
+                    # first, independently of the order of the files
+                    if has_all_reductions and not getattr(
+                        folders.get(folder), "_has_all_reductions", True
+                    ):
+                        continue
+                    folders[folder] = cactusascii_file
+                    updated_vars.add(var)
+
+        for var in updated_vars:
+            self._vars.pop(var, None)
+
         # What pythonize_name_dict does is to make the various variables
         # accessible as attributes, e.g. self.fields.rho
         self.fields = pythonize_name_dict(list(self.keys()), self.__getitem__)
 
+    def _reader(self, path):
+        """Return the object that reads the file ``path``.
+
+        Readers are created only once for each file and stored in
+        ``_readers``. Files that contain all the reductions have one reader
+        for each reduction (with key the tuple of path and reduction). These
+        readers share the parsed file through the cache of
+        :py:func:`~.read_columns`, so the file is read only once.
+
+        :param path: Path of the file.
+        :type path: str
+
+        :returns: Reader of the file, or None if the file is not recognized.
+        :rtype: :py:class:`~.OneScalar`, :py:class:`~.TwoScalar`, or None
+
+        """
+        key, reduction = path, None
+        if OneScalar._is_all_reductions_file(path):
+            key, reduction = (path, self.reduction_type), self.reduction_type
+
+        if key not in self._readers:
+            try:
+                reader = OneScalar(
+                    path, index=self._index, reduction=reduction
+                )
+            except RuntimeError:
+                try:
+                    reader = TwoScalar(path)
+                except RuntimeError:
+                    reader = None
+            self._readers[key] = reader
+        return self._readers[key]
+
     def __getitem__(self, key):
         if key not in self:
             raise KeyError(f"{key} not available")
@@ -599,6 +965,13 @@ class AllScalars:
         if key not in self._vars:
             # We read all the files associated to variable key
             folders = self._vars_readers[key]
+            # getattr is for objects loaded from old pickles
+            max_workers = getattr(self, "max_workers", 1)
+            if max_workers != 1 and len(folders) > 1:
+                # Parsing the files is the expensive part, so we do it in
+                # parallel. The readers will then find the files in the cache
+                # of read_columns.
+                preload_tables([f.path for f in folders.values()], max_workers)
             series = [f[key] for f in folders.values()]
             self._vars[key] = ts.combine_ts(series)
 
@@ -607,6 +980,119 @@ class AllScalars:
     def __contains__(self, key):
         return key in self._vars_readers
 
+    def jon_array(self, quantity):
+        """Return a quantity from the IL BHNS surface diagnostics at all the
+        extraction radii.
+
+        The diagnostics are in the ``bhns.jon.N`` files, one for each
+        extraction radius ``N``, and each quantity is available as a separate
+        variable for each radius (e.g., ``F_E_em_3``). This function reads all
+        the radii at once (in parallel, if ``max_workers`` is not 1) and
+        returns them on the times that are common to all the radii.
+
+        :param quantity: Quantity, without the number of the radius (e.g.,
+                         ``F_E_em``).
+        :type quantity: str
+
+        :returns: Numbers of the extraction radii, times, and 2D array with the
+                  values, with shape (number of radii, number of times).
+        :rtype: tuple of 1D NumPy array, 1D NumPy array, 2D NumPy array
+
+        """
+        if quantity not in TwoScalar._jon_columns:
+            raise KeyError(f"{quantity} is not a bhns.jon quantity")
+
+        # Here we map extraction radii to the variables
+        variables = {}
+        for folders in self._vars_readers.values():
+            for reader in folders.values():
+                radius = getattr(reader, "extraction_radius_number", None)
+                if radius is not None:
+                    variables[radius] = f"{quantity}_{radius}"
+
+        if not variables:
+            raise KeyError(f"{quantity} not available")
+
+        radii = np.array(sorted(variables))
+        variables = [variables[radius] for radius in radii]
+
+        # We read all the files (all the radii in all the restarts) at the
+        # same time, so that we can use all the processes
+        max_workers = getattr(self, "max_workers", 1)
+        if max_workers != 1:
+            preload_tables(
+                [
+                    reader.path
+                    for var in variables
+                    if var not in self._vars
+                    for reader in self._vars_readers[var].values()
+                ],
+                max_workers,
+            )
+
+        series = [self[var] for var in variables]
+
+        # The timeseries are sorted and without duplicates, so the common
+        # times can be found with intersect1d, and their position in each
+        # timeseries with searchsorted
+        times = series[0].t
+        for timeseries in series[1:]:
+            times = np.intersect1d(times, timeseries.t, assume_unique=True)
+
+        values = np.stack(
+            [
+                timeseries.y[np.searchsorted(timeseries.t, times)]
+                for timeseries in series
+            ]
+        )
+
+        return radii, times, values
+
+    def _discard_timeseries(self, readers):
+        """Discard the cached timeseries that contain data read by any of the
+        given readers.
+
+        :param readers: Readers whose data changed.
+        :type readers: list of :py:class:`~.OneScalar` or
+                       :py:class:`~.TwoScalar`
+
+        """
+        changed = {id(reader) for reader in readers}
+        for var, folders in self._vars_readers.items():
+            if any(id(reader) in changed for reader in folders.values()):
+                self._vars.pop(var, None)
+
+    def refresh(self):
+        """Read the data appended to the files since they were read.
+
+        This is useful to follow a running simulation. Only the new lines of
+        the files are parsed (see :py:meth:`~.OneScalar.refresh`).
+
+        :returns: Whether any variable changed.
+        :rtype: bool
+
+        """
+        readers = {
+            id(reader): reader
+            for folders in self._vars_readers.values()
+            for reader in folders.values()
+        }
+        changed = [reader for reader in readers.values() if reader.refresh()]
+        self._discard_timeseries(changed)
+        return bool(changed)
+
+    def _metadata_state(self):
+        """Return the state of the object without the data read from the files.
+
+        This is used by :py:meth:`~.SimDir.save`.
+
+        :returns: State of the object.
+        :rtype: dict
+        """
+        state = self.__dict__.copy()
+        state["_vars"] = {}
+        return state
+
     def keys(self):
         """Return the available variables corresponding to the given reduction.
 
@@ -653,10 +1139,25 @@ class ScalarsDir:
     :ivar infnorm:   access to inf-norm reduction.
 
     Each of those works as a dictionary mapping variable names to
-    :py:class:`~.TimeSeries` instances.
+    :py:class:`~.TimeSeries` instances. The reductions are built the first
+    time they are accessed.
+
+    Setting the attribute ``max_workers`` to a number different from 1 enables
+    reading the files of the different restarts in parallel processes (see
+    :py:class:`~.AllScalars`).
 
     """
 
+    _reduction_types = (
+        "scalar",
+        "minimum",
+        "maximum",
+        "norm1",
+        "norm2",
+        "average",
+        "infnorm",
+    )
+
     # TODO: Implement the following, possibly in a clean way
 
     # .. note::
@@ -673,18 +1174,206 @@ class ScalarsDir:
             raise TypeError("Input is not SimDir")
 
         self.path = sd.path
-        self.point = AllScalars(sd.allfiles, "scalar")
-        self.scalar = AllScalars(sd.allfiles, "scalar")
-        self.minimum = AllScalars(sd.allfiles, "minimum")
-        self.maximum = AllScalars(sd.allfiles, "maximum")
-        self.norm1 = AllScalars(sd.allfiles, "norm1")
-        self.norm2 = AllScalars(sd.allfiles, "norm2")
-        self.average = AllScalars(sd.allfiles, "average")
-        self.infnorm = AllScalars(sd.allfiles, "infnorm")
-
-        # Aliases
-        self.max = self.maximum
-        self.min = self.minimum
+
+        # getattr is for SimDirs loaded from old pickles
+        self._index = getattr(sd, "index", None)
+
+        # SimDir has already sorted the files according to their reduction (see
+        # _file_kinds), so each AllScalars only looks at its own files. We copy
+        # the lists because we may extend them in _add_files.
+        self._files = {
+            reduction_type: list(
+                sd._files_of_kind(("scalars", reduction_type))
+            )
+            for reduction_type in self._reduction_types
+        }
+
+        # The reductions are built only when they are first accessed. Building
+        # an AllScalars requires inspecting all its files, so there is no
+        # reason to pay this cost for the reductions that are not used.
+        self._reductions = {}
+
+        # Readers (OneScalar and TwoScalar) are shared across all the
+        # reductions, so that each file is inspected only once
+        self._readers = {}
+
+        self._max_workers = 1
+
+    @property
+    def max_workers(self):
+        """Number of processes used to read the files of a variable.
+
+        :rtype: int or None
+        """
+        # getattr is for objects loaded from old pickles
+        return getattr(self, "_max_workers", 1)
+
+    @max_workers.setter
+    def max_workers(self, max_workers):
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("max_workers has to be a positive number")
+        self._max_workers = max_workers
+        for reduction in self._reductions.values():
+            reduction.max_workers = max_workers
+
+    def _get_reduction(self, reduction_type):
+        """Return the :py:class:`~.AllScalars` for the given reduction, building
+        it if needed.
+
+        :param reduction_type: Type of reduction.
+        :type reduction_type: str
+
+        :returns: Collection of all the variables with a given reduction.
+        :rtype: :py:class:`~.AllScalars`
+
+        """
+        if reduction_type not in self._reductions:
+            self._reductions[reduction_type] = AllScalars(
+                self._files[reduction_type],
+                reduction_type,
+                index=self._index,
+                readers=self._readers,
+                max_workers=self.max_workers,
+            )
+        return self._reductions[reduction_type]
+
+    @property
+    def scalar(self):
+        """Return the grid scalars.
+
+        :returns: Collection of all the grid scalars.
+        :rtype: :py:class:`~.AllScalars`
+        """
+        return self._get_reduction("scalar")
+
+    @property
+    def minimum(self):
+        """Return the minimum reduction.
+
+        :returns: Collection of all the variables with minimum reduction.
+        :rtype: :py:class:`~.AllScalars`
+        """
+        return self._get_reduction("minimum")
+
+    @property
+    def maximum(self):
+        """Return the maximum reduction.
+
+        :returns: Collection of all the variables with maximum reduction.
+        :rtype: :py:class:`~.AllScalars`
+        """
+        return self._get_reduction("maximum")
+
+    @property
+    def norm1(self):
+        """Return the norm1 reduction.
+
+        :returns: Collection of all the variables with norm1 reduction.
+        :rtype: :py:class:`~.AllScalars`
+        """
+        return self._get_reduction("norm1")
+
+    @property
+    def norm2(self):
+        """Return the norm2 reduction.
+
+        :returns: Collection of all the variables with norm2 reduction.
+        :rtype: :py:class:`~.AllScalars`
+        """
+        return self._get_reduction("norm2")
+
+    @property
+    def average(self):
+        """Return the average reduction.
+
+        :returns: Collection of all the variables with average reduction.
+        :rtype: :py:class:`~.AllScalars`
+        """
+        return self._get_reduction("average")
+
+    @property
+    def infnorm(self):
+        """Return the inf-norm reduction.
+
+        :returns: Collection of all the variables with inf-norm reduction.
+        :rtype: :py:class:`~.AllScalars`
+        """
+        return self._get_reduction("infnorm")
+
+    # Aliases
+    point = scalar
+    max = maximum
+    min = minimum
+
+    @staticmethod
+    def _file_kinds(filename):
+        """Return the kinds of the file with name ``filename`` that are relevant
+        for :py:class:`~.ScalarsDir`.
+
+        This is used by :py:class:`~.SimDir` to classify the files. The kind is
+        the tuple ``("scalars", reduction_type)``, where ``reduction_type`` is
+        read from the name of the file. Files that contain all the reductions
+        have one kind for each reduction.
+
+        :param filename: Name of the file (without folders).
+        :type filename: str
+
+        :returns: Kinds of the file.
+        :rtype: list of tuple
+
+        """
+        matched = OneScalar._rx_filename.match(filename)
+        if matched is not None:
+            # group 6 is the reduction type
+            reduction_type = matched.group(6)
+            if reduction_type is None:
+                reduction_type = "scalar"
+            if reduction_type == "scalars":
+                # all_reductions_in_one_file, the file is used by all the
+                # reductions
+                return [
+                    ("scalars", reduction)
+                    for reduction in ScalarsDir._reduction_types
+                    if reduction != "scalar"
+                ]
+            return [("scalars", reduction_type)]
+        if TwoScalar._rx_filename.match(filename) is not None:
+            return [("scalars", "scalar")]
+        return []
+
+    def _add_files(self, files_by_kind):
+        """Add the given files to all the reductions.
+
+        :param files_by_kind: New files, as classified by :py:class:`~.SimDir`.
+        :type files_by_kind: dict
+
+        """
+        for reduction_type, files in self._files.items():
+            new_files = files_by_kind.get(("scalars", reduction_type), [])
+            if reduction_type in self._reductions:
+                self._reductions[reduction_type]._add_files(new_files)
+            # We also keep track of the files for the reductions that have not
+            # been built yet, and to keep _files consistent
+            files.extend(new_files)
+
+    def refresh(self):
+        """Read the data appended to the files since they were read.
+
+        This is useful to follow a running simulation. Only the new lines of
+        the files are parsed (see :py:meth:`~.OneScalar.refresh`).
+
+        :returns: Whether any variable changed.
+        :rtype: bool
+
+        """
+        changed = [
+            reader
+            for reader in self._readers.values()
+            if reader is not None and reader.refresh()
+        ]
+        for reduction in self._reductions.values():
+            reduction._discard_timeseries(changed)
+        return bool(changed)
 
     def __getitem__(self, reduction):
         return getattr(self, reduction)
@@ -39,10 +39,20 @@ such attribute.
 The function :py:func:`~.load_SimDir` can be used to load a :py:class:`~.SimDir`
 saved with the method :py:meth:`~.save`.
 
+Alternatively to pickles, the metadata extracted from the files (e.g., the
+content of the directories, or the variables in each file) can be stored in an
+index (see :py:mod:`~.simdir_index`) by passing the ``index_file`` argument.
+
 """
 
+import copyreg
 import os
 import pickle
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 
 from kuibit import (
     cactus_grid_functions,
@@ -51,6 +61,95 @@ from kuibit import (
     cactus_scalars,
     cactus_waves,
 )
+from kuibit.simdir_index import SimDirIndex
+
+
+# Arrays smaller than this are always saved inside the pickle, even when data
+# is saved out-of-band
+_OUT_OF_BAND_MIN_BYTES = 65536
+
+
+def _buffers_dir(path):
+    """Return the directory where the out-of-band buffers of the pickle ``path``
+    are saved.
+
+    :param path: Path of the pickle file.
+    :type path: str
+
+    :returns: Path of the directory with the buffers.
+    :rtype: str
+
+    """
+    return f"{path}.buffers"
+
+
+def _reduce_metadata_only(obj):
+    """Reduce ``obj`` to its state without the data read from files.
+
+    This is used as entry of the dispatch table of the pickler in
+    :py:meth:`~.SimDir.save` when ``data="none"``. The object must implement the
+    method ``_metadata_state``.
+
+    """
+    return (copyreg.__newobj__, (type(obj),), obj._metadata_state())
+
+
+class _MetadataPickler(pickle.Pickler):
+    """Pickler that drops the data cached in the readers.
+
+    The classes that cache data implement the method ``_metadata_state``, which
+    returns a copy of their state with the data removed. They are registered in
+    the ``dispatch_table``.
+
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # We cannot do this at the module level because of circular imports
+        self.dispatch_table = copyreg.dispatch_table.copy()
+        for cls in (
+            SimDir,
+            cactus_scalars.OneScalar,
+            cactus_scalars.TwoScalar,
+            cactus_scalars.AllScalars,
+            cactus_multipoles.MultipolesDir,
+            cactus_grid_functions.OneGridFunctionASCII,
+            cactus_grid_functions.OneGridFunctionH5,
+            cactus_grid_functions.AllGridFunctions,
+        ):
+            self.dispatch_table[cls] = _reduce_metadata_only
+
+
+def _classify_files(files):
+    """Sort the given files according to what they contain.
+
+    Each file is inspected only once (by name), and it is assigned to the kinds
+    returned by the method ``_file_kinds`` of the classes that interface with
+    :py:class:`~.SimDir` (e.g., :py:class:`~.ScalarsDir`). A file can have
+    multiple kinds.
+
+    :param files: Paths of the files.
+    :type files: list of str
+
+    :returns: Dictionary with keys the kinds and values the lists of files of
+              that kind (in the same order as ``files``).
+    :rtype: dict
+
+    """
+    file_kinds_functions = (
+        cactus_scalars.ScalarsDir._file_kinds,
+        cactus_grid_functions.GridFunctionsDir._file_kinds,
+        cactus_multipoles.MultipolesDir._file_kinds,
+        cactus_horizons.HorizonsDir._file_kinds,
+    )
+
+    files_by_kind = {}
+    for path in files:
+        filename = os.path.basename(path)
+        for file_kinds in file_kinds_functions:
+            for kind in file_kinds(filename):
+                files_by_kind.setdefault(kind, []).append(path)
+    return files_by_kind
 
 
 def load_SimDir(path):
@@ -58,6 +157,10 @@ def load_SimDir(path):
 
     Pickles have to be regenerated if the version of ``kuibit`` changes.
 
+    If data was saved out-of-band, the arrays are memory-mapped from the files
+    in the directory ``path.buffers``, so they are read from disk only when
+    they are used.
+
     :param path: Pickle file as produced by :py:meth:`~.SimDir.save`.
     :type path: str
 
@@ -65,8 +168,19 @@ def load_SimDir(path):
     :rtype: :py:class:`~.SimDir`
 
     """
+    buffers_dir = _buffers_dir(path)
     with open(path, "rb") as file_:
-        sim = pickle.load(file_)
+        if os.path.isdir(buffers_dir):
+            num_buffers = len(os.listdir(buffers_dir))
+            # mmap_mode="c" is copy-on-write: the arrays are writable, but the
+            # changes are not propagated to the files
+            buffers = [
+                np.load(os.path.join(buffers_dir, f"{num}.npy"), mmap_mode="c")
+                for num in range(num_buffers)
+            ]
+            sim = pickle.load(file_, buffers=buffers)
+        else:
+            sim = pickle.load(file_)
 
     if not isinstance(sim, SimDir):
         raise RuntimeError(f"File {path} does not contain a SimDir")
@@ -110,6 +224,20 @@ class SimDir:
        method. Pickles have to be regenerated from scratch if the version of
        ``kuibit`` changes.
 
+    A more robust alternative to pickles is to use an index file. The index
+    stores only the metadata extracted from the files (the list of files, the
+    content of the headers, the datasets available in the HDF5 files, ...), it
+    is validated against the size and the modification time of the files, and
+    it does not depend on the version of ``kuibit``.
+
+    .. code-block
+
+       with SimDir(sim_path, index_file="sim_index.json") as sim:
+            print(sim)
+
+    The index is saved after the directories are scanned and when the context
+    manager exits (or when ``sim.index.save()`` is called).
+
     Data is searched recursively in all subfolders. No particular folder
     structure (e.g. ``simfactory`` style) is assumed. The following attributes
     allow access to the supported data types:
@@ -118,6 +246,9 @@ class SimDir:
     :ivar dirs:           All directories in which data is searched.
     :ivar logfiles:       The locations of all log files (.out).
     :ivar errfiles:       The location of all error log files (.err).
+    :ivar scan_time:      Time (in seconds) spent scanning the directories.
+    :ivar index:          Index with the metadata of the files, see
+                          :py:class:`~.SimDirIndex` (None if not used).
     :ivar ts:             Scalar data of various type, see
                           :py:class:`~.ScalarsDir`
     :ivar gf:              Access to grid function data, see
@@ -144,62 +275,111 @@ class SimDir:
 
         return abs_path
 
-    def _scan_folders(self, max_depth):
+    def _scan_folders(self, max_depth, previous_dirs_content=None):
         """Scan all the folders in self.path up to depth ``max_depth``
         and categorize all the files.
 
+        Directories are listed with :py:func:`os.scandir`, which caches the
+        type of each entry, so that no additional ``stat`` call is needed to
+        distinguish files, directories and symlinks. All the directories at a
+        given depth are listed concurrently in a pool of threads.
+
+        The modification time of each directory is saved along with its
+        content. If ``previous_dirs_content`` is provided, directories that
+        have not been modified since are not listed again.
+
         :param max_depth: Maximum recursion depth to scan.
         :type max_depth: int
+        :param previous_dirs_content: Result of a previous scan, as stored in
+                                      ``self._dirs_content``.
+        :type previous_dirs_content: dict or None
         """
 
-        def listdir_process_symlinks(path):
-            """Return a list of files in path. If self.ignore_symlinks, exclude the
-            symlinks, otherwise keep them around.
+        start_time = time.perf_counter()
+
+        if previous_dirs_content is None:
+            previous_dirs_content = {}
+
+        def scandir_process_symlinks(path):
+            """Return the files and the subdirectories in path that have to be
+            considered. If self.ignore_symlinks, exclude the symlinks, otherwise
+            keep them around. Subdirectories with name in self.ignored_dirs are
+            excluded.
 
             """
-            dir_content = [os.path.join(path, p) for p in os.listdir(path)]
-            if not self.ignore_symlinks:
-                return dir_content
-            return [p for p in dir_content if not os.path.islink(p)]
+            files, subdirs = [], []
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if self.ignore_symlinks and entry.is_symlink():
+                        continue
+                    # is_file and is_dir follow symlinks, as os.path.isfile and
+                    # os.path.isdir do
+                    if entry.is_file():
+                        files.append(entry.path)
+                    elif (
+                        entry.is_dir() and entry.name not in self.ignored_dirs
+                    ):
+                        subdirs.append(entry.path)
+            return files, subdirs
+
+        def list_dir(path):
+            """Return a tuple (mtime, files, subdirs) for the directory path.
+            If the directory was not modified since the previous scan, reuse
+            the previous result.
+
+            """
+            # We read the modification time before listing the directory, so
+            # that changes that happen while we are listing it are picked up by
+            # the next scan
+            mtime = os.stat(path).st_mtime_ns
+            previous = previous_dirs_content.get(path)
+            if previous is not None and previous[0] == mtime:
+                return previous
+            return (mtime, *scandir_process_symlinks(path))
 
         def filter_ext(files, ext):
             """Return a list from the input list of file that
             has file extension ext."""
             return [f for f in files if os.path.splitext(f)[1] == ext]
 
-        def walk_rec(path, level=0):
-            """Walk_rec is a recursive function that steps down all the
-            subdirectories (except the ones with name defined in
-            self.ignored_dirs) up to max_depth and add to self.allfiles the
-            files found in the directories.
+        # We walk the tree breadth-first: all the directories at the same depth
+        # are independent, so we can list them concurrently. dirs_content maps
+        # each directory to the tuple (mtime, files, subdirectories).
+        dirs_content = {}
+        dirs_to_scan = [self.path] if max_depth > 0 else []
+        level = 0
+        with ThreadPoolExecutor(max_workers=self.max_scan_threads) as pool:
+            while dirs_to_scan:
+                # map returns the results in the same order as the input
+                results = pool.map(list_dir, dirs_to_scan)
+                next_dirs_to_scan = []
+                for path, content in zip(dirs_to_scan, results):
+                    dirs_content[path] = content
+                    if level + 1 < max_depth:
+                        next_dirs_to_scan.extend(content[2])
+                dirs_to_scan = next_dirs_to_scan
+                level += 1
+
+        def collect_rec(path):
+            """Collect_rec is a recursive function that adds to self.dirs and
+            self.allfiles the content of the scanned directories. We walk the
+            tree depth-first, so that the order is independent of how the
+            directories were scanned.
 
             """
-            if level >= max_depth:
-                return
-
             self.dirs.append(path)
-
-            all_files_in_path = listdir_process_symlinks(path)
-
-            files_in_path = list(filter(os.path.isfile, all_files_in_path))
+            _, files_in_path, directories_in_path = dirs_content[path]
             self.allfiles += files_in_path
+            for p in directories_in_path:
+                if p in dirs_content:
+                    collect_rec(p)
 
-            directories_in_path = list(
-                filter(os.path.isdir, all_files_in_path)
-            )
-
-            # We ignore the ones in self.ignored_dirs
-            directories_to_scan = [
-                p
-                for p in directories_in_path
-                if (os.path.basename(p) not in self.ignored_dirs)
-            ]
-
-            # Apply walk_rec to all the subdirectory, but with level increased
-            for p in directories_to_scan:
-                walk_rec(p, level + 1)
+        self.dirs = []
+        self.allfiles = []
+        if self.path in dirs_content:
+            collect_rec(self.path)
 
-        walk_rec(self.path)
+        self._dirs_content = dirs_content
 
         self.logfiles = filter_ext(self.allfiles, ".out")
         self.errfiles = filter_ext(self.allfiles, ".err")
@@ -215,11 +395,13 @@ class SimDir:
         # Simfactory has a folder SIMFACTORY with a subdirectory for par files
         # Even if SIMFACTORY is excluded, we should include that par file
         if os.path.isdir(simfac):
-            mainpar = filter_ext(listdir_process_symlinks(simfac), ".par")
+            mainpar = filter_ext(scandir_process_symlinks(simfac)[0], ".par")
             self.parfiles = mainpar + self.parfiles
 
         self.has_parfile = bool(self.parfiles)
 
+        self.scan_time = time.perf_counter() - start_time
+
     def __init__(
         self,
         path,
@@ -227,6 +409,10 @@ class SimDir:
         ignored_dirs=None,
         ignore_symlinks=True,
         pickle_file=None,
+        max_scan_threads=None,
+        index_file=None,
+        pickle_data="inline",
+        grid_cache_size=None,
     ):
         """Constructor.
 
@@ -242,6 +428,25 @@ class SimDir:
                             folders and load the pickle file. All the other
                             parameters are ignored.
         :type pickle_file: bool
+        :param max_scan_threads: Maximum number of threads used to list the
+                                 directories. If None, use the default of
+                                 :py:class:`concurrent.futures.ThreadPoolExecutor`.
+        :type max_scan_threads: int or None
+        :param index_file: If not None, path of the file where to store the
+                           metadata of the simulation. If the file exists, the
+                           metadata that is still valid is reused.
+        :type index_file: str or None
+        :param pickle_data: How to save the data read from files when saving
+                            ``pickle_file``. See :py:meth:`~.save`.
+        :type pickle_data: str
+        :param grid_cache_size: Maximum memory (in bytes) used to keep the
+                                components of the grid functions that were
+                                read. When the limit is reached, the
+                                iterations used least recently are removed. If
+                                None, the grid functions share a global cache
+                                (see
+                                :py:func:`~.set_components_cache_size`).
+        :type grid_cache_size: int or None
 
         Parfiles (``*.par``) will be searched in all data directories and the
         top-level SIMFACTORY/par folder, if it exists. The parfile in the latter
@@ -261,6 +466,8 @@ class SimDir:
         self.max_depth = int(max_depth)
         self.ignored_dirs = ignored_dirs
         self.ignore_symlinks = ignore_symlinks
+        self.max_scan_threads = max_scan_threads
+        self.grid_cache_size = grid_cache_size
 
         self.dirs = []
         self.parfiles = []
@@ -268,6 +475,10 @@ class SimDir:
         self.errfiles = []
         self.allfiles = []
         self.has_parfile = False
+        self.scan_time = None
+        self._dirs_content = {}
+        self._files_by_kind = None
+        self.index = None if index_file is None else SimDirIndex(index_file)
         self.__timeseries = None
         self.__multipoles = None
         self.__gravitationalwaves = None
@@ -285,11 +496,24 @@ class SimDir:
         # We set this later, so that if it was read from the pickle, we override
         # it in such a way that we have consistency.
         self.pickle_file = pickle_file
+        self.pickle_data = pickle_data
 
     def _populate(self):
         """Scan the folders and populate basic attributes."""
 
-        self._scan_folders(self.max_depth)
+        if self.index is not None:
+            previous_dirs_content = self.index.dirs_content(
+                self._scan_options()
+            )
+        else:
+            previous_dirs_content = None
+
+        self._scan_folders(
+            self.max_depth, previous_dirs_content=previous_dirs_content
+        )
+        self._files_by_kind = _classify_files(self.allfiles)
+
+        self._update_index()
 
         self.__timeseries = None
         self.__multipoles = None
@@ -298,9 +522,124 @@ class SimDir:
         self.__gridfunctions = None
         self.__horizons = None
 
-    def rescan(self):
-        """Reset the SimDir and rescan all the files."""
-        self._populate()
+    def rescan(self, incremental=False):
+        """Rescan all the files.
+
+        If ``incremental`` is False, reset the SimDir and rescan all the files.
+        All the data already read is discarded.
+
+        If ``incremental`` is True, only the directories that were modified
+        since the last scan (according to their modification time) are listed
+        again. The new files (for example, a new ``output-NNNN`` folder) are
+        added to the readers that are already initialized, and the data that
+        was already read is kept. The timeseries that were already read are
+        updated with the lines appended to their files (only the new lines are
+        parsed). This is useful to monitor a running simulation.
+
+        .. note::
+
+           Files are assumed to be only added. Files that are removed are not
+           detected by the incremental rescan. Among the files that are
+           modified in place, only the scalars are updated.
+
+        :param incremental: Only add the new files instead of starting over.
+        :type incremental: bool
+
+        """
+        # If we do not have the information about the previous scan (e.g., the
+        # SimDir comes from an old pickle), we have to start over
+        if not incremental or not getattr(self, "_dirs_content", None):
+            self._populate()
+            return
+
+        old_files = set(self.allfiles)
+        self._scan_folders(
+            self.max_depth, previous_dirs_content=self._dirs_content
+        )
+        new_files = [f for f in self.allfiles if f not in old_files]
+
+        if new_files:
+            self._add_files(new_files)
+
+        # The files of a running simulation grow
+        if self.__timeseries is not None:
+            self.__timeseries.refresh()
+
+        self._update_index()
+
+    def _scan_options(self):
+        """Return the options that affect the content of the scanned
+        directories.
+
+        :returns: Options used to scan the directories.
+        :rtype: dict
+
+        """
+        return {
+            "ignore_symlinks": self.ignore_symlinks,
+            "ignored_dirs": sorted(self.ignored_dirs),
+        }
+
+    def _update_index(self):
+        """Store the result of the scan in the index (if used) and save it."""
+        # getattr is for SimDirs loaded from old pickles
+        index = getattr(self, "index", None)
+        if index is None:
+            return
+
+        index.set_dirs_content(self._dirs_content, self._scan_options())
+        # We remove the information about files that are no longer there
+        index.prune(self.allfiles)
+        index.save()
+
+    def _files_of_kind(self, kind):
+        """Return the files of the given kind (see ``_classify_files``).
+
+        :param kind: Kind of the files.
+        :type kind: str or tuple
+
+        :returns: Paths of the files of the given kind.
+        :rtype: list of str
+
+        """
+        # getattr is for SimDirs loaded from old pickles
+        if getattr(self, "_files_by_kind", None) is None:
+            self._files_by_kind = _classify_files(self.allfiles)
+        return self._files_by_kind.get(kind, [])
+
+    def _add_files(self, new_files):
+        """Add the given files to the readers that are already initialized.
+
+        :param new_files: Paths of the files to add.
+        :type new_files: list of str
+
+        """
+        # We classify only the new files, and we merge them with the others
+        new_files_by_kind = _classify_files(new_files)
+        if getattr(self, "_files_by_kind", None) is None:
+            self._files_by_kind = _classify_files(self.allfiles)
+        else:
+            for kind, files in new_files_by_kind.items():
+                self._files_by_kind.setdefault(kind, []).extend(files)
+
+        if self.__timeseries is not None:
+            self.__timeseries._add_files(new_files_by_kind)
+        if self.__multipoles is not None:
+            self.__multipoles._add_files(
+                new_files_by_kind.get("multipoles", [])
+            )
+        if self.__gridfunctions is not None:
+            self.__gridfunctions._add_files(new_files_by_kind)
+        if self.__horizons is not None:
+            self.__horizons._add_files(
+                self, new_files_by_kind.get("horizons", [])
+            )
+
+        # The waves are built on top of the multipoles, which keep their cache
+        # for the variables that are not affected by the new files, so these
+        # objects are inexpensive to recreate
+        self.__gravitationalwaves = None
+        self.__electromagneticwaves = None
 
     @property
     def timeseries(self):
@@ -408,22 +747,110 @@ class SimDir:
         return self
 
     def __exit__(self, _1, _2, _3):
-        """Save the SimDir to disk as pickle.
+        """Save the SimDir to disk as pickle and the index (if used), close
+        the HDF5 files of this simulation kept open to read grid functions,
+        and shut down the processes used to read them in parallel.
 
         This is called when the object is used as a context manager.
 
+        .. warning::
+
+           The processes used to read grid functions in parallel are shared
+           by all the :py:class:`~.SimDir` in the same program (see
+           :py:func:`~.close_process_pools`), so they are shut down also for
+           the other ones (and started again when needed). Reads in progress
+           in other threads are completed first.
+
         """
         if self.pickle_file is not None:
-            self.save(self.pickle_file)
+            # getattr is for SimDirs loaded from old pickles
+            self.save(
+                self.pickle_file, data=getattr(self, "pickle_data", "inline")
+            )
+        if getattr(self, "index", None) is not None:
+            self.index.save()
+        # The files of other SimDirs may be in use
+        cactus_grid_functions.close_h5_files(self.allfiles)
+        cactus_grid_functions.close_process_pools()
+
+    def _metadata_state(self):
+        """Return the state of the object without the data read from files.
+
+        The horizons and the waves are built directly from the data, so they
+        are dropped (and recreated when needed).
+
+        :returns: State of the object.
+        :rtype: dict
+        """
+        state = self.__dict__.copy()
+        state["_SimDir__horizons"] = None
+        state["_SimDir__gravitationalwaves"] = None
+        state["_SimDir__electromagneticwaves"] = None
+        return state
 
-    def save(self, path):
+    def save(self, path, data="inline"):
         """Save this object as a pickle.
 
         The object can be loaded with the function :py:func:`~.load_SimDir`.
 
+        ``data`` controls what happens to the data that was read from the files
+        and is cached in memory:
+
+        - ``inline``: the data is saved in the pickle.
+        - ``none``: only the information needed to index the files is saved.
+          The data will be read again from the files when needed. This keeps
+          the pickle small.
+        - ``out_of_band``: large arrays are saved as ``.npy`` files in the
+          directory ``path.buffers`` instead of being serialized in the
+          pickle. When loaded, these arrays are memory-mapped. This requires
+          Python 3.8 or newer.
+
         :param path: Path where to save the file.
         :type path: str
+        :param data: How to save the data (``inline``, ``none``, or
+                     ``out_of_band``).
+        :type data: str
 
         """
+        if data not in ("inline", "none", "out_of_band"):
+            raise ValueError(f"Unknown option for data: {data}")
+
+        if data == "out_of_band" and pickle.HIGHEST_PROTOCOL < 5:
+            raise RuntimeError("out_of_band requires Python 3.8 or newer")
+
+        # We remove the buffers of previous saves, otherwise load_SimDir would
+        # use them
+        buffers_dir = _buffers_dir(path)
+        if os.path.isdir(buffers_dir):
+            shutil.rmtree(buffers_dir)
+
         with open(path, "wb") as file_:
-            pickle.dump(self, file_, protocol=pickle.HIGHEST_PROTOCOL)
+            if data == "inline":
+                pickle.dump(self, file_, protocol=pickle.HIGHEST_PROTOCOL)
+            elif data == "none":
+                pickler = _MetadataPickler(
+                    file_, protocol=pickle.HIGHEST_PROTOCOL
+                )
+                pickler.dump(self)
+            else:
+                buffers = []
+
+                def buffer_callback(buffer):
+                    # Returning True means that the buffer is serialized
+                    # in-band, which is what we do for small buffers
+                    if buffer.raw().nbytes < _OUT_OF_BAND_MIN_BYTES:
+                        return True
+                    buffers.append(buffer)
+                    return False
+
+                pickle.dump(
+                    self, file_, protocol=5, buffer_callback=buffer_callback
+                )
+
+                if buffers:
+                    os.mkdir(buffers_dir)
+                    for num, buffer in enumerate(buffers):
+                        np.save(
+                            os.path.join(buffers_dir, f"{num}.npy"),
+                            np.frombuffer(buffer.raw(), dtype=np.uint8),
+                        )
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2021 Gabriele Bozzola
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, see <https://www.gnu.org/licenses/>.
+
+"""The :py:mod:`~.simdir_index` module provides a persistent index with the
+metadata extracted from the files of a simulation.
+
+When a :py:class:`~.SimDir` is initialized, ``kuibit`` has to list all the
+directories and inspect a large number of files to understand what they contain
+(e.g., the headers of the ASCII files, or the datasets in the HDF5 files). This
+work is repeated every time a :py:class:`~.SimDir` is created. The
+:py:class:`~.SimDirIndex` saves this information to a compact JSON file, so
+that it can be reused.
+
+Contrarily to pickles, the index does not store any Python object, so it is
+robust against changes in ``kuibit``. The file contains a version number, and
+it is discarded if the version does not match :py:attr:`~.SimDirIndex.VERSION`.
+Each entry is associated to a file in the simulation, and it is validated
+against the size and modification time of such file. When a file changes, only
+the entries associated to that file are discarded.
+
+The available functions are:
+
+- :py:func:`~.cached_metadata`: Return the metadata from the index, or compute
+                                it and store it in the index.
+
+"""
+
+import json
+import os
+import warnings
+
+
+def cached_metadata(index, path, kind, compute):
+    """Return the metadata ``kind`` for the file ``path``.
+
+    If ``index`` is None, just call ``compute``. Otherwise, look up the value in
+    the index, and compute it (and store it in the index) only if it is not
+    available or if it is stale.
+
+    :param index: Index where to look for the metadata.
+    :type index: :py:class:`~.SimDirIndex` or None
+    :param path: Path of the file the metadata refers to.
+    :type path: str
+    :param kind: What type of metadata (e.g., ``h5_catalog``).
+    :type kind: str
+    :param compute: Function with no arguments that computes the metadata. The
+                    return value has to be serializable in JSON.
+    :type compute: callable
+
+    :returns: Metadata.
+    :rtype: any
+
+    """
+    if index is None:
+        return compute()
+    return index.cached(path, kind, compute)
+
+
+class SimDirIndex:
+    """Versioned on-disk index with the metadata of the files of a simulation.
+
+    :py:class:`~.SimDirIndex` stores:
+
+    - The content of each directory scanned (with the modification time of the
+      directory), so that directories that did not change are not listed again.
+    - For each file, a set of entries (e.g., the column map of an ASCII
+      header, or the list of datasets in an HDF5 file). Each entry is
+      identified by a ``kind``.
+
+    Entries are validated by the size and the modification time of the file
+    they refer to. The first time an entry of a given file is requested, the
+    file is inspected, and if it changed all its entries are discarded.
+
+    Values have to be JSON-serializable. Tuples are returned as lists.
+
+    :ivar path: Path of the file where the index is saved.
+    :type path: str or None
+    :ivar modified: Whether there are changes that have not been saved.
+    :type modified: bool
+
+    """
+
+    # Increase this number every time the format of the index (or of its
+    # entries) changes
+    VERSION = 1
+
+    def __init__(self, path=None):
+        """Constructor.
+
+        If the file ``path`` exists and it is a valid index, load it.
+        Otherwise, start with an empty index.
+
+        :param path: Path of the file where the index is saved.
+        :type path: str or None
+
+        """
+        self.path = path
+
+        # _dirs has as keys the directories, and as values lists
+        # [mtime_ns, files, subdirs], as in SimDir._dirs_content
+        self._dirs = {}
+        # _scan_options are the options used to produce _dirs (e.g.,
+        # ignore_symlinks). If they change, _dirs cannot be used.
+        self._scan_options = None
+
+        # _files has as keys the files, and as values dictionaries with keys
+        # "size", "mtime_ns", and "meta". "meta" is another dictionary that
+        # maps the kind of metadata to its value
+        self._files = {}
+
+        # _validated is the set of files that we already checked against the
+        # filesystem
+        self._validated = set()
+
+        self.modified = False
+
+        if path is not None and os.path.exists(path):
+            self._load(path)
+
+    def _load(self, path):
+        """Read the index from the file ``path``.
+
+        Invalid or outdated indices are ignored (with a warning).
+
+        :param path: Path of the file.
+        :type path: str
+
+        """
+        try:
+            with open(path, "r") as file_:
+                content = json.load(file_)
+        except (OSError, ValueError):
+            warnings.warn(f"Could not read index {path}, ignoring it")
+            return
+
+        if not isinstance(content, dict) or (
+            content.get("version") != self.VERSION
+        ):
+            warnings.warn(f"Index {path} is outdated, ignoring it")
+            return
+
+        self._scan_options = content.get("scan_options")
+        # We want tuples, because that is what SimDir uses
+        self._dirs = {
+            dir_: tuple(dir_content)
+            for dir_, dir_content in content.get("dirs", {}).items()
+        }
+        self._files = content.get("files", {})
+
+    def _file_signature(self, path):
+        """Return size and modification time of the file ``path``.
+
+        :param path: Path of the file.
+        :type path: str
+
+        :returns: Size and modification time, or None if the file does not
+                  exist.
+        :rtype: tuple of int or None
+
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _validate(self, path):
+        """Check that the entries for the file ``path`` are up to date. If they
+        are not, remove them.
+
+        Each file is checked only once.
+
+        :param path: Path of the file.
+        :type path: str
+
+        """
+        if path in self._validated:
+            return
+
+        self._validated.add(path)
+
+        entry = self._files.get(path)
+        if entry is None:
+            return
+
+        signature = self._file_signature(path)
+        if signature != (entry["size"], entry["mtime_ns"]):
+            del self._files[path]
+            self.modified = True
+
+    def get(self, path, kind, default=None):
+        """Return the metadata ``kind`` for the file ``path``, if available and
+        up to date.
+
+        :param path: Path of the file the metadata refers to.
+        :type path: str
+        :param kind: What type of metadata.
+        :type kind: str
+        :param default: Value returned if the metadata is not available.
+        :type default: any
+
+        :returns: Metadata.
+        :rtype: any
+
+        """
+        self._validate(path)
+        entry = self._files.get(path)
+        if entry is None:
+            return default
+        return entry["meta"].get(kind, default)
+
+    def set(self, path, kind, value):
+        """Store the metadata ``kind`` for the file ``path``.
+
+        :param path: Path of the file the metadata refers to.
+        :type path: str
+        :param kind: What type of metadata.
+        :type kind: str
+        :param value: Metadata. It has to be serializable in JSON.
+        :type value: any
+
+        """
+        self._validate(path)
+        entry = self._files.get(path)
+        if entry is None:
+            signature = self._file_signature(path)
+            # We cannot store information about files that do not exist
+            if signature is None:
+                return
+            entry = {
+                "size": signature[0],
+                "mtime_ns": signature[1],
+                "meta": {},
+            }
+            self._files[path] = entry
+        entry["meta"][kind] = value
+        self.modified = True
+
+    def cached(self, path, kind, compute):
+        """Return the metadata ``kind`` for the file ``path``. If not available,
+        call ``compute`` and store the result.
+
+        :param path: Path of the file the metadata refers to.
+        :type path: str
+        :param kind: What type of metadata.
+        :type kind: str
+        :param compute: Function with no arguments that computes the metadata.
+        :type compute: callable
+
+        :returns: Metadata.
+        :rtype: any
+
+        """
+        # We use a sentinel because None could be a valid value
+        missing = object()
+        value = self.get(path, kind, missing)
+        if value is missing:
+            value = compute()
+            self.set(path, kind, value)
+        return value
+
+    def dirs_content(self, scan_options):
+        """Return the content of the directories saved in the index.
+
+        :param scan_options: Options used to scan the directories. If they are
+                             different from the ones saved in the index, the
+                             content cannot be used.
+        :type scan_options: dict
+
+        :returns: Dictionary as ``SimDir._dirs_content``.
+        :rtype: dict
+
+        """
+        if scan_options != self._scan_options:
+            return {}
+        return dict(self._dirs)
+
+    def set_dirs_content(self, dirs_content, scan_options):
+        """Store the content of the directories.
+
+        :param dirs_content: Dictionary as ``SimDir._dirs_content``.
+        :type dirs_content: dict
+        :param scan_options: Options used to scan the directories.
+        :type scan_options: dict
+
+        """
+        if dirs_content != self._dirs or scan_options != self._scan_options:
+            self._dirs = dict(dirs_content)
+            self._scan_options = scan_options
+            self.modified = True
+
+    def prune(self, files):
+        """Remove all the entries that do not refer to any of the given files.
+
+        :param files: Files to keep.
+        :type files: list of str
+
+        """
+        files = set(files)
+        for path in list(self._files):
+            if path not in files:
+                del self._files[path]
+                self.modified = True
+
+    def save(self, path=None):
+        """Write the index to disk (if there are changes).
+
+        The file is first written to a temporary location and then moved, so
+        that the index is never left in an inconsistent state.
+
+        :param path: Path of the file. If None, use ``self.path``.
+        :type path: str or None
+
+        """
+        if path is None:
+            path = self.path
+
+        if path is None:
+            raise ValueError("No path where to save the index")
+
+        if not self.modified and path == self.path and os.path.exists(path):
+            return
+
+        content = {
+            "version": self.VERSION,
+            "scan_options": self._scan_options,
+            "dirs": self._dirs,
+            "files": self._files,
+        }
+
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "w") as file_:
+            json.dump(content, file_, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+        if path == self.path:
+            self.modified = False
+
+    def __getstate__(self):
+        # When we unpickle the index, the files may have changed, so we have
+        # to validate them again
+        state = self.__dict__.copy()
+        state["_validated"] = set()
+        return state
+
+    def __len__(self):
+        return len(self._files)
+
+    def __contains__(self, path):
+        self._validate(path)
+        return path in self._files
@@ -144,20 +144,24 @@ def combine_ts(series, prefer_late=True):
 
     """
 
-    # Late and early can be implemented in one shot by implementing one and
-    # sending t -> -t for the other. For the "straight" way we implement
-    # combine_ts_early.
+    # We walk through the timeseries in order of preference, and from each
+    # one we keep only the times that are not covered by the ones already
+    # considered. With prefer_late, the timeseries are sorted from the one
+    # that starts last, and we keep the times that are before the earliest
+    # time kept so far. Without prefer_late, it is the opposite.
     #
-    # Let's consider a simple example for the reversed case
+    # Let's consider a simple example with prefer_late
     # t1 = [1, 2, 3], t2 = [2, 3, 4], we want to have t = [1, 2, 3, 4]
-    # sign = -1
     # timeseries = [t2, t1]
-    # times = t2[::-1] = [4, 3, 2]
-    # Next we walk through the remaining elements of the list
-    # We want only to keep those with t < times[-1] = 2 (hence the switch)
-    # In this case msk = [3, 2, 1] < 2 = [False, False, True], so
-    # s_t[msk] = [1] and times = [4, 3, 2, 1].
-    # At the end, we need to reverse the order again
+    # We keep all of t2, and the boundary becomes 2.
+    # From t1, we keep only the times that are < 2, so [1].
+    # The kept pieces are then concatenated in reverse order: [1] + [2, 3, 4].
+    #
+    # Times are sorted, so the times to keep in each timeseries are a
+    # contiguous range that we can find with searchsorted. This is important
+    # because we have to concatenate the arrays only once at the end (instead
+    # of growing them at each step, which would have quadratic cost in the
+    # number of timeseries).
 
     # sign is responsible of inverting the sorting key
     sign = -1 if prefer_late else 1
@@ -166,19 +170,33 @@ def combine_ts(series, prefer_late=True):
     # they are the same then the second items are compared, and so on.
     # So here we sort by tmin and tmax
     timeseries = sorted(series, key=lambda x: (sign * x.tmin, sign * x.tmax))
-    # Now we are going to build up the t and y array, starting with the first
-    times = timeseries[0].t[::sign]
-    values = timeseries[0].y[::sign]
+
+    # Now we are going to find the range to keep for each timeseries,
+    # starting with the first, which is kept entirely
+    ranges = [slice(None)]
+    boundary = timeseries[0].t[0] if prefer_late else timeseries[0].t[-1]
     for s in timeseries[1:]:
-        # We need to walk backwards for "prefer_late"
-        s_t = s.t[::sign]
-        s_y = s.y[::sign]
-        # We only keep those times that we don't have yet in the array times
-        msk = s_t < times[-1] if prefer_late else s_t > times[-1]
-        times = np.append(times, s_t[msk])
-        values = np.append(values, s_y[msk])
-
-    return TimeSeries(times[::sign], values[::sign])
+        if prefer_late:
+            # We only keep those times that are smaller than the boundary
+            end = np.searchsorted(s.t, boundary, side="left")
+            ranges.append(slice(0, end))
+            if end > 0:
+                boundary = s.t[0]
+        else:
+            # We only keep those times that are larger than the boundary
+            start = np.searchsorted(s.t, boundary, side="right")
+            ranges.append(slice(start, None))
+            if start < len(s.t):
+                boundary = s.t[-1]
+
+    # With prefer_late, the pieces were found from the latest to the
+    # earliest, so we have to reverse them
+    pieces = list(zip(timeseries, ranges))[::sign]
+
+    times = np.concatenate([s.t[range_] for s, range_ in pieces])
+    values = np.concatenate([s.y[range_] for s, range_ in pieces])
+
+    return TimeSeries(times, values)
 
 
 class TimeSeries(BaseSeries):
@@ -15,7 +15,11 @@
 # You should have received a copy of the GNU General Public License along with
 # this program; if not, see <https://www.gnu.org/licenses/>.
 
+import bz2
+import gc
 import os
+import tempfile
+import time
 import unittest
 from unittest import mock
 
@@ -235,6 +239,191 @@ class TestAllGridFunctions(unittest.TestCase):
             filename, "illinoisgrmhd-grmhd_primitives_allbutbi.xy.h5"
         )
 
+    def test_shared_ascii_readers(self):
+
+        # illinoisgrmhd-grmhd_primitives_allbutbi.xy.asc contains five
+        # variables, each block should be parsed only once. (In AllGridFunctions,
+        # these variables are read from the HDF5 files, so we build the ASCII
+        # readers here.)
+        path = next(iter(self.gf._vars_ascii_files["P"]))
+        variables = ("rho_b", "P", "vx", "vy", "vz")
+
+        def ascii_var(var_name):
+            return cg.OneGridFunctionASCII(
+                [path],
+                var_name,
+                (3, 3),
+                file_readers=self.gf._ascii_readers,
+            )
+
+        with mock.patch.object(
+            cg, "read_table_range", wraps=cg.read_table_range
+        ) as read_table_range, mock.patch.object(
+            cg, "read_table", wraps=cg.read_table
+        ) as read_table:
+            P = ascii_var("P")
+            # Nothing is parsed until we ask for the data
+            self.assertEqual(read_table_range.call_count, 0)
+
+            last_iteration = P.available_iterations[-1]
+            P[last_iteration]
+            num_blocks = read_table_range.call_count
+            self.assertGreater(num_blocks, 0)
+
+            for var in variables:
+                ascii_var(var)[last_iteration]
+            self.assertEqual(read_table_range.call_count, num_blocks)
+            self.assertEqual(read_table.call_count, 0)
+
+        # Only the last iteration was read
+        self.assertIsNone(P.alldata[path][0][0][0])
+
+        # Reading one variable at all the iterations, then the next variable,
+        # reads each iteration only once
+        file_readers = {}
+        with mock.patch.object(
+            cg, "read_table_range", wraps=cg.read_table_range
+        ) as read_table_range:
+            for var in variables:
+                var_reader = cg.OneGridFunctionASCII(
+                    [path], var, (3, 3), file_readers=file_readers
+                )
+                for iteration in var_reader.available_iterations:
+                    var_reader[iteration]
+            self.assertGreater(len(P.available_iterations), 1)
+            self.assertEqual(
+                read_table_range.call_count, len(P.available_iterations)
+            )
+        # The blocks kept count towards the memory of the cache, which can
+        # remove them
+        cache = cg._ComponentsCache(0)
+        P_small = cg.OneGridFunctionASCII(
+            [path], "P", (3, 3), file_readers=file_readers, cache=cache
+        )
+        P_small._file_reader(path).clear_cache()
+        P_small[last_iteration]
+        self.assertEqual(file_readers[path]._iterations_read, {})
+        self.assertEqual(P_small[last_iteration], P[last_iteration])
+
+        # Same data as when reading the entire file
+        P_entire = cg.OneGridFunctionASCII([path], "P", (3, 3))
+        P_entire._parse_entire_file(path)
+        self.assertEqual(P_entire[0], P[0])
+        self.assertEqual(P_entire[last_iteration], P[last_iteration])
+        self.assertEqual(P_entire.available_times, P.available_times)
+
+        reader = self.gf._ascii_readers[path]
+        with self.assertRaises(KeyError):
+            reader.blocks("bubu")
+        with self.assertRaises(KeyError):
+            reader.read_block("P", 123456, 0, 0)
+
+        # Compressed files cannot be read in blocks
+        with tempfile.TemporaryDirectory() as tmpdir:
+            compressed_path = os.path.join(
+                tmpdir, os.path.basename(path) + ".bz2"
+            )
+            with open(path, "rb") as file_, bz2.open(
+                compressed_path, "wb"
+            ) as compressed:
+                compressed.write(file_.read())
+            P_bz2 = cg.OneGridFunctionASCII([compressed_path], "P", (3, 3))
+            self.assertIsNone(
+                P_bz2._file_reader(compressed_path).block_offsets
+            )
+            self.assertEqual(P_bz2[0], P[0])
+            # Data is read again after clear_cache
+            P_bz2.clear_cache()
+            self.assertEqual(P_bz2[last_iteration], P[last_iteration])
+
+            # The table is kept for the other variables in the file, but it
+            # counts towards the memory of the cache, and it is released with
+            # clear_cache
+            cache = cg._ComponentsCache(cg._COMPONENTS_CACHE_MAX_BYTES)
+            P_bz2 = cg.OneGridFunctionASCII(
+                [compressed_path], "P", (3, 3), cache=cache
+            )
+            bz2_reader = P_bz2._file_reader(compressed_path)
+            self.assertIsNotNone(bz2_reader._table)
+            self.assertIn((id(bz2_reader), None), cache._iterations)
+            table_nbytes = bz2_reader._table.nbytes
+            self.assertGreaterEqual(cache.nbytes, table_nbytes)
+            P_bz2.clear_cache()
+            self.assertIsNone(bz2_reader._table)
+            self.assertEqual(cache.nbytes, 0)
+
+            # A cache that cannot hold the table releases it right away
+            small_cache = cg._ComponentsCache(table_nbytes - 1)
+            P_small = cg.OneGridFunctionASCII(
+                [compressed_path], "P", (3, 3), cache=small_cache
+            )
+            self.assertIsNone(P_small._file_reader(compressed_path)._table)
+            self.assertLessEqual(small_cache.nbytes, table_nbytes - 1)
+            self.assertEqual(P_small[last_iteration], P[last_iteration])
+
+        # admbase-metric.x.asc contains the six components of the metric,
+        # each file should be read only once
+        gf_x = sd.SimDir("tests/tov").gf.x
+        gf_x.num_ghost = (3,)
+        metric = ("gxx", "gxy", "gxz", "gyy", "gyz", "gzz")
+
+        with mock.patch.object(
+            cg, "read_table_range", wraps=cg.read_table_range
+        ) as read_table_range:
+            gxx = gf_x["gxx"]
+            num_files = len(gxx.allfiles)
+            for var in metric:
+                gf_x[var][0]
+            self.assertEqual(read_table_range.call_count, num_files)
+
+        # Same data as when reading each variable separately
+        gyy = cg.OneGridFunctionASCII(gf_x["gyy"].allfiles, "gyy", (3,))
+        self.assertEqual(gyy[0], gf_x["gyy"][0])
+
+    def test_h5_catalogs(self):
+
+        # illinoisgrmhd-grmhd_primitives_allbutbi.xy.h5 contains five
+        # variables, it should be scanned only once
+        with mock.patch.object(
+            cg, "_scan_h5_catalog", wraps=cg._scan_h5_catalog
+        ) as scan:
+            gf = sd.SimDir("tests/grid_functions").gf.xy
+            num_scans = scan.call_count
+            for var_name in ("rho_b", "P", "vx", "vy", "vz"):
+                gf[var_name]
+            self.assertEqual(scan.call_count, num_scans)
+
+        path = next(iter(gf._vars_h5_files["P"]))
+        catalog = gf._h5_catalogs[path]
+        self.assertTrue(catalog["ghost_zones"])
+        self.assertCountEqual(
+            catalog["variables"], ["rho_b", "P", "vx", "vy", "vz"]
+        )
+        self.assertEqual(catalog["variables"]["P"]["thorn"], "ILLINOISGRMHD")
+        self.assertCountEqual(
+            catalog["variables"]["P"]["entries"],
+            [
+                [iteration, ref_level, component]
+                for iteration, ref_levels in gf["P"].alldata[path].items()
+                for ref_level, components in ref_levels.items()
+                for component in components
+            ],
+        )
+
+        # The catalog is stored in the index
+        with tempfile.TemporaryDirectory() as tmpdir:
+            index_file = os.path.join(tmpdir, "index.json")
+            with sd.SimDir(
+                "tests/grid_functions", index_file=index_file
+            ) as sim:
+                sim.gf.xy["P"]
+            with mock.patch.object(cg, "_scan_h5_catalog") as scan:
+                sim = sd.SimDir("tests/grid_functions", index_file=index_file)
+                self.assertEqual(
+                    sim.gf.xy["P"].available_iterations, [0, 1, 2]
+                )
+                scan.assert_not_called()
+
     def test_allfiles(self):
 
         # This is a weak test, we are just testing how many files we have...
@@ -414,6 +603,36 @@ class TestOneGridFunction(unittest.TestCase):
 
         self.assertEqual(self.P.time_at_iteration(2), 0.5)
 
+        # Iteration not available
+        with self.assertRaises(ValueError):
+            self.P.time_at_iteration(3)
+
+    def test_time_table(self):
+
+        catalog = self.P._catalog(self.P_file)
+        self.assertEqual(catalog["times"], [[0, 0], [1, 0.25], [2, 0.5]])
+
+        # The times come from the catalog, no file is opened
+        cg.close_h5_files()
+        with mock.patch.object(cg.h5py, "File") as h5_file:
+            self.assertEqual(self.P.available_times, [0, 0.25, 0.5])
+            self.assertEqual(self.P.time_at_iteration(1), 0.25)
+            self.assertEqual(self.P.iteration_at_time(0.25), 1)
+            h5_file.assert_not_called()
+
+        iterations, times = self.P._time_table()
+        np.testing.assert_array_equal(iterations, [0, 1, 2])
+        np.testing.assert_array_equal(times, [0, 0.25, 0.5])
+
+        # Catalogs without times (e.g., from old indices) still work
+        old_catalog = {
+            key: value for key, value in catalog.items() if key != "times"
+        }
+        P = cg.OneGridFunctionH5(
+            [self.P_file], "P", catalogs={self.P_file: old_catalog}
+        )
+        self.assertEqual(P.available_times, [0, 0.25, 0.5])
+
     def test_get(self):
 
         # Iteration not present
@@ -508,6 +727,262 @@ class TestOneGridFunction(unittest.TestCase):
         with self.assertRaises(RuntimeError):
             self.rho_star._parse_file("/tmp/wrongname")
 
+    def test_times_of_components(self):
+
+        # Every component has the time of its iteration
+        for iteration, time in self.rho_star._iterations_to_times.items():
+            self.assertIsInstance(iteration, int)
+            alldata_iteration = self.rho_star.alldata[self.rho_star_file][
+                iteration
+            ]
+            for ref_level, components in alldata_iteration.items():
+                for component in components:
+                    self.assertEqual(
+                        self.rho_star._read_component_as_uniform_grid_data(
+                            self.rho_star_file, iteration, ref_level, component
+                        ).time,
+                        time,
+                    )
+
+    def test_iter_iterations(self):
+
+        iterations = self.P.available_iterations
+
+        for prefetch in (0, 1, 2):
+            read = list(self.P.iter_iterations(prefetch=prefetch))
+            self.assertEqual([it for it, _ in read], iterations)
+            for iteration, data in read:
+                self.assertEqual(data, self.P[iteration])
+
+        self.assertEqual(
+            [it for it, _ in self.P.iter_iterations(start=1)], iterations[1:]
+        )
+        self.assertEqual(
+            [it for it, _ in self.P.iter_iterations(stop=iterations[-1])],
+            iterations[:-1],
+        )
+        self.assertEqual(
+            [it for it, _ in self.P.iter_iterations(step=2)], iterations[::2]
+        )
+
+        with mock.patch.object(
+            self.P,
+            "_read_iteration_as_HierarchicalGridData",
+            wraps=self.P._read_iteration_as_HierarchicalGridData,
+        ) as reader:
+            # The next iterations are read in advance
+            for index, _ in enumerate(self.P.iter_iterations(prefetch=2)):
+                expected = min(index + 3, len(iterations))
+                # Give time to the background thread
+                for _ in range(500):
+                    if reader.call_count >= expected:
+                        break
+                    time.sleep(0.01)
+                self.assertEqual(reader.call_count, expected)
+
+            # Stopping early does not read the others
+            reader.reset_mock()
+            for _ in self.P.iter_iterations(prefetch=1):
+                break
+            self.assertLessEqual(reader.call_count, 2)
+
+            # Nothing is read in advance if it does not fit in the cache
+            reader.reset_mock()
+            cg.set_components_cache_size(0)
+            for index, _ in enumerate(self.P.iter_iterations(prefetch=2)):
+                self.assertEqual(reader.call_count, index + 1)
+            cg.set_components_cache_size(cg._COMPONENTS_CACHE_MAX_BYTES)
+
+        with self.assertRaises(ValueError):
+            next(self.P.iter_iterations(step=0))
+
+        with self.assertRaises(ValueError):
+            next(self.P.iter_iterations(prefetch=-1))
+
+    def test_parallel_read(self):
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # We split the components of P in two files, as Carpet does when
+            # each process writes its own file
+            paths = [
+                os.path.join(tmpdir, f"P.xy.file_{comp}.h5") for comp in (0, 1)
+            ]
+            with h5py.File(self.P_file, "r") as original:
+                for comp, path in enumerate(paths):
+                    with h5py.File(path, "w") as split:
+                        original.copy(
+                            "Parameters and Global Attributes", split
+                        )
+                        for name in original:
+                            if name.startswith("ILLINOISGRMHD::P ") and (
+                                name.endswith(f"c={comp}")
+                            ):
+                                original.copy(name, split)
+
+            serial = cg.OneGridFunctionH5(paths, "P")
+            parallel = cg.OneGridFunctionH5(paths, "P")
+            parallel.max_workers = 2
+
+            # The file of another variable is open
+            self.P[0]
+            with cg._h5_files.open(self.P_file) as P_file:
+                pass
+
+            for iteration in self.P.available_iterations:
+                self.assertEqual(parallel[iteration], serial[iteration])
+                self.assertEqual(parallel[iteration], self.P[iteration])
+
+            # One pool of processes shared by all the grid functions with the
+            # same number of processes, started without inheriting the open
+            # files
+            self.assertEqual(list(cg._process_pools), [2])
+            pool = cg._process_pools[2]
+            self.assertEqual(pool._ctx.get_start_method(), "spawn")
+            other = cg.OneGridFunctionH5(paths, "P")
+            other.max_workers = 2
+            self.assertEqual(other[0], serial[0])
+            self.assertIs(cg._process_pools[2], pool)
+
+            # The files open in this process are not affected
+            self.assertIn(self.P_file, cg._h5_files._files)
+            self.assertTrue(P_file.id.valid)
+
+            cg.close_process_pools()
+            self.assertEqual(len(cg._process_pools), 0)
+
+            # The ASCII reader sends only the file it needs
+            worker = self.rho_star._copy_for_file(
+                self.rho_star_file, 0, [(0, 0)]
+            )
+            self.assertEqual(
+                list(worker._file_readers.keys()), [self.rho_star_file]
+            )
+            self.assertIsNone(worker._file_readers[self.rho_star_file]._index)
+            self.assertEqual(
+                cg._read_components_worker(
+                    worker, self.rho_star_file, 0, [(0, 0)]
+                ),
+                [
+                    self.rho_star._read_component_as_uniform_grid_data(
+                        self.rho_star_file, 0, 0, 0
+                    )
+                ],
+            )
+
+            cg.close_h5_files()
+
+        # The setting is propagated to the variables
+        reader = sd.SimDir("tests/grid_functions").gf
+        reader.max_workers = 2
+        self.assertEqual(reader.xy["P"].max_workers, 2)
+        reader.max_workers = None
+        self.assertIsNone(reader.xy["P"].max_workers)
+
+        with self.assertRaises(ValueError):
+            reader.max_workers = 0
+
+    def test_read_region(self):
+
+        x0, x1 = [-2, -3], [4.2, 1]
+        points = [
+            [x, y]
+            for x in np.linspace(-2, 4.2, 7)
+            for y in np.linspace(-3, 1, 5)
+        ]
+
+        for var in (self.P, self.rho_star):
+            region = var.read_region(0, x0, x1)
+            self.assertEqual(region.refinement_levels, [0, 1])
+            # The points immediately outside the region are included
+            self.assertCountEqual(
+                [tuple(comp.x0) for comp in region.all_components],
+                [(-2, -3), (-2, -3)],
+            )
+            self.assertCountEqual(
+                [tuple(comp.x1) for comp in region.all_components],
+                [(5, 1), (4.5, 1)],
+            )
+            np.testing.assert_allclose(region(points), var[0](points))
+
+            # Only the requested refinement levels
+            self.assertEqual(
+                var.read_region(0, x0, x1, ref_levels=[1]).refinement_levels,
+                [1],
+            )
+
+        # Only the part of the HDF5 datasets in the region is read
+        self.P.clear_cache()
+        with mock.patch.object(
+            self.P, "_read_component_as_uniform_grid_data"
+        ) as read_component:
+            self.P.read_region(0, x0, x1)
+            read_component.assert_not_called()
+        self.assertIsNone(self.P.alldata[self.P_file][0][0][0])
+
+        # Components in memory are used
+        self.P[0]
+        with mock.patch.object(self.P, "_read_component_slab") as read_slab:
+            np.testing.assert_allclose(
+                self.P.read_region(0, x0, x1)(points), self.P[0](points)
+            )
+            read_slab.assert_not_called()
+
+        # Region outside the grid
+        with self.assertRaises(ValueError):
+            self.P.read_region(0, [20, 20], [21, 21])
+
+        # Wrong dimensions
+        with self.assertRaises(ValueError):
+            self.P.read_region(0, [0, 0, 0], [1, 1, 1])
+
+        with self.assertRaises(ValueError):
+            self.P.read_region(0, [0, 0], [1, 1, 1])
+
+        with self.assertRaises(ValueError):
+            self.P.read_region(0, [1, 1], [0, 0])
+
+        with self.assertRaises(KeyError):
+            self.P.read_region(3, x0, x1)
+
+    def test_ref_levels(self):
+
+        self.P.clear_cache()
+
+        coarse = self.P.get_iteration(0, ref_levels=[0])
+        self.assertEqual(coarse.refinement_levels, [0])
+        self.assertEqual(coarse[0], self.P[0][0])
+
+        # Only the requested refinement level was read
+        self.P.clear_cache()
+        self.P.get_iteration(0, ref_levels=[1])
+        self.assertIsNone(self.P.alldata[self.P_file][0][0][0])
+        self.assertIsNotNone(self.P.alldata[self.P_file][0][1][0])
+
+        self.assertIs(self.P.get_iteration(3, ref_levels=[0]), None)
+
+        # Iteration 1 has only refinement level 1
+        with self.assertRaises(ValueError):
+            self.P.get_iteration(1, ref_levels=[0])
+        with self.assertRaises(ValueError):
+            self.P.get_iteration(1, ref_levels=0)
+
+        # A single refinement level can be passed as an int
+        self.assertEqual(self.P.get_iteration(0, ref_levels=0), coarse)
+
+        new_grid = grid_data.UniformGrid([10, 10], x0=[1, 1], x1=[2, 2])
+        self.assertEqual(
+            self.P.read_on_grid(0, new_grid, ref_levels=[0]),
+            coarse.to_UniformGridData_from_grid(new_grid),
+        )
+        self.assertEqual(
+            self.P.read_on_grid(0, new_grid, ref_levels=0),
+            coarse.to_UniformGridData_from_grid(new_grid),
+        )
+        self.assertEqual(
+            self.P.read_region(0, [1, 1], [2, 2], ref_levels=1),
+            self.P.read_region(0, [1, 1], [2, 2], ref_levels=[1]),
+        )
+
     def test_clear_cache(self):
 
         # Read something
@@ -521,3 +996,161 @@ class TestOneGridFunction(unittest.TestCase):
 
         # Check that we are clear
         self.assertIsNone(self.P.alldata[self.P_file][0][0][0])
+
+    def test_h5_files_pool(self):
+
+        cg.close_h5_files()
+
+        # All the components of all the iterations are read from the same
+        # open file
+        with mock.patch.object(cg.h5py, "File", wraps=h5py.File) as h5_file:
+            for iteration in self.P.available_iterations:
+                self.P[iteration]
+                self.P.time_at_iteration(iteration)
+            self.assertEqual(h5_file.call_count, 1)
+        self.assertEqual(len(cg._h5_files), 1)
+
+        # Files in use are not closed
+        with cg._h5_files.open(self.P_file) as file_:
+            cg.set_max_open_h5_files(0)
+            self.assertTrue(file_.id.valid)
+        self.assertFalse(file_.id.valid)
+        self.assertEqual(len(cg._h5_files), 0)
+
+        with self.assertRaises(ValueError):
+            cg.set_max_open_h5_files(-1)
+
+        cg.set_max_open_h5_files(cg._MAX_OPEN_H5_FILES)
+
+        # Files are closed when the SimDir context manager exits, but only the
+        # ones of that SimDir
+        tov_rho = sd.SimDir("tests/tov").gf.xy["rho"]
+        tov_rho[0]
+        tov_files = set(cg._h5_files._files)
+        self.assertGreater(len(tov_files), 0)
+        with sd.SimDir("tests/grid_functions") as sim:
+            sim.gf.xy["P"][0]
+            self.assertIn(self.P_file, cg._h5_files._files)
+        self.assertNotIn(self.P_file, cg._h5_files._files)
+        self.assertEqual(set(cg._h5_files._files), tov_files)
+
+        cg.close_h5_files(tov_files)
+        self.assertEqual(len(cg._h5_files), 0)
+
+    def test_components_cache(self):
+
+        iterations = self.P.available_iterations
+        self.assertGreater(len(iterations), 1)
+
+        self.P[iterations[0]]
+        first_iteration = self.P.alldata[self.P_file][iterations[0]]
+        nbytes = sum(
+            comp.data.nbytes
+            for ref_level in first_iteration.values()
+            for comp in ref_level.values()
+        )
+
+        # Per-SimDir cache that fits only one iteration
+        reader = sd.SimDir("tests/grid_functions", grid_cache_size=nbytes).gf
+        P = reader.xy["P"]
+
+        first = P[iterations[0]]
+        self.assertIsNotNone(P.alldata[self.P_file][iterations[0]][0][0])
+        P[iterations[0]]
+        self.assertEqual(
+            reader.cache_stats(),
+            {
+                "hits": 1,
+                "misses": 1,
+                "evictions": 0,
+                "nbytes": nbytes,
+                "max_bytes": nbytes,
+            },
+        )
+
+        # Reading a new iteration removes the oldest from memory
+        P[iterations[1]]
+        self.assertIsNone(P.alldata[self.P_file][iterations[0]][0][0])
+        self.assertIsNotNone(P.alldata[self.P_file][iterations[1]][1][0])
+        self.assertEqual(reader.cache_stats()["evictions"], 1)
+        self.assertEqual(reader.cache_stats()["misses"], 2)
+
+        # What we already returned is not affected, and evicted iterations
+        # are read again
+        self.assertEqual(P[iterations[0]], first)
+        self.assertEqual(reader.cache_stats()["misses"], 3)
+
+        # clear_cache also clears the counted memory
+        P.clear_cache()
+        self.assertEqual(reader.cache_stats()["nbytes"], 0)
+
+        # The iterations of grid functions that are garbage collected are not
+        # counted anymore (and do not cause evictions)
+        cache = cg._ComponentsCache(nbytes)
+        P_collected = cg.OneGridFunctionH5(P.allfiles, "P", cache=cache)
+        P_collected[iterations[0]]
+        self.assertEqual(cache.stats()["nbytes"], nbytes)
+        del P_collected
+        # _iterations_in_file keeps a reference to the object
+        cg.BaseOneGridFunction._iterations_in_file.cache_clear()
+        gc.collect()
+        self.assertEqual(cache.stats()["nbytes"], 0)
+        self.assertEqual(cache._references, {})
+        P_live = cg.OneGridFunctionH5(P.allfiles, "P", cache=cache)
+        P_live[iterations[0]]
+        self.assertEqual(cache.stats()["evictions"], 0)
+        self.assertIsNotNone(P_live.alldata[self.P_file][iterations[0]][0][0])
+
+        # The global cache is not touched by SimDirs with their own
+        self.assertEqual(
+            sd.SimDir("tests/grid_functions").gf.cache_stats()["max_bytes"],
+            cg._COMPONENTS_CACHE_MAX_BYTES,
+        )
+
+        # Compressed ASCII files are read entirely, but only one iteration at
+        # the time is kept
+        reference_reader = sd.SimDir("tests/grid_functions").gf.xyz
+        reference_reader.num_ghost = (3, 3, 3)
+        reference = reference_reader["rho_star"]
+        self.assertTrue(reference.allfiles[0].endswith(".bz2"))
+        # The cache can hold only the largest iteration
+        nbytes = max(
+            reference._iteration_nbytes(iteration)
+            for iteration in reference.available_iterations
+        )
+
+        reader = sd.SimDir("tests/grid_functions", grid_cache_size=nbytes).gf
+        reader.xyz.num_ghost = (3, 3, 3)
+        rho_star = reader.xyz["rho_star"]
+
+        def iterations_in_memory():
+            return [
+                iteration
+                for iteration in rho_star.available_iterations
+                if rho_star._iteration_nbytes(iteration)
+            ]
+
+        # The iterations read when the file is parsed are counted
+        self.assertEqual(len(iterations_in_memory()), 1)
+        self.assertLessEqual(reader.cache_stats()["nbytes"], nbytes)
+
+        for iteration in (0, 1, 2, 0):
+            self.assertEqual(rho_star[iteration], reference[iteration])
+            self.assertEqual(iterations_in_memory(), [iteration])
+            self.assertEqual(
+                reader.cache_stats()["nbytes"],
+                rho_star._iteration_nbytes(iteration),
+            )
+
+        reference.clear_cache()
+
+        # Global cache
+        cg.set_components_cache_size(0)
+        self.P[iterations[0]]
+        self.assertIsNone(self.P.alldata[self.P_file][iterations[0]][0][0])
+        self.assertEqual(cg.components_cache_stats()["nbytes"], 0)
+
+        with self.assertRaises(ValueError):
+            cg.set_components_cache_size(-1)
+
+        cg.set_components_cache_size(cg._COMPONENTS_CACHE_MAX_BYTES)
@@ -17,7 +17,11 @@
 
 import os
 import re
+import shutil
+import tempfile
 import unittest
+from bz2 import open as bopen
+from gzip import open as gopen
 
 import numpy as np
 
@@ -77,6 +81,42 @@ class TestCactusScalar(unittest.TestCase):
         self.assertEqual(asc_bz._compression_method, "bz2")
         self.assertDictEqual(asc_bz._vars_columns, {"eps": 2})
 
+        # All the reductions in one file
+        path = "tests/tov/output-0000/static_tov/alp.scalars.asc"
+        asc_all = cs.OneScalar(path)
+        self.assertTrue(asc_all._was_header_scanned)
+        self.assertEqual(asc_all.reduction_type, "scalars")
+        self.assertDictEqual(
+            asc_all._vars_columns,
+            {
+                "alp(minimum)": 2,
+                "alp(maximum)": 3,
+                "alp(average)": 4,
+                "alp(norm1)": 5,
+                "alp(norm2)": 6,
+            },
+        )
+
+        asc_max = cs.OneScalar(path, reduction="maximum")
+        self.assertEqual(asc_max.reduction_type, "maximum")
+        self.assertDictEqual(asc_max._vars_columns, {"alp": 3})
+        t, y = np.loadtxt(path, unpack=True, usecols=(1, 3))
+        self.assertEqual(asc_max["alp"], ts.TimeSeries(t, y))
+        self.assertEqual(asc_all["alp(maximum)"], asc_max["alp"])
+
+        # Reduction not in the file
+        self.assertDictEqual(
+            cs.OneScalar(path, reduction="infnorm")._vars_columns, {}
+        )
+        # reduction is ignored for the other files
+        self.assertEqual(
+            cs.OneScalar(
+                "tests/tov/output-0000/static_tov/vel[0].maximum.asc",
+                reduction="minimum",
+            ).reduction_type,
+            "maximum",
+        )
+
     def test_OneScalar_magic_methods(self):
 
         path = "tests/tov/output-0000/static_tov/vel[0].maximum.asc"
@@ -135,6 +175,350 @@ class TestCactusScalar(unittest.TestCase):
 
         os.remove(path)
 
+    def test_read_table(self):
+
+        default_parser = cau._parse_chunk
+        # We test both the parsers
+        for parser in (cau._parse_chunk_loadtxt, cau._parse_chunk_fromstring):
+            with self.subTest(parser=parser):
+                cau._parse_chunk = parser
+                self._test_read_table()
+        cau._parse_chunk = default_parser
+
+    def _test_read_table(self):
+
+        path = "tests/tov/output-0000/static_tov/carpet-timing..asc"
+        expected = np.loadtxt(path, ndmin=2, unpack=True)
+        table = cau.read_table(path)
+        np.testing.assert_array_equal(table, expected)
+        # Columns are contiguous
+        self.assertTrue(table[3].flags.c_contiguous)
+
+        # Small blocks, so that lines are split across blocks
+        default_chunk = cau._TABLE_CHUNK_BYTES
+        cau._TABLE_CHUNK_BYTES = 7
+        np.testing.assert_array_equal(cau.read_table(path), expected)
+        cau._TABLE_CHUNK_BYTES = default_chunk
+
+        # Comments, blank lines, and missing final newline
+        path = "table.asc"
+        content = "# header\n\n1 2 3 # comment\n  \n# 1 2\n4 5 nan\n7 8 9"
+        with open(path, "wt") as test_file:
+            test_file.write(content)
+        expected = np.loadtxt(path, ndmin=2, unpack=True)
+        np.testing.assert_array_equal(cau.read_table(path), expected)
+
+        # Part of the file
+        start = content.index("4 5")
+        np.testing.assert_array_equal(
+            cau.read_table_range(path, start, len(content)), expected[:, 1:]
+        )
+        np.testing.assert_array_equal(
+            cau.read_table_range(path, 0, start), expected[:, :1]
+        )
+        self.assertEqual(cau.read_table_range(path, 0, 9).size, 0)
+
+        # Compressed files
+        for opener, extension in ((gopen, ".gz"), (bopen, ".bz2")):
+            with opener(path + extension, "wt") as test_file:
+                test_file.write(content)
+            np.testing.assert_array_equal(
+                cau.read_table(path + extension), expected
+            )
+            with self.assertRaises(ValueError):
+                cau.read_table_range(path + extension, 0, 9)
+            os.remove(path + extension)
+
+        # Only comments
+        with open(path, "wt") as test_file:
+            test_file.write("# header\n\n")
+        self.assertEqual(cau.read_table(path).size, 0)
+
+        # Inconsistent number of columns, in the same block and across blocks
+        with open(path, "wt") as test_file:
+            test_file.write("1 2 3\n4 5\n")
+        with self.assertRaises(ValueError):
+            cau.read_table(path)
+        cau._TABLE_CHUNK_BYTES = 7
+        with self.assertRaises(ValueError):
+            cau.read_table(path)
+        cau._TABLE_CHUNK_BYTES = default_chunk
+
+        # Not numbers
+        with open(path, "wt") as test_file:
+            test_file.write("1 2 3\n4 5 bubu\n")
+        with self.assertRaises(ValueError):
+            cau.read_table(path)
+
+        os.remove(path)
+
+    def test_set_table_cache_dir(self):
+
+        path = "table.asc"
+        with open(path, "wt") as test_file:
+            test_file.write("# header\n1 2 3\n4 5 6\n")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir = os.path.join(tmpdir, "cache")
+            cau.set_table_cache_dir(cache_dir)
+            self.assertTrue(os.path.isdir(cache_dir))
+
+            table = cau.read_table(path)
+            self.assertNotIsInstance(table, np.memmap)
+            # The table and the metadata
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+            table = cau.read_table(path)
+            self.assertIsInstance(table, np.memmap)
+            np.testing.assert_array_equal(table, [[1, 4], [2, 5], [3, 6]])
+
+            # Same name in a different folder
+            os.mkdir("tmp_folder")
+            path2 = os.path.join("tmp_folder", path)
+            with open(path2, "wt") as test_file:
+                test_file.write("7 8\n")
+            np.testing.assert_array_equal(cau.read_table(path2), [[7], [8]])
+            np.testing.assert_array_equal(
+                cau.read_table(path), [[1, 4], [2, 5], [3, 6]]
+            )
+            self.assertEqual(len(os.listdir(cache_dir)), 4)
+            os.remove(path2)
+            os.rmdir("tmp_folder")
+
+            # The file changes
+            with open(path, "at") as test_file:
+                test_file.write("7 8 9\n")
+            table = cau.read_table(path)
+            self.assertNotIsInstance(table, np.memmap)
+            self.assertEqual(table.shape, (3, 3))
+
+            # Corrupted metadata
+            for file_ in os.listdir(cache_dir):
+                if file_.endswith(".json"):
+                    with open(os.path.join(cache_dir, file_), "w") as meta:
+                        meta.write("{bubu")
+            table = cau.read_table(path)
+            self.assertNotIsInstance(table, np.memmap)
+            self.assertIsInstance(cau.read_table(path), np.memmap)
+
+            # Through OneScalar
+            cau.clear_columns_cache()
+            scalar_path = "tests/tov/output-0000/static_tov/carpet-timing..asc"
+            var = "current_physical_time_per_hour"
+            expected = cs.OneScalar(scalar_path)[var]
+            cau.clear_columns_cache()
+            cs.OneScalar.load.cache_clear()
+            self.assertEqual(cs.OneScalar(scalar_path)[var], expected)
+            self.assertIsInstance(
+                cau._columns_cache.get(scalar_path), np.memmap
+            )
+            cau.clear_columns_cache()
+
+            cau.set_table_cache_dir(None)
+            self.assertNotIsInstance(cau.read_table(path), np.memmap)
+
+        os.remove(path)
+
+    def test_read_appended(self):
+
+        cau.clear_columns_cache()
+
+        path = "growing.asc"
+        with open(path, "wt") as test_file:
+            test_file.write("# header\n1 2\n3 4")
+
+        offsets = []
+        default_parse_table = cau._parse_table
+
+        def parse_table(path, offset=0):
+            offsets.append(offset)
+            return default_parse_table(path, offset)
+
+        cau._parse_table = parse_table
+
+        np.testing.assert_array_equal(
+            cau._columns_cache.get(path), [[1, 3], [2, 4]]
+        )
+
+        # The last line was not complete
+        with open(path, "at") as test_file:
+            test_file.write("0\n5 6\n")
+        np.testing.assert_array_equal(
+            cau._columns_cache.get(path), [[1, 3, 5], [2, 40, 6]]
+        )
+        # Only the new lines were read
+        self.assertEqual(offsets, [0, len("# header\n1 2\n")])
+
+        with open(path, "at") as test_file:
+            test_file.write("# restart\n3 7\n")
+        np.testing.assert_array_equal(
+            cau._columns_cache.get(path), [[1, 3, 5, 3], [2, 40, 6, 7]]
+        )
+        self.assertEqual(offsets[-1], len("# header\n1 2\n3 40\n5 6\n"))
+
+        # The file is rewritten
+        with open(path, "wt") as test_file:
+            test_file.write("# header\n1 2\n3 5\n5 6\n3 7\n8 9\n")
+        np.testing.assert_array_equal(
+            cau._columns_cache.get(path),
+            [[1, 3, 5, 3, 8], [2, 5, 6, 7, 9]],
+        )
+        self.assertEqual(offsets[-1], 0)
+
+        # Appending with the wrong number of columns
+        with open(path, "at") as test_file:
+            test_file.write("1 2 3\n")
+        with self.assertRaises(ValueError):
+            cau._columns_cache.get(path)
+
+        cau._parse_table = default_parse_table
+        cau.clear_columns_cache()
+        os.remove(path)
+
+    def test_refresh(self):
+
+        cau.clear_columns_cache()
+
+        path = "rho.maximum.asc"
+        with open(path, "wt") as test_file:
+            test_file.write("# header\n0 0 0\n1 1 1\n2 2 2\n3 3 3\n")
+
+        scalar = cs.OneScalar(path)
+        # Nothing read yet
+        self.assertFalse(scalar.refresh())
+
+        rho = scalar["rho"]
+        self.assertFalse(scalar.refresh())
+        self.assertIs(scalar["rho"], rho)
+
+        # Restart from time 2
+        with open(path, "at") as test_file:
+            test_file.write("2 2 4\n3 3 6\n4 4 8\n")
+        self.assertTrue(scalar.refresh())
+        expected = ts.TimeSeries([0, 1, 2, 3, 4], [0, 1, 4, 6, 8])
+        self.assertEqual(scalar["rho"], expected)
+        self.assertEqual(scalar.load("rho"), expected)
+
+        # Restart from before the previous one
+        with open(path, "at") as test_file:
+            test_file.write("1 1 -1\n")
+        self.assertTrue(scalar.refresh())
+        expected = ts.TimeSeries([0, 1], [0, -1])
+        self.assertEqual(scalar["rho"], expected)
+
+        # The file is rewritten
+        with open(path, "wt") as test_file:
+            test_file.write("# header\n0 0 5\n1 1 5\n")
+        self.assertTrue(scalar.refresh())
+        self.assertEqual(scalar["rho"], ts.TimeSeries([0, 1], [5, 5]))
+
+        # AllScalars and ScalarsDir
+        reader = cs.AllScalars([path], "maximum")
+        self.assertFalse(reader.refresh())
+        self.assertEqual(reader["rho"], ts.TimeSeries([0, 1], [5, 5]))
+        with open(path, "at") as test_file:
+            test_file.write("2 2 5\n")
+        self.assertTrue(reader.refresh())
+        self.assertEqual(reader["rho"], ts.TimeSeries([0, 1, 2], [5, 5, 5]))
+
+        os.remove(path)
+
+        # TwoScalar
+        path = "bhns.xon"
+        with open(path, "wt") as test_file:
+            test_file.write("0 1 2 3 4 5 6\n1 1 2 3 4 5 6\n")
+        scalar = cs.TwoScalar(path)
+        self.assertEqual(scalar["M0_star_2"], ts.TimeSeries([0, 1], [6, 6]))
+        with open(path, "at") as test_file:
+            test_file.write("2 1 2 3 4 5 7\n")
+        self.assertTrue(scalar.refresh())
+        self.assertEqual(
+            scalar["M0_star_2"], ts.TimeSeries([0, 1, 2], [6, 6, 7])
+        )
+        os.remove(path)
+
+        cau.clear_columns_cache()
+
+    def test_read_columns(self):
+
+        path = "tests/tov/output-0000/static_tov/carpet-timing..asc"
+        t, y = np.loadtxt(path, ndmin=2, unpack=True, usecols=(8, 13))
+
+        cau.clear_columns_cache()
+        t_read, y_read = cau.read_columns(path, (8, 13))
+        np.testing.assert_array_equal(t_read, t)
+        np.testing.assert_array_equal(y_read, y)
+        # Data is read-only
+        self.assertFalse(y_read.flags.writeable)
+
+        # The file is in the cache, so we get views of the same table
+        t_read2, y_read2 = cau.read_columns(path, (8, 12))
+        self.assertTrue(np.shares_memory(t_read, t_read2))
+        self.assertEqual(len(cau._columns_cache._tables), 1)
+
+        # Invalid size
+        with self.assertRaises(ValueError):
+            cau.set_columns_cache_size(-1)
+
+        # Shrinking the cache removes the table
+        cau.set_columns_cache_size(0)
+        self.assertEqual(len(cau._columns_cache._tables), 0)
+        self.assertEqual(cau._columns_cache.nbytes, 0)
+        # We can still read files
+        _, y_read = cau.read_columns(path, (8, 13))
+        np.testing.assert_array_equal(y_read, y)
+        self.assertEqual(len(cau._columns_cache._tables), 0)
+        cau.set_columns_cache_size(cau._COLUMNS_CACHE_MAX_BYTES)
+
+        # Files with different number of columns in different rows
+        path = "ragged.asc"
+        with open(path, "wt") as test_file:
+            test_file.write("# header\n1 2 3\n2 4\n")
+        t_read, y_read = cau.read_columns(path, (0, 1))
+        np.testing.assert_array_equal(t_read, [1, 2])
+        np.testing.assert_array_equal(y_read, [2, 4])
+
+        # Files that change are read again
+        with open(path, "wt") as test_file:
+            test_file.write("# header\n1 2\n2 4\n3 6\n")
+        _, y_read = cau.read_columns(path, (0, 1))
+        np.testing.assert_array_equal(y_read, [2, 4, 6])
+        with open(path, "at") as test_file:
+            test_file.write("4 8\n")
+        _, y_read = cau.read_columns(path, (0, 1))
+        np.testing.assert_array_equal(y_read, [2, 4, 6, 8])
+        os.remove(path)
+
+    def test_preload_tables(self):
+
+        paths = [
+            "tests/tov/output-0000/static_tov/hydrobase-rho.average.asc",
+            "tests/tov/output-0001/static_tov/hydrobase-rho.average.asc",
+        ]
+
+        with self.assertRaises(ValueError):
+            cau.preload_tables(paths, max_workers=0)
+
+        for max_workers in (1, 2):
+            with self.subTest(max_workers=max_workers):
+                cau.clear_columns_cache()
+                cau.preload_tables(paths + ["bubu.asc"], max_workers)
+                for path in paths:
+                    self.assertTrue(cau._columns_cache.is_current(path))
+                    np.testing.assert_array_equal(
+                        cau._columns_cache.get(path),
+                        np.loadtxt(path, unpack=True, ndmin=2),
+                    )
+                self.assertFalse(cau._columns_cache.is_current("bubu.asc"))
+
+        # Files already in the cache are not read again
+        tables = [cau._columns_cache.get(path) for path in paths]
+        cau.preload_tables(paths, max_workers=2)
+        for path, table in zip(paths, tables):
+            self.assertIs(cau._columns_cache.get(path), table)
+
+        cau.clear_columns_cache()
+
     def test_load(self):
 
         # no reduction, scalar, one file per group
@@ -205,6 +589,48 @@ class TestCactusScalar(unittest.TestCase):
         with self.assertRaises(KeyError):
             reader["BOB"]
 
+    def test_AllScalars_jon_array(self):
+
+        # IL BHNS surface diagnostics, two restarts and two radii
+        with tempfile.TemporaryDirectory() as tmpdir:
+            files = []
+            for restart, times in enumerate(([0, 1, 2], [2, 3, 4])):
+                folder = os.path.join(tmpdir, f"output-000{restart}")
+                os.mkdir(folder)
+                for radius in (0, 1):
+                    # Radius 1 is missing the last time
+                    num_times = len(times) - (radius == 1 and restart == 1)
+                    path = os.path.join(folder, f"bhns.jon.{radius}")
+                    data = np.zeros((num_times, 14))
+                    data[:, 0] = times[:num_times]
+                    data[:, 11] = 10 * radius + data[:, 0]
+                    np.savetxt(path, data)
+                    files.append(path)
+
+            for max_workers in (1, 2):
+                with self.subTest(max_workers=max_workers):
+                    cau.clear_columns_cache()
+                    reader = cs.AllScalars(
+                        files, "scalar", max_workers=max_workers
+                    )
+                    self.assertIn("F_E_em_1", reader)
+
+                    radii, times, values = reader.jon_array("F_E_em")
+                    np.testing.assert_array_equal(radii, [0, 1])
+                    np.testing.assert_array_equal(times, [0, 1, 2, 3])
+                    np.testing.assert_array_equal(
+                        values, [[0, 1, 2, 3], [10, 11, 12, 13]]
+                    )
+
+            with self.assertRaises(KeyError):
+                reader.jon_array("bubu")
+
+            # No jon files
+            with self.assertRaises(KeyError):
+                cs.AllScalars([], "scalar").jon_array("F_E_em")
+
+            cau.clear_columns_cache()
+
     def test_AllScalars_magic_methods(self):
 
         reader = cs.AllScalars(sd.SimDir("tests/tov").allfiles, "average")
@@ -222,6 +648,16 @@ class TestCactusScalar(unittest.TestCase):
 
         self.assertEqual(1, reader.get("bubu", default=1))
 
+        # Reading the files in parallel gives the same result
+        cau.clear_columns_cache()
+        reader_parallel = cs.AllScalars(
+            sd.SimDir("tests/tov").allfiles, "average", max_workers=2
+        )
+        self.assertEqual(rho, reader_parallel["rho"])
+        for folder in reader_parallel._vars_readers["rho"].values():
+            self.assertTrue(cau._columns_cache.is_current(folder.path))
+        cau.clear_columns_cache()
+
     def test_ScalarsDir(self):
 
         # Not a SimDir
@@ -230,6 +666,15 @@ class TestCactusScalar(unittest.TestCase):
 
         scaldir = cs.ScalarsDir(sd.SimDir("tests/tov"))
 
+        # Reductions are built only when needed
+        self.assertEqual(scaldir._reductions, {})
+        self.assertEqual(scaldir.maximum.reduction_type, "maximum")
+        self.assertCountEqual(scaldir._reductions, ["maximum"])
+        # point and scalar are the same object
+        self.assertIs(scaldir.point, scaldir.scalar)
+        # Readers are shared
+        self.assertIs(scaldir.scalar._readers, scaldir.maximum._readers)
+
         # Check that the getter (and []) work
         self.assertEqual(scaldir["average"].reduction_type, "average")
         self.assertEqual(scaldir.get("infnorm").reduction_type, "infnorm")
@@ -238,6 +683,42 @@ class TestCactusScalar(unittest.TestCase):
         self.assertIs(scaldir["maximum"], scaldir["max"])
         self.assertIs(scaldir["minimum"], scaldir["min"])
 
+        # max_workers is passed to the reductions
+        with self.assertRaises(ValueError):
+            scaldir.max_workers = 0
+        self.assertEqual(scaldir.maximum.max_workers, 1)
+        scaldir.max_workers = 4
+        self.assertEqual(scaldir.maximum.max_workers, 4)
+        self.assertEqual(scaldir.norm1.max_workers, 4)
+
         # Check string representation
         # (this is a very weak check...)
         self.assertIn("io_count", scaldir.__str__())
+
+    def test_ScalarsDir_all_reductions(self):
+
+        # Simulation where all the reductions are in one file
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "alp.scalars.asc")
+            shutil.copy(
+                "tests/tov/output-0000/static_tov/alp.scalars.asc", path
+            )
+            scaldir = cs.ScalarsDir(sd.SimDir(tmpdir))
+
+            cau.clear_columns_cache()
+            reductions = ("minimum", "maximum", "average", "norm1", "norm2")
+            for column, reduction in enumerate(reductions, start=2):
+                t, y = np.loadtxt(path, unpack=True, usecols=(1, column))
+                self.assertEqual(
+                    scaldir[reduction]["alp"], ts.TimeSeries(t, y)
+                )
+            self.assertNotIn("alp", scaldir.infnorm)
+
+            # The file was parsed only once
+            self.assertEqual(list(cau._columns_cache._tables), [path])
+            cau.clear_columns_cache()
+
+        # Files with only one reduction are preferred
+        scaldir = cs.ScalarsDir(sd.SimDir("tests/tov"))
+        for folder, reader in scaldir.maximum._vars_readers["alp"].items():
+            self.assertTrue(reader.path.endswith("admbase-lapse.maximum.asc"))
@@ -17,6 +17,8 @@
 
 import os
 import pickle
+import shutil
+import tempfile
 import unittest
 
 from kuibit import simdir as sd
@@ -91,6 +93,52 @@ class TestSimDir(unittest.TestCase):
         sim_with_symlink = sd.SimDir("tests/tov", ignore_symlinks=False)
         self.assertEqual(len(sim_with_symlink.allfiles), 447)
 
+        # The result should not depend on the number of threads
+        sim_one_thread = sd.SimDir("tests/tov", max_scan_threads=1)
+        self.assertEqual(sim_one_thread.allfiles, self.sim.allfiles)
+        self.assertEqual(sim_one_thread.dirs, self.sim.dirs)
+
+        self.assertGreater(self.sim.scan_time, 0)
+
+        # Rescanning should not duplicate the files
+        self.sim.rescan()
+        self.assertEqual(len(self.sim.allfiles), 446)
+
+    def test__classify_files(self):
+
+        files_by_kind = sd._classify_files(
+            [
+                "output-0000/hydrobase-rho.maximum.asc",
+                "output-0000/rho.xy.h5",
+                "output-0000/mp_Psi4_l2_m2_r44.78.asc",
+                "output-0000/BH_diagnostics.ah1.gp",
+                "output-0000/h.t0.ah1.gp",
+                "output-0000/bubu.txt",
+            ]
+        )
+
+        self.assertEqual(
+            files_by_kind,
+            {
+                ("scalars", "maximum"): [
+                    "output-0000/hydrobase-rho.maximum.asc"
+                ],
+                ("grid_functions", (0, 1)): ["output-0000/rho.xy.h5"],
+                "multipoles": ["output-0000/mp_Psi4_l2_m2_r44.78.asc"],
+                "horizons": [
+                    "output-0000/BH_diagnostics.ah1.gp",
+                    "output-0000/h.t0.ah1.gp",
+                ],
+            },
+        )
+
+        # ls tests/tov/output-000*/static_tov | grep "maximum.asc" | wc -l
+        # plus alp.scalars.asc, which contains all the reductions
+        self.assertEqual(
+            len(self.sim._files_of_kind(("scalars", "maximum"))), 20
+        )
+        self.assertEqual(self.sim._files_of_kind("bubu"), [])
+
     def test_pickle(self):
 
         path = "/tmp/sim.pickle"
@@ -131,6 +179,141 @@ class TestSimDir(unittest.TestCase):
 
         os.remove(path)
 
+    def test_save_data(self):
+
+        path = "/tmp/sim_data.pickle"
+
+        rho_max = self.sim.ts.maximum["rho"]
+        rho_xy = self.sim.gf.xy["rho"][0]
+        # ASCII
+        rho_x = self.sim.gf.x["rho"][0]
+        psi4 = self.sim.multipoles["psi4"]
+        self.sim.horizons
+
+        with self.assertRaises(ValueError):
+            self.sim.save(path, data="bubu")
+
+        # Metadata only
+        self.sim.save(path, data="none")
+        metadata_size = os.path.getsize(path)
+        loaded_sim = sd.load_SimDir(path)
+
+        self.assertEqual(loaded_sim.ts.maximum._vars, {})
+        self.assertEqual(loaded_sim.multipoles._vars, {})
+        self.assertIsNone(loaded_sim._SimDir__horizons)
+        # Uncompressed ASCII files are read lazily, so the variables are kept
+        # (without the data)
+        self.assertIn("rho", loaded_sim.gf.x._vars)
+        for var in (loaded_sim.gf.xy["rho"], loaded_sim.gf.x._vars["rho"]):
+            for file_reader in var.alldata.values():
+                for iteration_reader in file_reader.values():
+                    for ref_level_reader in iteration_reader.values():
+                        for component in ref_level_reader.values():
+                            self.assertIsNone(component)
+
+        # The original object is untouched
+        self.assertIn("rho", self.sim.ts.maximum._vars)
+        self.assertTrue(
+            any(
+                component is not None
+                for file_reader in self.sim.gf.xy["rho"].alldata.values()
+                for iteration_reader in file_reader.values()
+                for ref_level_reader in iteration_reader.values()
+                for component in ref_level_reader.values()
+            )
+        )
+
+        # Data is read again
+        self.assertEqual(loaded_sim.ts.maximum["rho"], rho_max)
+        self.assertEqual(loaded_sim.gf.xy["rho"][0], rho_xy)
+        self.assertEqual(loaded_sim.gf.x["rho"][0], rho_x)
+        self.assertEqual(loaded_sim.multipoles["psi4"], psi4)
+
+        self.sim.save(path)
+        self.assertGreater(os.path.getsize(path), metadata_size)
+
+        # Out-of-band. The arrays in the test data are small, so we lower the
+        # threshold
+        min_bytes = sd._OUT_OF_BAND_MIN_BYTES
+        sd._OUT_OF_BAND_MIN_BYTES = 1
+        self.sim.save(path, data="out_of_band")
+        sd._OUT_OF_BAND_MIN_BYTES = min_bytes
+        self.assertTrue(os.path.isdir(f"{path}.buffers"))
+        loaded_sim = sd.load_SimDir(path)
+        self.assertEqual(loaded_sim.ts.maximum["rho"], rho_max)
+        self.assertEqual(loaded_sim.gf.xy["rho"][0], rho_xy)
+        self.assertEqual(loaded_sim.gf.x["rho"][0], rho_x)
+
+        # Saving again removes the buffers
+        self.sim.save(path)
+        self.assertFalse(os.path.isdir(f"{path}.buffers"))
+
+        # Context manager
+        with sd.SimDir(
+            "tests/tov", pickle_file=path, pickle_data="none"
+        ) as sim:
+            sim.ts.maximum["rho"]
+        loaded_sim = sd.load_SimDir(path)
+        self.assertEqual(loaded_sim.ts.maximum._vars, {})
+
+        os.remove(path)
+
     def test_rescan(self):
         # This is not a real test ...
         self.sim.rescan()
+
+        # Test incremental rescan. We start with a simulation with only one
+        # restart, then we add the second one.
+        with tempfile.TemporaryDirectory() as tmpdir:
+            sim_path = os.path.join(tmpdir, "tov")
+            os.mkdir(sim_path)
+            shutil.copytree(
+                "tests/tov/output-0000", os.path.join(sim_path, "output-0000")
+            )
+
+            sim = sd.SimDir(sim_path)
+            rho_max = sim.ts.maximum["rho"]
+            rho_xy_files = list(sim.gf.xy["rho"].allfiles)
+            num_files = len(sim.allfiles)
+
+            # Nothing changed
+            sim.rescan(incremental=True)
+            self.assertEqual(len(sim.allfiles), num_files)
+            self.assertIs(sim.ts.maximum["rho"], rho_max)
+
+            shutil.copytree(
+                "tests/tov/output-0001", os.path.join(sim_path, "output-0001")
+            )
+            # Make sure that the modification time is different even on
+            # filesystems with coarse resolution
+            os.utime(sim_path, ns=(0, 0))
+
+            sim.rescan(incremental=True)
+            self.assertGreater(
+                len(sim.gf.xy["rho"].allfiles), len(rho_xy_files)
+            )
+
+            full_sim = sd.SimDir(sim_path)
+            self.assertCountEqual(sim.allfiles, full_sim.allfiles)
+            self.assertCountEqual(sim.dirs, full_sim.dirs)
+            self.assertGreater(len(sim.allfiles), num_files)
+
+            self.assertEqual(sim.ts.maximum["rho"], full_sim.ts.maximum["rho"])
+            self.assertEqual(
+                sim.gf.xy["rho"].available_iterations,
+                full_sim.gf.xy["rho"].available_iterations,
+            )
+
+            # The simulation is still running, so a file grows
+            rho_max_file = os.path.join(
+                sim_path,
+                "output-0001",
+                "static_tov",
+                "hydrobase-rho.maximum.asc",
+            )
+            tmax = sim.ts.maximum["rho"].tmax
+            with open(rho_max_file, "a") as file_:
+                file_.write(f"123456 {tmax + 1} 1.5\n")
+            sim.rescan(incremental=True)
+            self.assertEqual(sim.ts.maximum["rho"].tmax, tmax + 1)
+            self.assertEqual(sim.ts.maximum["rho"].y[-1], 1.5)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2021 Gabriele Bozzola
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, see <https://www.gnu.org/licenses/>.
+
+import json
+import os
+import tempfile
+import unittest
+
+from kuibit import simdir as sd
+from kuibit import simdir_index as si
+
+
+class TestSimDirIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.data_file = os.path.join(self.tmpdir.name, "data.asc")
+        with open(self.data_file, "w") as file_:
+            file_.write("# header\n1 2\n")
+        self.index_file = os.path.join(self.tmpdir.name, "index.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_get_set(self):
+        index = si.SimDirIndex()
+
+        self.assertIsNone(index.get(self.data_file, "header"))
+        self.assertEqual(index.get(self.data_file, "header", 1), 1)
+        self.assertNotIn(self.data_file, index)
+
+        index.set(self.data_file, "header", {"a": 1})
+        self.assertEqual(index.get(self.data_file, "header"), {"a": 1})
+        self.assertIn(self.data_file, index)
+        self.assertEqual(len(index), 1)
+        self.assertTrue(index.modified)
+
+        # Files that do not exist are not stored
+        index.set("bubu", "header", 1)
+        self.assertNotIn("bubu", index)
+
+        # cached calls compute only once
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return [1, 2]
+
+        self.assertEqual(index.cached(self.data_file, "cols", compute), [1, 2])
+        self.assertEqual(index.cached(self.data_file, "cols", compute), [1, 2])
+        self.assertEqual(len(calls), 1)
+
+        # None as index
+        self.assertEqual(
+            si.cached_metadata(None, self.data_file, "cols", compute), [1, 2]
+        )
+        self.assertEqual(len(calls), 2)
+
+        # Prune
+        index.prune([])
+        self.assertEqual(len(index), 0)
+
+        # Saving without a path
+        with self.assertRaises(ValueError):
+            index.save()
+
+    def test_save_load(self):
+        index = si.SimDirIndex(self.index_file)
+        index.set(self.data_file, "header", {"a": 1})
+        index.set_dirs_content(
+            {"dir": (1, ["file"], [])}, {"ignore_symlinks": True}
+        )
+        index.save()
+        self.assertFalse(index.modified)
+
+        loaded = si.SimDirIndex(self.index_file)
+        self.assertEqual(loaded.get(self.data_file, "header"), {"a": 1})
+        self.assertEqual(
+            loaded.dirs_content({"ignore_symlinks": True}),
+            {"dir": (1, ["file"], [])},
+        )
+        # Different options
+        self.assertEqual(loaded.dirs_content({"ignore_symlinks": False}), {})
+
+        # Now we change the file
+        with open(self.data_file, "a") as file_:
+            file_.write("3 4\n")
+        loaded = si.SimDirIndex(self.index_file)
+        self.assertIsNone(loaded.get(self.data_file, "header"))
+        self.assertTrue(loaded.modified)
+
+        # Outdated version
+        with open(self.index_file, "w") as file_:
+            json.dump({"version": si.SimDirIndex.VERSION - 1}, file_)
+        with self.assertWarns(Warning):
+            loaded = si.SimDirIndex(self.index_file)
+        self.assertEqual(len(loaded), 0)
+
+        # Corrupted file
+        with open(self.index_file, "w") as file_:
+            file_.write("{bubu")
+        with self.assertWarns(Warning):
+            loaded = si.SimDirIndex(self.index_file)
+        self.assertEqual(len(loaded), 0)
+
+    def test_SimDir(self):
+        sim = sd.SimDir("tests/tov", index_file=self.index_file)
+        self.assertTrue(os.path.exists(self.index_file))
+
+        # Populate the index
+        rho_max = sim.ts.maximum["rho"]
+        rho_xy = sim.gf.xy["rho"][0]
+        sim.index.save()
+
+        # Scalar header
+        rho_max_file = os.path.join(
+            sim.path, "output-0000", "static_tov", "hydrobase-rho.maximum.asc"
+        )
+        self.assertIsNotNone(sim.index.get(rho_max_file, "scalar_header"))
+
+        with sd.SimDir("tests/tov", index_file=self.index_file) as sim2:
+            self.assertEqual(sim2.allfiles, sim.allfiles)
+            self.assertEqual(sim2.dirs, sim.dirs)
+            self.assertEqual(sim2.ts.maximum["rho"], rho_max)
+            self.assertEqual(sim2.gf.xy["rho"][0], rho_xy)
+            # Nothing new was computed
+            self.assertFalse(sim2.index.modified)
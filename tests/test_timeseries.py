@@ -973,6 +973,22 @@ class TestTimeseries(unittest.TestCase):
             np.allclose(ts.combine_ts([ts4, ts5], prefer_late=True).y, coss5)
         )
 
+        # Many restarts, each one starting before the end of the previous one
+        restarts = [
+            ts.TimeSeries(np.arange(10 * i, 10 * i + 15), np.full(15, i))
+            for i in range(50)
+        ]
+        times = np.arange(505)
+        self.assertEqual(
+            ts.combine_ts(restarts[::-1]),
+            ts.TimeSeries(times, np.minimum(times // 10, 49)),
+        )
+        expected_y = np.append([0] * 15, (times[15:] - 5) // 10)
+        self.assertEqual(
+            ts.combine_ts(restarts, prefer_late=False),
+            ts.TimeSeries(times, expected_y),
+        )
+
     def test_resample_common(self):
 
         # Test with resample=False